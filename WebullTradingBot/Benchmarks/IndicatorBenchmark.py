@@ -0,0 +1,433 @@
+"""
+Micro-benchmarks for the indicator pipeline on synthetic multi-symbol bars.
+
+Every `Indicators` method is timed over the whole history, followed by a
+bar cycle: `StockFrame.add_rows` with one new bar per symbol, `refresh`
+and `check_signals`. Each case reports its best time, the time per bar
+per symbol and its peak traced memory, and the run is saved as JSON so
+it can be compared with a run from another commit. The cycle steps are
+timed per new bar, with the time per bar of history reported next to it.
+
+Run it from the `WebullTradingBot` folder:
+
+    python -m Benchmarks.IndicatorBenchmark --sizes 10x1000,200x5000 --output bench.json
+    python -m Benchmarks.IndicatorBenchmark --sizes 10x1000 --compare bench.json
+"""
+
+import argparse
+import gc
+import inspect
+import json
+import operator
+import platform
+import subprocess
+import time
+import tracemalloc
+
+from datetime import datetime
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from Objects.StockFrame import StockFrame
+from Objects.Indicator import Indicators
+
+
+class SyntheticBars():
+
+    """
+    Represents reproducible random walk OHLCV bars for a number of symbols,
+    as the dictionaries of column arrays a StockFrame is built from.
+    """
+
+    def __init__(self, symbols: int, bars: int, seed: int = 0, start: int = 1577836800000, interval: int = 60000) -> None:
+        """Initalizes the Synthetic Bars.
+        Arguments:
+        ----
+        symbols {int} -- The number of symbols.
+        bars {int} -- The number of bars of history per symbol.
+        Keyword Arguments:
+        ----
+        seed {int} -- The seed of the random walks. (default: {0})
+        start {int} -- The epoch milliseconds of the first bar. (default: {2020-01-01})
+        interval {int} -- The milliseconds between two bars. (default: {60000})
+        """
+
+        self.symbols = symbols
+        self.bars = bars
+        self.seed = seed
+        self.start = start
+        self.interval = interval
+
+        self.names = ['SYM{number:05d}'.format(number = number) for number in range(symbols)]
+
+        # Where each symbol's walk is at, so new bars carry on from the last close.
+        self._last_closes = np.full(symbols, 100.0)
+
+    def _walk(self, symbols: slice, bars: int, first: int, seed: int) -> Dict[str, np.ndarray]:
+        """Builds the columns of `bars` bars for a slice of the symbols, starting at bar `first`."""
+
+        rng = np.random.default_rng(seed)
+        names = self.names[symbols]
+        shape = (len(names), bars)
+
+        # The history starts every walk at 100, later bars start from the last close.
+        prices = np.full(len(names), 100.0) if first == 0 else self._last_closes[symbols]
+
+        opens = prices[:, None] * np.exp(np.cumsum(rng.normal(0.0, 0.001, shape), axis = 1))
+        closes = opens * np.exp(rng.normal(0.0, 0.001, shape))
+        spread = np.abs(rng.normal(0.0, 0.002, shape)) * opens
+
+        self._last_closes[symbols] = closes[:, -1]
+
+        return {
+            'symbol': np.repeat(np.array(names, dtype = object), bars),
+            'datetime': np.tile(self.start + self.interval * np.arange(first, first + bars, dtype = 'int64'), len(names)),
+            'open': opens.ravel(),
+            'close': closes.ravel(),
+            'high': (np.maximum(opens, closes) + spread).ravel(),
+            'low': (np.minimum(opens, closes) - spread).ravel(),
+            'volume': rng.integers(100, 100000, shape).ravel().astype('float64')
+        }
+
+    def chunks(self, symbols_per_chunk: int = 100) -> Iterator[Dict[str, np.ndarray]]:
+        """Yields the history a few symbols at a time, so it is never held twice in memory.
+        Keyword Arguments:
+        ----
+        symbols_per_chunk {int} -- The number of symbols in a chunk. (default: {100})
+        Returns:
+        ----
+        {Iterator[Dict[str, np.ndarray]]} -- The column arrays of every chunk.
+        """
+
+        for start in range(0, self.symbols, symbols_per_chunk):
+            yield self._walk(
+                symbols = slice(start, start + symbols_per_chunk),
+                bars = self.bars,
+                first = 0,
+                seed = self.seed + start
+            )
+
+    def history(self) -> Dict[str, np.ndarray]:
+        """The whole history as one dictionary of column arrays."""
+
+        return self._walk(symbols = slice(None), bars = self.bars, first = 0, seed = self.seed)
+
+    def next_bars(self, step: int = 0) -> Dict[str, np.ndarray]:
+        """One new bar for every symbol, `step` bars after the end of the history.
+        Overview:
+        ----
+        Each symbol's walk carries on from the close of the bar it generated
+        last, so ask for the steps in order after the history.
+        Keyword Arguments:
+        ----
+        step {int} -- The number of bars since the end of the history. (default: {0})
+        Returns:
+        ----
+        {Dict[str, np.ndarray]} -- The column arrays of the new bars.
+        """
+
+        return self._walk(symbols = slice(None), bars = 1, first = self.bars + step, seed = self.seed + self.symbols + step)
+
+
+class IndicatorBenchmark():
+
+    """
+    Represents a benchmark run of every `Indicators` method and of the
+    bar cycle over a list of `(symbols, bars)` sizes.
+    """
+
+    # Arguments for the indicators without defaults for all of them.
+    indicator_arguments = {
+        'rsi': {'period': 14},
+        'sma': {'period': 20},
+        'ema': {'period': 20},
+        'force_index': {'period': 9},
+        'ease_of_movement': {'period': 9},
+        'commodity_channel_index': {'period': 20},
+        'standard_deviation': {'period': 20},
+        'chaikin_oscillator': {'period': 9},
+        'kst_oscillator': {'r1': 10, 'r2': 15, 'r3': 20, 'r4': 30, 'n1': 10, 'n2': 10, 'n3': 10, 'n4': 15},
+        'sma_sweep': {'periods': list(range(5, 205, 5))},
+        'ema_sweep': {'spans': list(range(5, 205, 5))},
+        'expression': {'expression': '(close - sma(close, 20)) / rolling_std(close, 20) + rolling_sum(volume * close, 20) / rolling_sum(volume, 20)'}
+    }
+
+    def __init__(self, sizes: List[Tuple[int, int]], backend: str = 'pandas', repeat: int = 3, cycles: int = 5) -> None:
+        """Initalizes the Indicator Benchmark.
+        Arguments:
+        ----
+        sizes {List[Tuple[int, int]]} -- The `(symbols, bars)` sizes to run.
+        Keyword Arguments:
+        ----
+        backend {str} -- The StockFrame backend. (default: {'pandas'})
+        repeat {int} -- The number of timed runs of an indicator, the best one is kept. (default: {3})
+        cycles {int} -- The number of bar cycles, the best one is kept. (default: {5})
+        """
+
+        self.sizes = sizes
+        self.backend = backend
+        self.repeat = repeat
+        self.cycles = cycles
+
+    @property
+    def indicator_names(self) -> List[str]:
+        """The names of every indicator method of `Indicators`."""
+
+        return [
+            name for name, member in vars(Indicators).items()
+            if inspect.isfunction(member) and hasattr(member, '__wrapped__')
+        ]
+
+    def run(self) -> Dict:
+        """Runs every case for every size.
+        Returns:
+        ----
+        {Dict} -- The run, with its `meta` data and one entry per case in `results`.
+        """
+
+        results = []
+
+        for symbols, bars in self.sizes:
+            data = SyntheticBars(symbols = symbols, bars = bars)
+            results += self._run_indicators(data = data)
+            results += self._run_cycle(data = data)
+
+        return {'meta': self.meta(), 'results': results}
+
+    def meta(self) -> Dict:
+        """Describes the environment of the run."""
+
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output = True, text = True, check = True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+
+        return {
+            'commit': commit,
+            'date': datetime.now().isoformat(timespec = 'seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'backend': self.backend,
+            'repeat': self.repeat,
+            'cycles': self.cycles
+        }
+
+    def _stock_frame(self, data: SyntheticBars) -> StockFrame:
+        """Builds a StockFrame from the synthetic history."""
+
+        return StockFrame(data = data.chunks(), backend = self.backend)
+
+    def _run_indicators(self, data: SyntheticBars) -> List[Dict]:
+        """Times every indicator over the whole history, with the result cache off."""
+
+        stock_frame = self._stock_frame(data = data)
+        results = []
+
+        for name in self.indicator_names:
+            arguments = self.indicator_arguments.get(name, {})
+
+            def call():
+                indicator_client = Indicators(price_data_frame = stock_frame, cache_bytes = 0)
+                getattr(indicator_client, name)(**arguments)
+
+            results.append(self._measure(case = 'indicator', name = name, data = data, rows = data.symbols * data.bars, func = call))
+
+        return results
+
+    def _run_cycle(self, data: SyntheticBars) -> List[Dict]:
+        """Times `add_rows`, `refresh` and `check_signals` for one new bar per symbol."""
+
+        stock_frame = self._stock_frame(data = data)
+        indicator_client = Indicators(price_data_frame = stock_frame)
+
+        indicator_client.sma(period = 20)
+        indicator_client.ema(period = 50)
+        indicator_client.rsi(period = 14)
+        indicator_client.macd()
+        indicator_client.bollinger_bands(period = 20)
+        indicator_client.average_true_range(period = 14)
+
+        indicator_client.set_indicator_signal(
+            indicator = 'rsi', buy = 30.0, sell = 70.0, condition_buy = operator.le, condition_sell = operator.ge
+        )
+        indicator_client.set_indicator_signal_compare(
+            indicator_1 = 'sma', indicator_2 = 'ema', condition_buy = operator.gt, condition_sell = operator.lt
+        )
+
+        names = ['add_rows', 'refresh', 'check_signals']
+        timings = {name: [] for name in names}
+        peaks = {name: 0 for name in names}
+
+        for step in range(self.cycles):
+            bars = data.next_bars(step = step)
+            steps = [
+                ('add_rows', lambda: stock_frame.add_rows(data = bars)),
+                ('refresh', indicator_client.refresh),
+                ('check_signals', indicator_client.check_signals)
+            ]
+
+            # Trace memory on the first cycle only, tracing slows the timings down.
+            for name, func in steps:
+                seconds, peak = self._call(func = func, trace = step == 0)
+                timings[name].append(seconds)
+                peaks[name] = max(peaks[name], peak)
+
+        # Every step handles one new bar per symbol, the history they sit on is reported on its own.
+        results = [
+            self._result(case = 'cycle', name = name, data = data, rows = data.symbols, timings = timings[name], peak = peaks[name])
+            for name in names
+        ]
+
+        for result in results:
+            result['ns_per_history_bar'] = result['seconds'] * 1e9 / max(data.symbols * data.bars, 1)
+
+        return results
+
+    def _measure(self, case: str, name: str, data: SyntheticBars, rows: int, func: Callable) -> Dict:
+        """Runs a case once traced for its peak memory, then `repeat` times for its timing."""
+
+        try:
+            _, peak = self._call(func = func, trace = True)
+            timings = [self._call(func = func, trace = False)[0] for _ in range(self.repeat)]
+        except Exception as error:
+            return {
+                'case': case,
+                'name': name,
+                'symbols': data.symbols,
+                'bars': data.bars,
+                'error': '{kind}: {error}'.format(kind = type(error).__name__, error = error)
+            }
+
+        return self._result(case = case, name = name, data = data, rows = rows, timings = timings, peak = peak)
+
+    def _call(self, func: Callable, trace: bool) -> Tuple[float, int]:
+        """Runs a function, returning its time in seconds and its peak traced memory in bytes."""
+
+        gc.collect()
+
+        if trace:
+            tracemalloc.start()
+
+        start = time.perf_counter()
+
+        try:
+            func()
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if trace else 0
+        finally:
+            if trace:
+                tracemalloc.stop()
+
+        return seconds, peak
+
+    def _result(self, case: str, name: str, data: SyntheticBars, rows: int, timings: List[float], peak: int) -> Dict:
+        """Builds the entry of a case, normalized by the bars it covered."""
+
+        best = min(timings)
+
+        return {
+            'case': case,
+            'name': name,
+            'symbols': data.symbols,
+            'bars': data.bars,
+            'seconds': best,
+            'mean_seconds': sum(timings) / len(timings),
+            'ns_per_bar_symbol': best * 1e9 / max(rows, 1),
+            'peak_bytes': peak
+        }
+
+    @staticmethod
+    def save(run: Dict, path: str) -> None:
+        """Writes a run to a JSON file."""
+
+        with open(path, 'w') as file:
+            json.dump(run, file, indent = 2)
+
+    @staticmethod
+    def compare(run: Dict, baseline: Dict) -> List[Dict]:
+        """Matches the cases of a run with a baseline run.
+        Arguments:
+        ----
+        run {Dict} -- The new run.
+        baseline {Dict} -- The run to compare with, usually loaded from an older commit.
+        Returns:
+        ----
+        {List[Dict]} -- The cases found in both, with the `ratio` of their times per bar
+            per symbol, above `1` when the new run is slower.
+        """
+
+        def key(result: Dict) -> Tuple:
+            return (result['case'], result['name'], result['symbols'], result['bars'])
+
+        before = {key(result): result for result in baseline['results'] if 'error' not in result}
+        compared = []
+
+        for result in run['results']:
+
+            if 'error' in result or key(result) not in before:
+                continue
+
+            old = before[key(result)]
+            compared.append({
+                'case': result['case'],
+                'name': result['name'],
+                'symbols': result['symbols'],
+                'bars': result['bars'],
+                'before': old['ns_per_bar_symbol'],
+                'after': result['ns_per_bar_symbol'],
+                'ratio': result['ns_per_bar_symbol'] / max(old['ns_per_bar_symbol'], 1e-12)
+            })
+
+        return compared
+
+
+def parse_sizes(sizes: str) -> List[Tuple[int, int]]:
+    """Parses sizes written as `symbolsxbars`, separated by commas, for example `10x1000,2000x50000`."""
+
+    return [tuple(int(number) for number in size.lower().split('x')) for size in sizes.split(',')]
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description = 'Benchmarks the indicators on synthetic bars.')
+    parser.add_argument('--sizes', default = '10x1000,100x5000', help = 'Comma separated symbolsxbars sizes.')
+    parser.add_argument('--backend', default = 'pandas', choices = ['pandas', 'columnar'])
+    parser.add_argument('--repeat', type = int, default = 3)
+    parser.add_argument('--cycles', type = int, default = 5)
+    parser.add_argument('--output', default = None, help = 'Write the run to this JSON file.')
+    parser.add_argument('--compare', default = None, help = 'Compare the run with this JSON file.')
+    options = parser.parse_args()
+
+    benchmark = IndicatorBenchmark(
+        sizes = parse_sizes(sizes = options.sizes),
+        backend = options.backend,
+        repeat = options.repeat,
+        cycles = options.cycles
+    )
+    run = benchmark.run()
+
+    for result in run['results']:
+        if 'error' in result:
+            print('{case:10} {name:26} {symbols:>6}x{bars:<7} {error}'.format(**result))
+        else:
+            print('{case:10} {name:26} {symbols:>6}x{bars:<7} {seconds:10.5f}s {ns_per_bar_symbol:12.1f} ns/bar/symbol {peak_bytes:>14,} B'.format(**result))
+
+    if options.output:
+        IndicatorBenchmark.save(run = run, path = options.output)
+
+    if options.compare:
+        with open(options.compare) as file:
+            baseline = json.load(file)
+
+        for result in IndicatorBenchmark.compare(run = run, baseline = baseline):
+            print('{case:10} {name:26} {symbols:>6}x{bars:<7} {before:12.1f} -> {after:12.1f} ns/bar/symbol ({ratio:.2f}x)'.format(**result))
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 from webull import webull
@@ -10,6 +11,7 @@ from typing import List
 from typing import Dict
 from typing import Union
 from typing import Optional
+from typing import Iterator
 
 from enum import Enum
 from Utils.Enums import Login
@@ -18,6 +20,7 @@ from Utils.AsyncProcessing import ProcessContainer, MultiProcess
 from Objects.Trades import Trade
 from Objects.Portfolios import Portfolio
 from Objects.StockFrame import StockFrame
+from Objects.Indicator import Indicators
 
 class TradingBot():
     def __init__(self, trading_account: str = None, paper_trading: bool = True):
@@ -198,21 +201,91 @@ class TradingBot():
         if index in self.trades:
             del self.trades[index]
 
-    def create_stock_frame(self, data: List[dict]) -> StockFrame:
+    def create_stock_frame(self, data: Union[List[dict], Iterator], backend: str = 'pandas') -> StockFrame:
         """Generates a new StockFrame Object.
         Arguments:
         ----
-        data {List[dict]} -- The data to add to the StockFrame object.
+        data {Union[List[dict], Iterator]} -- The data to add to the StockFrame object, either
+            a list of quotes or an iterator of candle chunks like `iter_historical_prices`.
+        Keyword Arguments:
+        ----
+        backend {str} -- The StockFrame storage backend, `'pandas'` or `'columnar'`. (default: {'pandas'})
         Returns:
         ----
         StockFrame -- A multi-index pandas data frame built for trading.
+        Usage:
+        ----
+            >>> stock_frame = trading_robot.create_stock_frame(
+                data=trading_robot.iter_historical_prices(
+                    start=end_date,
+                    end=start_date,
+                    bar_size=1,
+                    bar_type='minute'
+                )
+            )
         """
 
         # Create the Frame.
-        self.stock_frame = StockFrame(data = data)
+        self.stock_frame = StockFrame(data = data, backend = backend)
 
         return self.stock_frame
 
+    def save_snapshot(self, indicator_client: Indicators, path: str) -> None:
+        """Saves the StockFrame and its indicators so the bot can warm restart.
+        Arguments:
+        ----
+        indicator_client {Indicators} -- The indicators added to the bot's StockFrame.
+        path {str} -- The snapshot file path.
+        """
+
+        indicator_client.save_snapshot(path = path)
+
+    def warm_start(self, path: str, bar_size: int = 1, bar_type: str = 'minute') -> Indicators:
+        """Restores the StockFrame and its indicators from a snapshot.
+        Overview:
+        ----
+        Instead of downloading the full history again, only the bars newer
+        than the tail of the snapshot are fetched and added, and the indicators
+        are refreshed once before they are handed back.
+        Arguments:
+        ----
+        path {str} -- The snapshot file path, written by `save_snapshot`.
+        Keyword Arguments:
+        ----
+        bar_size {int} -- Defines the size of each bar. (default: {1})
+        bar_type {str} -- Defines the bar type. (default: {'minute'})
+        Returns:
+        ----
+        {Indicators} -- The restored indicator client.
+        Usage:
+        ----
+            >>> indicator_client = trading_robot.warm_start(path='snapshot.npz')
+            >>> signals = indicator_client.check_signals()
+        """
+
+        indicator_client = Indicators.load_snapshot(path = path)
+        self.stock_frame = indicator_client.stock_frame
+
+        tail_timestamps = self.stock_frame.tail_timestamps()
+
+        if tail_timestamps:
+
+            # Fetch from the oldest tail, the upsert handles any overlap.
+            start = datetime.fromtimestamp(min(tail_timestamps.values()) / 1000, tz = timezone.utc)
+
+            for chunk in self.iter_historical_prices(
+                start = start,
+                end = datetime.now(tz = timezone.utc),
+                bar_size = bar_size,
+                bar_type = bar_type,
+                symbols = list(tail_timestamps)
+            ):
+                self.stock_frame.add_rows(data = chunk)
+
+        indicator_client.refresh()
+
+        return indicator_client
+
     def create_process_container(self, processContainer: Optional[ProcessContainer] = None, Process: MultiProcess = None):
         """Creates a process container to hold any async processes used by the bot
         and adds it to the list
@@ -560,6 +633,61 @@ class TradingBot():
 
         return self.historical_prices
 
+    def iter_historical_prices(self, start: datetime, end: datetime, bar_size: int = 1,
+                               bar_type: str = 'minute', symbols: List[str] = None) -> Iterator[Dict]:
+        """Streams the historical prices for all the postions in a portfolio.
+        Overview:
+        ----
+        Works like `grab_historical_prices`, but yields one chunk of column
+        arrays per symbol instead of building a quote dictionary per candle.
+        Passing the iterator to `create_stock_frame` fills the StockFrame
+        without ever holding the full list of quotes in memory.
+        Arguments:
+        ----
+        start {datetime} -- Defines the start date for the historical prices.
+        end {datetime} -- Defines the end date for the historical prices.
+        Keyword Arguments:
+        ----
+        bar_size {int} -- Defines the size of each bar. (default: {1})
+        bar_type {str} -- Defines the bar type, can be one of the following:
+            `['minute', 'week', 'month', 'year']` (default: {'minute'})
+        symbols {List[str]} -- A list of ticker symbols to pull. (default: None)
+        Yields:
+        ----
+        {Dict} -- The `symbol`, `datetime` and price column arrays of one symbol.
+        """
+
+        self._bar_size = bar_size
+        self._bar_type = bar_type
+
+        start = str(milliseconds_since_epoch(dt_object = start))
+        end = str(milliseconds_since_epoch(dt_object = end))
+
+        if not symbols:
+            symbols = self.portfolio.positions
+
+        for symbol in symbols:
+
+            historical_prices_response = self.session.get_price_history(
+                symbol = symbol,
+                period_type = 'day',
+                start_date = start,
+                end_date = end,
+                frequency_type = bar_type,
+                frequency = bar_size,
+                extended_hours = True
+            )
+
+            candles = historical_prices_response['candles']
+
+            chunk = {
+                name: np.array([candle[name] for candle in candles])
+                for name in ['datetime', 'open', 'close', 'high', 'low', 'volume']
+            }
+            chunk['symbol'] = np.full(len(candles), symbol, dtype = object)
+
+            yield chunk
+
     def get_latest_bar(self) -> List[dict]:
         """Returns the latest bar for each symbol in the portfolio.
         Returns:
@@ -0,0 +1,333 @@
+import os
+
+import numpy as np
+
+from typing import List
+from typing import Dict
+from typing import Union
+
+from Objects.ColumnStore import SymbolBuffer
+from Objects.ColumnStore import quote_columns
+
+_MAGIC = 0x57424152
+_HEADER_SIZE = 4
+_MS_PER_DAY = 86400000
+
+
+class BarFile():
+
+    """
+    Represents one memory-mapped columnar file holding a single
+    symbol's bars for a single day.
+    """
+
+    columns = ['datetime'] + SymbolBuffer.price_columns
+
+    def __init__(self, path: str, capacity: int = 1440) -> None:
+        """Opens a bar file, creating it if it doesn't exist.
+        Overview:
+        ----
+        The file starts with a small header (`magic`, `capacity`, `count`,
+        `number of columns`) followed by one fixed size block per column,
+        so every column can be handed out as a zero-copy NumPy view and
+        only the pages that are actually read get loaded from disk.
+        Arguments:
+        ----
+        path {str} -- The path to the bar file.
+        Keyword Arguments:
+        ----
+        capacity {int} -- The number of bars to reserve when the file is created. (default: {1440})
+        """
+
+        self.path = path
+
+        if not os.path.exists(path):
+            self._create(path = path, capacity = capacity)
+
+        self._open()
+
+    def _create(self, path: str, capacity: int) -> None:
+        """Writes an empty bar file with room for `capacity` bars."""
+
+        header = np.array([_MAGIC, capacity, 0, len(self.columns)], dtype = 'int64')
+
+        with open(path, 'wb') as bar_file:
+            bar_file.write(header.tobytes())
+            bar_file.truncate(header.nbytes + 8 * capacity * len(self.columns))
+
+    def _open(self) -> None:
+        """Maps the file into memory."""
+
+        self._map = np.memmap(self.path, dtype = 'uint8', mode = 'r+')
+        self._header = np.ndarray(shape = (_HEADER_SIZE,), dtype = 'int64', buffer = self._map)
+
+        if self._header[0] != _MAGIC:
+            raise ValueError("{path} is not a bar file.".format(path = self.path))
+
+    def __len__(self) -> int:
+        return int(self._header[2])
+
+    @property
+    def capacity(self) -> int:
+        """The number of bars the file can hold before it has to grow."""
+
+        return int(self._header[1])
+
+    def _column_view(self, name: str, count: int) -> np.ndarray:
+        """Returns a view of the first `count` values of a column block."""
+
+        offset = 8 * (_HEADER_SIZE + self.capacity * self.columns.index(name))
+        dtype = 'int64' if name == 'datetime' else 'float64'
+
+        return np.ndarray(shape = (count,), dtype = dtype, buffer = self._map, offset = offset)
+
+    def column(self, name: str) -> np.ndarray:
+        """Grabs a read-only view of a column.
+        Arguments:
+        ----
+        name {str} -- The column name, for example `close` or `datetime`.
+        Returns:
+        ----
+        {np.ndarray} -- A zero-copy view over the memory-mapped file.
+        """
+
+        view = self._column_view(name = name, count = len(self))
+        view.flags.writeable = False
+
+        return view
+
+    def _grow(self, capacity: int) -> None:
+        """Rewrites the file with room for `capacity` bars."""
+
+        count = len(self)
+        columns = {name: np.array(self._column_view(name = name, count = count)) for name in self.columns}
+
+        # Unmap the file before it's swapped, Windows won't replace a mapped file. Views
+        # handed out earlier keep the old mapping alive until they are released.
+        self._map.flush()
+        self._map = None
+        self._header = None
+
+        temp_path = self.path + '.tmp'
+        self._create(path = temp_path, capacity = capacity)
+        os.replace(temp_path, self.path)
+        self._open()
+
+        for name in self.columns:
+            self._column_view(name = name, count = count)[:] = columns[name]
+
+        self._header[2] = count
+
+    def append(self, datetime: np.ndarray, columns: Dict[str, np.ndarray]) -> int:
+        """Appends bars to the tail of the file.
+        Overview:
+        ----
+        If a bar shows up twice in the batch the last one wins. A bar with the
+        same timestamp as the last bar in the file replaces it, and bars older
+        than the last bar are skipped since the file is append only.
+        Arguments:
+        ----
+        datetime {np.ndarray} -- The sorted epoch millisecond timestamps of the bars.
+        columns {Dict[str, np.ndarray]} -- The price columns of the bars.
+        Returns:
+        ----
+        {int} -- The number of bars written.
+        """
+
+        datetime = np.asarray(datetime, dtype = 'int64')
+        count = len(self)
+
+        keep = np.ones(len(datetime), dtype = bool)
+        keep[:-1] = datetime[1:] != datetime[:-1]
+
+        if count:
+            last = self._column_view(name = 'datetime', count = count)[-1]
+            keep &= datetime >= last
+
+            # The still forming last bar gets replaced.
+            if keep.any() and datetime[keep][0] == last:
+                count -= 1
+
+        rows = int(keep.sum())
+
+        if count + rows > self.capacity:
+            self._grow(capacity = max(2 * self.capacity, count + rows))
+
+        self._column_view(name = 'datetime', count = count + rows)[count:] = datetime[keep]
+        for name in SymbolBuffer.price_columns:
+            self._column_view(name = name, count = count + rows)[count:] = columns[name][keep]
+
+        self._header[2] = count + rows
+
+        return rows
+
+    def flush(self) -> None:
+        """Flushes the pending writes to disk."""
+
+        self._map.flush()
+
+
+class BarStore():
+
+    """
+    Represents a persistent bar store, holding one memory-mapped
+    columnar `BarFile` per symbol per day under a root directory.
+    """
+
+    def __init__(self, path: str, bars_per_day: int = 1440) -> None:
+        """Initalizes the Bar Store.
+        Arguments:
+        ----
+        path {str} -- The root directory of the store.
+        Keyword Arguments:
+        ----
+        bars_per_day {int} -- The capacity reserved for a new day file. (default: {1440})
+        """
+
+        self.path = path
+        self.bars_per_day = bars_per_day
+        self._files: Dict[tuple, BarFile] = {}
+
+        os.makedirs(path, exist_ok = True)
+
+    @property
+    def symbols(self) -> List[str]:
+        """The symbols held by the store.
+        Returns:
+        ----
+        {List[str]} -- A sorted list of symbols.
+        """
+
+        return sorted(
+            name for name in os.listdir(self.path) if os.path.isdir(os.path.join(self.path, name))
+        )
+
+    def days(self, symbol: str) -> List[str]:
+        """The days stored for a symbol.
+        Arguments:
+        ----
+        symbol {str} -- The symbol to list.
+        Returns:
+        ----
+        {List[str]} -- The sorted `YYYY-MM-DD` days, in UTC.
+        """
+
+        symbol_path = os.path.join(self.path, symbol)
+
+        if not os.path.isdir(symbol_path):
+            return []
+
+        return sorted(name[:-5] for name in os.listdir(symbol_path) if name.endswith('.bars'))
+
+    def bar_file(self, symbol: str, day: str) -> BarFile:
+        """Opens the bar file of a symbol for a day, creating it if needed.
+        Arguments:
+        ----
+        symbol {str} -- The symbol of the file.
+        day {str} -- The `YYYY-MM-DD` day of the file, in UTC.
+        Returns:
+        ----
+        {BarFile} -- The open bar file.
+        """
+
+        key = (symbol, day)
+
+        if key not in self._files:
+            os.makedirs(os.path.join(self.path, symbol), exist_ok = True)
+            self._files[key] = BarFile(
+                path = os.path.join(self.path, symbol, day + '.bars'),
+                capacity = self.bars_per_day
+            )
+
+        return self._files[key]
+
+    def append(self, data: Union[List[Dict], Dict]) -> int:
+        """Appends quotes to the store.
+        Arguments:
+        ----
+        data {Union[List[Dict], Dict]} -- A list of quotes, a single quote, or a
+            dictionary of column arrays.
+        Returns:
+        ----
+        {int} -- The number of bars written.
+        """
+
+        columns = quote_columns(data = data)
+        datetime = np.asarray(columns['datetime'], dtype = 'int64')
+        day_numbers = datetime // _MS_PER_DAY
+
+        # Sort by symbol, then time, so every file gets one sorted block.
+        order = np.lexsort((datetime, columns['symbol']))
+        written = 0
+
+        symbols = columns['symbol'][order]
+        day_numbers = day_numbers[order]
+        boundaries = np.flatnonzero((symbols[1:] != symbols[:-1]) | (day_numbers[1:] != day_numbers[:-1])) + 1
+
+        for rows in np.split(order, boundaries):
+
+            if len(rows) == 0:
+                continue
+
+            day = str(np.datetime64(int(datetime[rows[0]]), 'ms').astype('datetime64[D]'))
+            bar_file = self.bar_file(symbol = str(columns['symbol'][rows[0]]), day = day)
+
+            written += bar_file.append(
+                datetime = datetime[rows],
+                columns = {name: np.asarray(columns[name], dtype = 'float64')[rows] for name in SymbolBuffer.price_columns}
+            )
+
+        return written
+
+    def read(self, symbol: str, start: int = None, end: int = None) -> Dict[str, np.ndarray]:
+        """Reads a symbol's bars between two timestamps.
+        Overview:
+        ----
+        Only the day files overlapping the range are opened and only the rows
+        inside the range are touched. When the range falls in a single day the
+        returned arrays are zero-copy views of the memory-mapped file.
+        Arguments:
+        ----
+        symbol {str} -- The symbol to read.
+        Keyword Arguments:
+        ----
+        start {int} -- The first epoch millisecond timestamp to include. (default: {None})
+        end {int} -- The epoch millisecond timestamp to stop before. (default: {None})
+        Returns:
+        ----
+        {Dict[str, np.ndarray]} -- The `datetime` and price columns.
+        """
+
+        pieces = []
+
+        for day in self.days(symbol = symbol):
+
+            day_start = int(np.datetime64(day, 'D').astype('datetime64[ms]').astype('int64'))
+
+            if start is not None and day_start + _MS_PER_DAY <= start:
+                continue
+            if end is not None and day_start >= end:
+                continue
+
+            bar_file = self.bar_file(symbol = symbol, day = day)
+            datetime = bar_file.column(name = 'datetime')
+
+            first = 0 if start is None else int(np.searchsorted(datetime, start, side = 'left'))
+            last = len(datetime) if end is None else int(np.searchsorted(datetime, end, side = 'left'))
+
+            if last > first:
+                pieces.append({name: bar_file.column(name = name)[first:last] for name in BarFile.columns})
+
+        if len(pieces) == 1:
+            return pieces[0]
+
+        if not pieces:
+            return {name: np.empty(0, dtype = 'int64' if name == 'datetime' else 'float64') for name in BarFile.columns}
+
+        return {name: np.concatenate([piece[name] for piece in pieces]) for name in BarFile.columns}
+
+    def flush(self) -> None:
+        """Flushes every open bar file to disk."""
+
+        for bar_file in self._files.values():
+            bar_file.flush()
@@ -0,0 +1,605 @@
+import numpy as np
+import pandas as pd
+
+from typing import List
+from typing import Dict
+from typing import Union
+
+
+def quote_columns(data: Union[List[Dict], Dict]) -> Dict[str, np.ndarray]:
+    """Converts quotes into one NumPy array per column.
+    Arguments:
+    ----
+    data {Union[List[Dict], Dict]} -- Either a list of quotes, a single quote, or a
+        dictionary of column arrays keyed by `symbol`, `datetime` and the price columns.
+    Returns:
+    ----
+    {Dict[str, np.ndarray]} -- The `symbol`, `datetime` and price columns as arrays.
+    """
+
+    column_names = ['symbol', 'datetime'] + SymbolBuffer.price_columns
+
+    if isinstance(data, dict):
+
+        # A single quote has scalar values.
+        if isinstance(data['symbol'], str):
+            data = [data]
+        else:
+            return {name: np.asarray(data[name]) for name in column_names}
+
+    return {name: np.array([quote[name] for quote in data]) for name in column_names}
+
+
+class SymbolBuffer():
+
+    """
+    Represents the price history of a single symbol stored as
+    preallocated NumPy column arrays which grow geometrically,
+    along with the indicator output columns computed for it.
+    """
+
+    price_columns = ['open', 'close', 'high', 'low', 'volume']
+
+    default_dtypes = {
+        'open': 'float64',
+        'close': 'float64',
+        'high': 'float64',
+        'low': 'float64',
+        'volume': 'float64'
+    }
+
+    compact_dtypes = {
+        'open': 'float32',
+        'close': 'float32',
+        'high': 'float32',
+        'low': 'float32',
+        'volume': 'uint64'
+    }
+
+    def __init__(self, symbol: str, capacity: int = 256, compact: bool = False) -> None:
+        """Initalizes the Symbol Buffer.
+        Arguments:
+        ----
+        symbol {str} -- The symbol the buffer holds bars for.
+        Keyword Arguments:
+        ----
+        capacity {int} -- The number of bars to preallocate. (default: {256})
+        compact {bool} -- Store prices as `float32` and volume as `uint64`. (default: {False})
+        """
+
+        self.symbol = symbol
+        self._dtypes = self.compact_dtypes if compact else self.default_dtypes
+        self._capacity = max(int(capacity), 1)
+        self._start = 0
+        self._end = 0
+        self._shared = False
+
+        self._datetime = np.empty(self._capacity, dtype = 'int64')
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.empty(self._capacity, dtype = self._dtypes[name]) for name in self.price_columns
+        }
+        self._outputs: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def datetime(self) -> np.ndarray:
+        """The epoch millisecond timestamps held by the buffer.
+        Returns:
+        ----
+        {np.ndarray} -- A view of the used part of the timestamp array.
+        """
+
+        return self._datetime[self._start:self._end]
+
+    def column(self, name: str) -> np.ndarray:
+        """Grabs a price column.
+        Arguments:
+        ----
+        name {str} -- The column name, for example `close`.
+        Returns:
+        ----
+        {np.ndarray} -- A view of the used part of the column array.
+        """
+
+        return self._columns[name][self._start:self._end]
+
+    @property
+    def output_names(self) -> List[str]:
+        """The names of the output columns held by the buffer.
+        Returns:
+        ----
+        {List[str]} -- The output column names, in the order they were added.
+        """
+
+        return list(self._outputs)
+
+    def has_output(self, name: str) -> bool:
+        """Checks if the buffer holds an output column."""
+
+        return name in self._outputs
+
+    def output(self, name: str, dtype: str = 'float64') -> np.ndarray:
+        """Grabs a writable output column, adding it if it doesn't exist.
+        Overview:
+        ----
+        Output columns share the layout of the price columns, so they move
+        along with the bars when the buffer grows, inserts a late bar or
+        evicts its head. A new column, and the slots of new bars, hold `NaN`.
+        Arguments:
+        ----
+        name {str} -- The output column name.
+        Keyword Arguments:
+        ----
+        dtype {str} -- The dtype of a newly added column, anything that can't hold
+            `NaN` is kept as `object`. (default: {'float64'})
+        Returns:
+        ----
+        {np.ndarray} -- A writable view of the used part of the column array.
+        """
+
+        if name not in self._outputs:
+            dtype = np.dtype(dtype)
+            self._outputs[name] = np.full(self._capacity, np.nan, dtype = dtype if dtype.kind in 'fc' else object)
+
+        return self._outputs[name][self._start:self._end]
+
+    def drop_output(self, name: str) -> None:
+        """Removes an output column from the buffer."""
+
+        self._outputs.pop(name, None)
+
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        """Every column array of the buffer, outputs included, keyed by name."""
+
+        return {**self._columns, **self._outputs}
+
+    def _clear_outputs(self, start: int, end: int) -> None:
+        """Fills the output slots of new bars with `NaN`."""
+
+        for column in self._outputs.values():
+            column[start:end] = np.nan
+
+    def adopt(self, datetime: np.ndarray, columns: Dict[str, np.ndarray]) -> None:
+        """Points the buffer at existing arrays without copying them.
+        Overview:
+        ----
+        This is used to open a buffer on top of read-only views, for example
+        the memory-mapped columns of a `BarStore`. The arrays are only copied
+        into memory owned by the buffer when the first bar is written.
+        Arguments:
+        ----
+        datetime {np.ndarray} -- The epoch millisecond timestamps of the bars.
+        columns {Dict[str, np.ndarray]} -- The price columns of the bars.
+        """
+
+        self._datetime = datetime
+        self._columns = {name: columns[name] for name in self.price_columns}
+        self._outputs = {}
+        self._capacity = len(datetime)
+        self._start = 0
+        self._end = len(datetime)
+        self._shared = True
+
+    def _unshare(self) -> None:
+        """Copies adopted arrays into memory owned by the buffer."""
+
+        if not self._shared:
+            return
+
+        size = len(self)
+        capacity = max(2 * size, 1)
+
+        datetime = np.empty(capacity, dtype = 'int64')
+        datetime[:size] = self.datetime
+        self._columns = {
+            name: np.concatenate((self.column(name), np.empty(capacity - size, dtype = self.column(name).dtype)))
+            for name in self.price_columns
+        }
+        self._outputs = {
+            name: np.concatenate((self.output(name), np.full(capacity - size, np.nan, dtype = column.dtype)))
+            for name, column in self._outputs.items()
+        }
+
+        self._datetime = datetime
+        self._capacity = capacity
+        self._start = 0
+        self._end = size
+        self._shared = False
+
+    def _reserve(self, extra: int) -> None:
+        """Makes room for `extra` more bars at the tail of the buffer.
+        Overview:
+        ----
+        If the free space at the tail is too small the live bars are first
+        moved back to the front of the arrays, and only when that is not
+        enough are the arrays reallocated at (at least) twice the size. This
+        keeps appends amortized O(1).
+        Arguments:
+        ----
+        extra {int} -- The number of bars that are about to be added.
+        """
+
+        if self._end + extra <= self._capacity:
+            return
+
+        size = len(self)
+
+        if size + extra <= self._capacity and self._start >= self._capacity // 2:
+            new_capacity = self._capacity
+        else:
+            new_capacity = max(self._capacity * 2, size + extra)
+
+        if new_capacity == self._capacity:
+            self._datetime[:size] = self._datetime[self._start:self._end]
+            for column in self._arrays().values():
+                column[:size] = column[self._start:self._end]
+        else:
+            datetime = np.empty(new_capacity, dtype = 'int64')
+            datetime[:size] = self._datetime[self._start:self._end]
+            self._datetime = datetime
+
+            for name, old_column in self._arrays().items():
+                column = np.empty(new_capacity, dtype = old_column.dtype)
+                column[:size] = old_column[self._start:self._end]
+
+                if name in self._outputs:
+                    self._outputs[name] = column
+                else:
+                    self._columns[name] = column
+
+            self._capacity = new_capacity
+
+        self._start = 0
+        self._end = size
+
+    def append(self, quote: Dict, max_late_bars: int = None) -> str:
+        """Upserts a single quote into the buffer.
+        Overview:
+        ----
+        Quotes newer than the last bar are appended in amortized O(1), and a
+        quote for the last bar (the still forming candle) replaces it in O(1).
+        An older quote is looked up with a binary search and either replaces
+        the bar with the same timestamp or is inserted at its sorted position.
+        Arguments:
+        ----
+        quote {Dict} -- A quote with a `datetime` (epoch ms) and the price columns.
+        Keyword Arguments:
+        ----
+        max_late_bars {int} -- Only search this many bars back from the tail, older
+            quotes are dropped. No limit if not set. (default: {None})
+        Returns:
+        ----
+        {str} -- One of `'inserted'`, `'updated'` or `'dropped'`.
+        """
+
+        self._unshare()
+
+        time_stamp = int(quote['datetime'])
+        status = 'inserted'
+
+        if len(self) and time_stamp <= self._datetime[self._end - 1]:
+
+            if time_stamp == self._datetime[self._end - 1]:
+                position = self._end - 1
+                status = 'updated'
+            else:
+                low = self._start if max_late_bars is None else max(self._start, self._end - max_late_bars)
+
+                if time_stamp < self._datetime[low]:
+                    if low > self._start:
+                        return 'dropped'
+                    position = low
+                else:
+                    position = low + int(np.searchsorted(self._datetime[low:self._end], time_stamp))
+
+                if self._datetime[position] == time_stamp:
+                    status = 'updated'
+                else:
+                    offset = position - self._start
+                    self._reserve(extra = 1)
+                    position = self._start + offset
+                    self._shift_tail(position = position)
+                    self._datetime[position] = time_stamp
+                    self._clear_outputs(start = position, end = position + 1)
+        else:
+            self._reserve(extra = 1)
+            position = self._end
+            self._datetime[position] = time_stamp
+            self._clear_outputs(start = position, end = position + 1)
+            self._end += 1
+
+        for name in self.price_columns:
+            self._columns[name][position] = quote[name]
+
+        return status
+
+    def extend(self, datetime: np.ndarray, columns: Dict[str, np.ndarray], max_late_bars: int = None) -> Dict[str, int]:
+        """Adds a block of bars to the buffer.
+        Overview:
+        ----
+        A block that is sorted and newer than the last bar is copied in with
+        one slice assignment per column, anything else falls back to `append`.
+        Arguments:
+        ----
+        datetime {np.ndarray} -- The epoch millisecond timestamps of the bars.
+        columns {Dict[str, np.ndarray]} -- The price columns of the bars.
+        Keyword Arguments:
+        ----
+        max_late_bars {int} -- How far back from the tail late bars are merged,
+            see `append`. (default: {None})
+        Returns:
+        ----
+        {Dict[str, int]} -- The number of bars `inserted`, `updated` and `dropped`.
+        """
+
+        count = len(datetime)
+        report = {'inserted': 0, 'updated': 0, 'dropped': 0}
+
+        if count == 0:
+            return report
+
+        self._unshare()
+
+        in_order = count == 1 or bool((datetime[1:] > datetime[:-1]).all())
+
+        if in_order and (len(self) == 0 or datetime[0] > self._datetime[self._end - 1]):
+            self._reserve(extra = count)
+            self._datetime[self._end:self._end + count] = datetime
+            for name in self.price_columns:
+                self._columns[name][self._end:self._end + count] = columns[name]
+            self._clear_outputs(start = self._end, end = self._end + count)
+            self._end += count
+            report['inserted'] = count
+            return report
+
+        for row in range(count):
+            quote = {name: columns[name][row] for name in self.price_columns}
+            quote['datetime'] = datetime[row]
+            report[self.append(quote = quote, max_late_bars = max_late_bars)] += 1
+
+        return report
+
+    def drop_head(self, count: int) -> None:
+        """Evicts the oldest bars from the buffer in O(1).
+        Overview:
+        ----
+        The head offset is simply moved forward, the freed slots are reused
+        the next time the buffer has to make room at the tail.
+        Arguments:
+        ----
+        count {int} -- The number of bars to evict.
+        """
+
+        self._start += min(max(int(count), 0), len(self))
+
+    def _shift_tail(self, position: int) -> None:
+        """Moves every bar from `position` onwards one slot towards the tail."""
+
+        self._datetime[position + 1:self._end + 1] = self._datetime[position:self._end]
+        for column in self._arrays().values():
+            column[position + 1:self._end + 1] = column[position:self._end]
+
+        self._end += 1
+
+
+class ColumnStore():
+
+    """
+    Represents a collection of `SymbolBuffer` objects, one for
+    each symbol, used as the columnar backend of a StockFrame.
+    """
+
+    def __init__(self, capacity: int = 256, compact: bool = False) -> None:
+        """Initalizes the Column Store.
+        Keyword Arguments:
+        ----
+        capacity {int} -- The initial number of bars preallocated for a new symbol. (default: {256})
+        compact {bool} -- Store prices as `float32`, volume as `uint64` and leave the
+            timestamps as epoch milliseconds in the frame. (default: {False})
+        """
+
+        self._capacity = capacity
+        self._compact = compact
+        self._buffers: Dict[str, SymbolBuffer] = {}
+        self._outputs: Dict[str, np.dtype] = {}
+
+    @property
+    def symbols(self) -> List[str]:
+        """The symbols held by the store, in sorted order.
+        Returns:
+        ----
+        {List[str]} -- A list of symbols.
+        """
+
+        return sorted(self._buffers)
+
+    def has_symbol(self, symbol: str) -> bool:
+        """Checks if the store holds bars for a symbol.
+        Arguments:
+        ----
+        symbol {str} -- The symbol to check.
+        Returns:
+        ----
+        {bool} -- `True` if the symbol has at least one bar.
+        """
+
+        return symbol in self._buffers and len(self._buffers[symbol]) > 0
+
+    def positions(self) -> Dict[str, tuple]:
+        """Returns the `(start, end)` rows each symbol takes up in `to_frame`.
+        Returns:
+        ----
+        {Dict[str, tuple]} -- The row positions keyed by symbol.
+        """
+
+        positions = {}
+        start = 0
+
+        for symbol in self.symbols:
+            size = len(self._buffers[symbol])
+            if size:
+                positions[symbol] = (start, start + size)
+                start += size
+
+        return positions
+
+    def buffer(self, symbol: str) -> SymbolBuffer:
+        """Grabs the buffer for a symbol, creating it if it doesn't exist.
+        Arguments:
+        ----
+        symbol {str} -- The symbol to grab the buffer for.
+        Returns:
+        ----
+        {SymbolBuffer} -- The symbol's buffer.
+        """
+
+        if symbol not in self._buffers:
+            self._buffers[symbol] = SymbolBuffer(
+                symbol = symbol,
+                capacity = self._capacity,
+                compact = self._compact
+            )
+
+        return self._buffers[symbol]
+
+    @property
+    def output_names(self) -> List[str]:
+        """The output columns held by the store, in the order they were added.
+        Returns:
+        ----
+        {List[str]} -- The output column names.
+        """
+
+        return list(self._outputs)
+
+    def output(self, symbol: str, name: str, dtype: str = 'float64') -> np.ndarray:
+        """Grabs a writable output column of a symbol, adding it if it doesn't exist.
+        Arguments:
+        ----
+        symbol {str} -- The symbol to grab the output for.
+        name {str} -- The output column name.
+        Keyword Arguments:
+        ----
+        dtype {str} -- The dtype of a newly added column. (default: {'float64'})
+        Returns:
+        ----
+        {np.ndarray} -- A writable view into the symbol's buffer, see `SymbolBuffer.output`.
+        """
+
+        view = self.buffer(symbol = symbol).output(name = name, dtype = self._outputs.get(name, dtype))
+        self._outputs.setdefault(name, view.dtype)
+
+        return view
+
+    def drop_output(self, name: str) -> None:
+        """Removes an output column from every buffer."""
+
+        self._outputs.pop(name, None)
+
+        for buffer in self._buffers.values():
+            buffer.drop_output(name = name)
+
+    def add_rows(self, data: Union[List[Dict], Dict]) -> Dict[str, int]:
+        """Adds quotes to the store.
+        Arguments:
+        ----
+        data {Union[List[Dict], Dict]} -- A list of quotes or a dictionary of column arrays.
+        Returns:
+        ----
+        {Dict[str, int]} -- The number of bars `inserted`, `updated` and `dropped`.
+        """
+
+        return self.add_columns(columns = quote_columns(data = data))
+
+    def add_columns(self, columns: Dict[str, np.ndarray], max_late_bars: int = None) -> Dict[str, int]:
+        """Adds column arrays for many symbols to the store.
+        Overview:
+        ----
+        The rows are grouped by symbol with one stable sort, and each
+        symbol's block is handed to its buffer in a single call.
+        Arguments:
+        ----
+        columns {Dict[str, np.ndarray]} -- The `symbol`, `datetime` and price columns.
+        Keyword Arguments:
+        ----
+        max_late_bars {int} -- How far back from the tail late bars are merged,
+            see `SymbolBuffer.append`. (default: {None})
+        Returns:
+        ----
+        {Dict[str, int]} -- The number of bars `inserted`, `updated` and `dropped`.
+        """
+
+        symbols = np.asarray(columns['symbol'])
+        report = {'inserted': 0, 'updated': 0, 'dropped': 0}
+
+        if len(symbols) == 0:
+            return report
+
+        order = np.argsort(symbols, kind = 'stable')
+        sorted_symbols = symbols[order]
+        boundaries = np.flatnonzero(sorted_symbols[1:] != sorted_symbols[:-1]) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(symbols)]))
+
+        datetime = np.asarray(columns['datetime'], dtype = 'int64')[order]
+        prices = {name: np.asarray(columns[name])[order] for name in SymbolBuffer.price_columns}
+
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            symbol_report = self.buffer(symbol = str(sorted_symbols[start])).extend(
+                datetime = datetime[start:end],
+                columns = {name: values[start:end] for name, values in prices.items()},
+                max_late_bars = max_late_bars
+            )
+
+            for status, count in symbol_report.items():
+                report[status] += count
+
+        return report
+
+    def to_frame(self) -> pd.DataFrame:
+        """Builds a multi-index data frame from the buffers.
+        Overview:
+        ----
+        The output columns are included, `NaN` for the symbols they were never
+        written for. The index is put together from integer codes, so the
+        timestamps are only factorized once.
+        Returns:
+        ----
+        {pd.DataFrame} -- A data frame indexed by `symbol` and `datetime`.
+        """
+
+        symbols = [symbol for symbol in self.symbols if len(self._buffers[symbol])]
+        buffers = [self._buffers[symbol] for symbol in symbols]
+        lengths = [len(buffer) for buffer in buffers]
+
+        if buffers:
+            datetime = np.concatenate([buffer.datetime for buffer in buffers])
+            columns = {
+                name: np.concatenate([buffer.column(name) for buffer in buffers])
+                for name in SymbolBuffer.price_columns
+            }
+            for name, dtype in self._outputs.items():
+                columns[name] = np.concatenate([buffer.output(name = name, dtype = dtype) for buffer in buffers])
+        else:
+            datetime = np.empty(0, dtype = 'int64')
+            dtypes = SymbolBuffer.compact_dtypes if self._compact else SymbolBuffer.default_dtypes
+            columns = {name: np.empty(0, dtype = dtypes[name]) for name in SymbolBuffer.price_columns}
+            for name, dtype in self._outputs.items():
+                columns[name] = np.empty(0, dtype = dtype)
+
+        # Build both levels straight from integer codes.
+        datetime_codes, datetime_level = pd.factorize(datetime, sort = True)
+
+        if not self._compact:
+            datetime_level = pd.DatetimeIndex(datetime_level.astype('datetime64[ms]'))
+
+        index = pd.MultiIndex(
+            levels = [pd.CategoricalIndex(symbols, categories = symbols), datetime_level],
+            codes = [np.repeat(np.arange(len(symbols)), lengths), datetime_codes],
+            names = ['symbol', 'datetime'],
+            verify_integrity = False
+        )
+
+        return pd.DataFrame(data = columns, index = index, copy = False)
@@ -0,0 +1,466 @@
+"""
+A small expression language for custom indicators, for example
+`ema(close, 12) - ema(close, 26)` or `rolling_sum(volume, 20)`.
+
+An expression is compiled once into an `ExpressionPlan`: a list of
+nodes where every shared subexpression appears once, windowed steps
+run as segmented kernels over every symbol at once, and each run of
+elementwise arithmetic between them is fused into one step evaluated
+into a few reused buffers. The same plan runs in batch over a whole
+StockFrame and in streaming mode one bar at a time.
+"""
+
+import ast
+import functools
+
+import numpy as np
+
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Union
+
+from Objects import Kernels
+from Objects.ColumnStore import SymbolBuffer
+
+# Elementwise operations, by node kind.
+ELEMENTWISE = {
+    'add': np.add,
+    'sub': np.subtract,
+    'mul': np.multiply,
+    'div': np.true_divide,
+    'pow': np.power,
+    'neg': np.negative,
+    'abs': np.absolute,
+    'sqrt': np.sqrt,
+    'log': np.log,
+    'exp': np.exp,
+    'minimum': np.minimum,
+    'maximum': np.maximum,
+    'gt': np.greater,
+    'ge': np.greater_equal,
+    'lt': np.less,
+    'le': np.less_equal
+}
+
+# Operations whose operands can be swapped, so `a + b` and `b + a` are one node.
+COMMUTATIVE = {'add', 'mul', 'minimum', 'maximum'}
+
+# Windowed operations, by node kind, with the segmented kernel computing each.
+WINDOWED = {
+    'rolling_sum': Kernels.rolling_sum,
+    'rolling_mean': Kernels.rolling_mean,
+    'rolling_std': Kernels.rolling_std,
+    'rolling_max': Kernels.rolling_max,
+    'rolling_min': Kernels.rolling_min,
+    'ewm': Kernels.ewm_mean,
+    'shift': Kernels.shift
+}
+
+# The functions an expression can call, and the node kind each maps to.
+FUNCTIONS = {
+    'rolling_sum': 'rolling_sum',
+    'rolling_mean': 'rolling_mean',
+    'sma': 'rolling_mean',
+    'rolling_std': 'rolling_std',
+    'rolling_max': 'rolling_max',
+    'highest': 'rolling_max',
+    'rolling_min': 'rolling_min',
+    'lowest': 'rolling_min',
+    'ema': 'ewm',
+    'ewm': 'ewm',
+    'shift': 'shift',
+    'lag': 'shift',
+    'abs': 'abs',
+    'sqrt': 'sqrt',
+    'log': 'log',
+    'exp': 'exp',
+    'min': 'minimum',
+    'max': 'maximum'
+}
+
+OPERATORS = {
+    ast.Add: 'add',
+    ast.Sub: 'sub',
+    ast.Mult: 'mul',
+    ast.Div: 'div',
+    ast.Pow: 'pow',
+    ast.Gt: 'gt',
+    ast.GtE: 'ge',
+    ast.Lt: 'lt',
+    ast.LtE: 'le'
+}
+
+# A node is `(kind, inputs, params)`, its inputs being the positions of other nodes.
+Node = Tuple[str, Tuple[int, ...], Tuple]
+
+# An operand of a fused instruction: `('node', position)`, `('register', number)` or `('constant', value)`.
+Operand = Tuple[str, Union[int, float]]
+
+
+class ExpressionPlan():
+
+    """
+    Represents compiled indicator expressions, as the nodes they need in
+    evaluation order and the steps that run them.
+    """
+
+    def __init__(self, expressions: Dict[str, str]) -> None:
+        """Initalizes the Expression Plan.
+        Arguments:
+        ----
+        expressions {Dict[str, str]} -- The expressions to compile, keyed by the
+            column each one writes to. Subexpressions they share are computed once.
+        Usage:
+        ----
+            >>> plan = ExpressionPlan(expressions={'macd': 'ema(close, 12) - ema(close, 26)'})
+            >>> plan.inputs
+            ('close',)
+        """
+
+        self.nodes: List[Node] = []
+        self._positions: Dict[Node, int] = {}
+
+        self.outputs: Dict[str, int] = {
+            column: self._parse(text = expression) for column, expression in expressions.items()
+        }
+
+        for column, position in self.outputs.items():
+            if self.nodes[position][0] == 'constant':
+                raise ValueError("The expression of {column} does not read any price column.".format(column = column))
+
+        self.inputs: Tuple[str, ...] = tuple(
+            column for column in SymbolBuffer.price_columns if ('price', (), (column,)) in self._positions
+        )
+        self.steps = self._plan_steps()
+
+    def _parse(self, text: str) -> int:
+        """Parses an expression into nodes, returning the position of its result."""
+
+        try:
+            tree = ast.parse(text.strip(), mode = 'eval')
+        except SyntaxError as error:
+            raise ValueError("Invalid expression {text!r}: {error}".format(text = text, error = error.msg))
+
+        return self._visit(item = tree.body, text = text)
+
+    def _visit(self, item: ast.AST, text: str) -> int:
+        """Turns one syntax tree item into a node."""
+
+        if isinstance(item, ast.Name):
+            if item.id not in SymbolBuffer.price_columns:
+                raise ValueError("Unknown column {name} in {text!r}.".format(name = item.id, text = text))
+            return self._add(node = ('price', (), (item.id,)))
+
+        if isinstance(item, ast.Constant) and isinstance(item.value, (int, float)) and not isinstance(item.value, bool):
+            return self._add(node = ('constant', (), (float(item.value),)))
+
+        if isinstance(item, ast.UnaryOp) and isinstance(item.op, (ast.USub, ast.UAdd)):
+            operand = self._visit(item = item.operand, text = text)
+            return operand if isinstance(item.op, ast.UAdd) else self._add(node = ('neg', (operand,), ()))
+
+        if isinstance(item, ast.BinOp) and type(item.op) in OPERATORS:
+            return self._add(node = (
+                OPERATORS[type(item.op)],
+                (self._visit(item = item.left, text = text), self._visit(item = item.right, text = text)),
+                ()
+            ))
+
+        if isinstance(item, ast.Compare) and len(item.ops) == 1 and type(item.ops[0]) in OPERATORS:
+            return self._add(node = (
+                OPERATORS[type(item.ops[0])],
+                (self._visit(item = item.left, text = text), self._visit(item = item.comparators[0], text = text)),
+                ()
+            ))
+
+        if isinstance(item, ast.Call) and isinstance(item.func, ast.Name) and not item.keywords:
+            return self._visit_call(name = item.func.id, arguments = item.args, text = text)
+
+        raise ValueError("Unsupported syntax {part!r} in {text!r}.".format(part = ast.unparse(item), text = text))
+
+    def _visit_call(self, name: str, arguments: List[ast.AST], text: str) -> int:
+        """Turns a function call into a node, spelling `diff` and `pct_change` with `shift`."""
+
+        if name in ('diff', 'pct_change') and len(arguments) in (1, 2):
+            source = self._series(item = arguments[0], name = name, text = text)
+            periods = self._window_argument(arguments = arguments[1:], default = 1, name = name, text = text)
+            lagged = self._add(node = ('shift', (source,), (periods,)))
+
+            if name == 'diff':
+                return self._add(node = ('sub', (source, lagged), ()))
+
+            ratio = self._add(node = ('div', (source, lagged), ()))
+            return self._add(node = ('sub', (ratio, self._add(node = ('constant', (), (1.0,)))), ()))
+
+        kind = FUNCTIONS.get(name)
+
+        if kind is None:
+            raise ValueError("Unknown function {name} in {text!r}.".format(name = name, text = text))
+
+        if kind in WINDOWED:
+            if len(arguments) not in (1, 2) or (len(arguments) == 1 and kind != 'shift'):
+                raise ValueError("{name} takes a series and a window in {text!r}.".format(name = name, text = text))
+
+            source = self._series(item = arguments[0], name = name, text = text)
+            window = self._window_argument(arguments = arguments[1:], default = 1, name = name, text = text)
+
+            return self._add(node = (kind, (source,), (window,)))
+
+        arity = 2 if kind in ('minimum', 'maximum') else 1
+
+        if len(arguments) != arity:
+            raise ValueError("{name} takes {arity} argument(s) in {text!r}.".format(name = name, arity = arity, text = text))
+
+        return self._add(node = (kind, tuple(self._visit(item = argument, text = text) for argument in arguments), ()))
+
+    def _series(self, item: ast.AST, name: str, text: str) -> int:
+        """Turns the series argument of a windowed function into a node, which cannot be a constant."""
+
+        source = self._visit(item = item, text = text)
+
+        if self.nodes[source][0] == 'constant':
+            raise ValueError("{name} needs a price series in {text!r}.".format(name = name, text = text))
+
+        return source
+
+    def _window_argument(self, arguments: List[ast.AST], default: int, name: str, text: str) -> int:
+        """Reads the window, span or periods argument, which has to be a positive whole number."""
+
+        if not arguments:
+            return default
+
+        item = arguments[0]
+
+        if isinstance(item, ast.Constant) and isinstance(item.value, int) and not isinstance(item.value, bool) and item.value > 0:
+            return item.value
+
+        raise ValueError("The window of {name} must be a positive integer in {text!r}.".format(name = name, text = text))
+
+    def _add(self, node: Node) -> int:
+        """Adds a node unless an identical one exists, folding constant arithmetic."""
+
+        kind, inputs, params = node
+
+        if kind in ELEMENTWISE and all(self.nodes[position][0] == 'constant' for position in inputs):
+            with np.errstate(all = 'ignore'):
+                value = ELEMENTWISE[kind](*[self.nodes[position][2][0] for position in inputs])
+            node = ('constant', (), (float(value),))
+        elif kind in COMMUTATIVE:
+            node = (kind, tuple(sorted(inputs)), params)
+
+        if node not in self._positions:
+            self._positions[node] = len(self.nodes)
+            self.nodes.append(node)
+
+        return self._positions[node]
+
+    def _plan_steps(self) -> List[Tuple]:
+        """Groups the nodes into the steps that run them.
+        Overview:
+        ----
+        A price or a windowed node is a step of its own. An elementwise node
+        used by exactly one other elementwise node, and not an output, is
+        inlined into it, so each connected run of arithmetic becomes a single
+        `fused` step: a list of ufunc instructions writing into registers,
+        a register being handed on as soon as its value was last read.
+        """
+
+        uses = [0] * len(self.nodes)
+        users: List[List[int]] = [[] for _ in self.nodes]
+
+        for position, (kind, inputs, params) in enumerate(self.nodes):
+            for source in inputs:
+                uses[source] += 1
+                users[source].append(position)
+
+        outputs = set(self.outputs.values())
+
+        def inlined(position: int) -> bool:
+            return (
+                self.nodes[position][0] in ELEMENTWISE and position not in outputs and uses[position] == 1
+                and self.nodes[users[position][0]][0] in ELEMENTWISE
+            )
+
+        steps = []
+
+        for position, (kind, inputs, params) in enumerate(self.nodes):
+
+            if kind == 'constant' or inlined(position = position):
+                continue
+
+            if kind == 'price':
+                steps.append(('price', position, params[0]))
+            elif kind in WINDOWED:
+                steps.append(('window', position, kind, inputs[0], params[0]))
+            else:
+                program, registers = self._fuse(root = position, inlined = inlined)
+                steps.append(('fused', position, program, registers))
+
+        return steps
+
+    def _fuse(self, root: int, inlined: Callable[[int], bool]) -> Tuple[List[Tuple], int]:
+        """Compiles the elementwise tree under `root` into ufunc instructions.
+        Returns:
+        ----
+        {Tuple[List[Tuple], int]} -- The `(ufunc, operands, register)` instructions,
+            the last one writing the result, and the number of registers used.
+        """
+
+        program = []
+        free: List[int] = []
+        registers = 0
+
+        def emit(position: int) -> Operand:
+
+            nonlocal registers
+
+            kind, inputs, params = self.nodes[position]
+
+            if kind == 'constant':
+                return ('constant', params[0])
+            if position != root and not inlined(position = position):
+                return ('node', position)
+
+            operands = [emit(position = source) for source in inputs]
+
+            # The operands are read before the result is written, so their registers can take it.
+            for operand in operands:
+                if operand[0] == 'register':
+                    free.append(operand[1])
+
+            if free:
+                free.sort()
+                register = free.pop(0)
+            else:
+                register = registers
+                registers += 1
+
+            program.append((ELEMENTWISE[kind], tuple(operands), register))
+
+            return ('register', register)
+
+        emit(position = root)
+
+        return program, registers
+
+    @property
+    def warmup(self) -> Union[int, None]:
+        """The bars before a wanted bar the outputs need to be exact, `None` if they need every bar."""
+
+        if any(kind == 'ewm' for kind, inputs, params in self.nodes):
+            return None
+
+        return self._chain(spans = False)
+
+    @property
+    def lookback(self) -> int:
+        """The longest chain of windows and spans the outputs are built from, in bars."""
+
+        return self._chain(spans = True)
+
+    def _chain(self, spans: bool) -> int:
+        """Adds up the windows along the longest path to any output, counting spans if asked to."""
+
+        bars = []
+
+        for kind, inputs, params in self.nodes:
+
+            before = max((bars[source] for source in inputs), default = 0)
+
+            if kind == 'shift' or (kind == 'ewm' and spans):
+                before += params[0]
+            elif kind in WINDOWED and kind != 'ewm':
+                before += params[0] - 1
+
+            bars.append(before)
+
+        return max(bars[position] for position in self.outputs.values())
+
+    def run(self, price: Callable[[str], np.ndarray], window: Callable[[int, np.ndarray], np.ndarray]) -> Dict[str, np.ndarray]:
+        """Runs the steps and returns the outputs.
+        Arguments:
+        ----
+        price {Callable[[str], np.ndarray]} -- Grabs a price column.
+        window {Callable[[int, np.ndarray], np.ndarray]} -- Computes a windowed node
+            from its position and the values of its source.
+        Returns:
+        ----
+        {Dict[str, np.ndarray]} -- The values of every expression, keyed by column.
+        """
+
+        values: Dict[int, np.ndarray] = {}
+
+        for step in self.steps:
+
+            if step[0] == 'price':
+                values[step[1]] = price(step[2])
+            elif step[0] == 'window':
+                values[step[1]] = window(step[1], values[step[3]])
+            else:
+                values[step[1]] = self._run_fused(program = step[2], registers = step[3], values = values)
+
+        return {column: values[position] for column, position in self.outputs.items()}
+
+    def _run_fused(self, program: List[Tuple], registers: int, values: Dict[int, np.ndarray]) -> np.ndarray:
+        """Runs the instructions of a fused step into freshly allocated registers."""
+
+        size = len(next(iter(values.values())))
+        buffers = [np.empty(size) for _ in range(registers)]
+
+        def read(operand: Operand) -> Union[np.ndarray, float]:
+            if operand[0] == 'node':
+                return values[operand[1]]
+            if operand[0] == 'register':
+                return buffers[operand[1]]
+            return operand[1]
+
+        with np.errstate(all = 'ignore'):
+            for ufunc, operands, register in program:
+                ufunc(*[read(operand = operand) for operand in operands], out = buffers[register])
+
+        return buffers[program[-1][2]]
+
+    def evaluate(self, graph) -> Dict[str, np.ndarray]:
+        """Runs the plan in batch over every row of an IndicatorGraph's frame.
+        Overview:
+        ----
+        Windows over a price column are taken from the graph, so they are
+        shared with the built-in indicators and other expressions. Windows
+        over a computed series run the segmented kernel directly.
+        Arguments:
+        ----
+        graph {IndicatorGraph} -- The graph of the frame, or of a slice of it.
+        Returns:
+        ----
+        {Dict[str, np.ndarray]} -- The values of every expression, keyed by column.
+        """
+
+        def window(position: int, values: np.ndarray) -> np.ndarray:
+
+            kind, inputs, params = self.nodes[position]
+            source = self.nodes[inputs[0]]
+
+            if source[0] == 'price':
+                return graph.node(key = (kind, source[2][0], params[0]))
+
+            return WINDOWED[kind](values, graph.offsets, params[0])
+
+        return self.run(price = lambda column: graph.node(key = column), window = window)
+
+
+@functools.lru_cache(maxsize = 256)
+def compile_expression(expression: str, column_name: str = 'expression') -> ExpressionPlan:
+    """Compiles one expression, reusing the plan of an expression compiled before.
+    Arguments:
+    ----
+    expression {str} -- The expression, for example `ema(close, 12) - ema(close, 26)`.
+    Keyword Arguments:
+    ----
+    column_name {str} -- The column the expression writes to. (default: {'expression'})
+    Returns:
+    ----
+    {ExpressionPlan} -- The compiled plan.
+    """
+
+    return ExpressionPlan(expressions = {column_name: expression})
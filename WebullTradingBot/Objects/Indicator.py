@@ -1,11 +1,58 @@
+import os
+import operator
+import inspect
+import functools
+import threading
+
 import numpy as np
 import pandas as pd
 
 from typing import Any
 from typing import Dict
+from typing import List
+from typing import Tuple
 from typing import Union
 
+from concurrent.futures import ThreadPoolExecutor
+
 from Objects.StockFrame import StockFrame
+from Objects.Streaming import StreamingEngine
+from Objects import Kernels
+from Objects.IndicatorGraph import FrameSlice
+from Objects.IndicatorGraph import IndicatorGraph
+from Objects.IndicatorCache import IndicatorCache
+from Objects.IndicatorCache import normalize_args
+from Objects.Expression import compile_expression
+from Objects.ColumnStore import SymbolBuffer
+from Utils.AsyncProcessing import ShardPool
+
+
+def memoized(method):
+    """Serves repeated indicator calls from the result cache of the `Indicators` object,
+    or only declares the indicator when the object is lazy."""
+
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+
+        # Without a cache the `pandas` frame is written in place, the `columnar`
+        # buffers still go through the outputs so the frame is not built.
+        if self._computing or (self._cache is None and not self._lazy and self._stock_frame.backend == 'pandas'):
+            return method(self, *args, **kwargs)
+
+        arguments = signature.bind(self, *args, **kwargs)
+        arguments.apply_defaults()
+        arguments = dict(arguments.arguments)
+        del arguments['self']
+
+        if self._lazy:
+            return self._declare(method = method, arguments = arguments)
+
+        return self._memoized_call(method = method, arguments = arguments)
+
+    return wrapper
+
 
 class Indicators():
 
@@ -13,13 +60,55 @@ class Indicators():
     Represents an Indicator Object which can be used
     to easily add technical indicators to a StockFrame.
     """    
+
+    # Indicators which never look across symbols, so they can be computed one symbol at a time.
+    segmented_indicators = [
+        'change_in_price', 'sma', 'ema', 'rsi', 'rate_of_change', 'bollinger_bands', 'macd', 'sma_sweep', 'ema_sweep',
+        'standard_deviation', 'stochastic_oscillator', 'donchian_channel', 'williams_r', 'expression', 'average_true_range'
+    ]
+
+    # Indicators writing more columns than this add them to the frame as one block.
+    block_columns = 4
+
+    # The bars before the first wanted bar a windowed indicator needs to be exact. The
+    # other indicators are computed over the whole history when they are materialized.
+    warmup_bars = {
+        'change_in_price': lambda args: 1,
+        'sma': lambda args: args['period'] - 1,
+        'rate_of_change': lambda args: args['period'],
+        'bollinger_bands': lambda args: args['period'] - 1,
+        'standard_deviation': lambda args: args['period'] - 1,
+        'stochastic_oscillator': lambda args: args['period'] + args['smoothing'] - 2,
+        'donchian_channel': lambda args: args['period'] - 1,
+        'williams_r': lambda args: args['period'] - 1,
+        'expression': lambda args: compile_expression(expression = args['expression']).warmup
+    }
     
-    def __init__(self, price_data_frame: StockFrame) -> None:
+    def __init__(self, price_data_frame: StockFrame, streaming: bool = False, cache_bytes: int = 64 * 1024 * 1024,
+                 processes: int = 0, threads: int = 0, lazy: bool = False) -> None:
         """Initalizes the Indicator Client.
         Arguments:
         ----
         price_data_frame {bot.StockFrame} -- The price data frame which is used to add indicators to.
             At a minimum this data frame must have the following columns: `['timestamp','close','open','high','low']`.
+        Keyword Arguments:
+        ----
+        streaming {bool} -- Keep running state for the indicators that support it, so `refresh`
+            only folds in the new bars instead of recomputing whole columns. (default: {False})
+        cache_bytes {int} -- The memory budget of the indicator result cache, `0` turns
+            the cache off. (default: {64 MiB})
+        processes {int} -- With more than one process, `refresh` splits the symbols whose bars
+            changed into shards and computes the `segmented_indicators` in a process pool, passing
+            the columns through shared memory. Call `close` to shut the pool down. (default: {0})
+        threads {int} -- With more than one thread, `refresh` computes the other indicators side
+            by side in a thread pool of that size. It is off by default: it only pays off on
+            several cores with frames of hundreds of thousands of rows, where the NumPy kernels
+            run long enough without the GIL to make up for handing the work out. With few cores
+            or small frames the serial refresh is faster, so the pool never gets more threads
+            than there are cores. Call `close` to shut the pool down. (default: {0})
+        lazy {bool} -- Only declare the indicators, their columns are computed over the bars
+            asked for with `materialize`, and `check_signals` asks for the latest bar of the
+            indicators it reads. (default: {False})
         
         Usage:
         ----
@@ -34,14 +123,42 @@ class Indicators():
             >>> indicator_client.price_data_frame
         """
 
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
         self._stock_frame: StockFrame = price_data_frame
-        self._price_groups = price_data_frame.symbol_groups
         self._current_indicators = {}
         self._indicator_signals = {}
-        self._frame = self._stock_frame.frame
+        self._frame = None
 
         self._indicators_comp_key = []
         self._indicators_key = []
+
+        self._graph = IndicatorGraph(stock_frame = price_data_frame)
+
+        self._cache: IndicatorCache = IndicatorCache(max_bytes = cache_bytes) if cache_bytes else None
+        self._written: Dict[str, tuple] = {}
+        self._slices: Dict[tuple, IndicatorGraph] = {}
+        self._slices_key = None
+
+        self._pool: ShardPool = ShardPool(processes = processes) if processes > 1 else None
+        # More threads than cores only take turns on the same ones.
+        self._thread_count = min(threads, os.cpu_count() or 1)
+        self._threads: ThreadPoolExecutor = None
+        self._streaming: StreamingEngine = StreamingEngine(stock_frame = price_data_frame) if streaming else None
+
+        self._lazy = lazy
+        self._valid_ranges: Dict[str, tuple] = {}
+        self._outputs: Dict[str, List[str]] = {}
+
+        # Kept as asked for, so a snapshot brings the client back the same way.
+        self._settings = {
+            'streaming': streaming,
+            'cache_bytes': cache_bytes,
+            'processes': processes,
+            'threads': threads,
+            'lazy': lazy
+        }
         
         if self.is_multi_index:
             True
@@ -165,6 +282,35 @@ class Indicators():
 
         self._frame = price_data_frame
 
+    # While an indicator is computed for some of the symbols, the thread computing
+    # it sees their price slice and its graph instead of the StockFrame's frame,
+    # which is only grabbed when it is read, since the `columnar` backend builds it.
+
+    @property
+    def _frame(self) -> pd.DataFrame:
+        frame = self._local.__dict__.get('frame', self._main_frame)
+        return self._stock_frame.frame if frame is None else frame
+
+    @_frame.setter
+    def _frame(self, frame: pd.DataFrame) -> None:
+        self._main_frame = frame
+
+    @property
+    def _graph(self) -> IndicatorGraph:
+        return self._local.__dict__.get('graph', self._main_graph)
+
+    @_graph.setter
+    def _graph(self, graph: IndicatorGraph) -> None:
+        self._main_graph = graph
+
+    @property
+    def _price_groups(self):
+        return self._stock_frame.symbol_groups
+
+    @property
+    def _computing(self) -> bool:
+        return 'frame' in self._local.__dict__
+
     @property
     def is_multi_index(self) -> bool:
         """Specifies whether the data frame is a multi-index dataframe.
@@ -178,6 +324,35 @@ class Indicators():
         else:
             return False
 
+    @property
+    def lookback(self) -> int:
+        """The longest lookback of the registered indicators.
+        Overview:
+        ----
+        This is the largest window or span argument of any indicator added
+        so far, and is what a StockFrame retention policy is sized from.
+        Returns:
+        ----
+        {int} -- The lookback in bars.
+        """
+
+        lookback = 1
+
+        for indicator in self._current_indicators.values():
+
+            # The windows of an expression are inside its text.
+            if indicator['func'].__name__ == 'expression':
+                lookback = max(lookback, compile_expression(expression = indicator['args']['expression']).lookback + 1)
+                continue
+
+            for argument, value in indicator['args'].items():
+                for item in (value if isinstance(value, (list, tuple)) else [value]):
+                    if isinstance(item, int) and not isinstance(item, bool):
+                        lookback = max(lookback, item + 1)
+
+        return lookback
+
+    @memoized
     def change_in_price(self, column_name: str = 'change_in_price') -> pd.DataFrame:
         """Calculates the Change in Price.
         Returns:
@@ -192,12 +367,11 @@ class Indicators():
         self._current_indicators[column_name]['args'] = locals_data
         self._current_indicators[column_name]['func'] = self.change_in_price
 
-        self._frame[column_name] = self._price_groups['close'].transform(
-            lambda x: x.diff()
-        )
+        self._frame[column_name] = self._graph.node(key = ('diff', 'close', 1))
 
         return self._frame
 
+    @memoized
     def rsi(self, period: int, method: str = 'wilders', column_name: str = 'rsi') -> pd.DataFrame:
         """Calculates the Relative Strength Index (RSI).
         Arguments:
@@ -230,32 +404,18 @@ class Indicators():
         self._current_indicators[column_name]['args'] = locals_data
         self._current_indicators[column_name]['func'] = self.rsi
 
-        # First calculate the Change in Price.
-        if 'change_in_price' not in self._frame.columns:
-            self.change_in_price()
-
-        # Define the up days.
-        self._frame['up_day'] = self._price_groups['change_in_price'].transform(
-            lambda x : np.where(x >= 0, x, 0)
-        )
-
-        # Define the down days.
-        self._frame['down_day'] = self._price_groups['change_in_price'].transform(
-            lambda x : np.where(x < 0, x.abs(), 0)
-        )
+        # The up and down days come from the shared Change in Price.
+        change_in_price = ('diff', 'close', 1)
 
         # Calculate the EWMA for the Up days.
-        self._frame['ewma_up'] = self._price_groups['up_day'].transform(
-            lambda x: x.ewm(span = period).mean()
-        )
+        ewma_up = self._graph.ewm(source = ('gains', change_in_price), span = period)
 
         # Calculate the EWMA for the Down days.
-        self._frame['ewma_down'] = self._price_groups['down_day'].transform(
-            lambda x: x.ewm(span = period).mean()
-        )
+        ewma_down = self._graph.ewm(source = ('losses', change_in_price), span = period)
 
         # Calculate the Relative Strength
-        relative_strength = self._frame['ewma_up'] / self._frame['ewma_down']
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            relative_strength = ewma_up / ewma_down
 
         # Calculate the Relative Strength Index
         relative_strength_index = 100.0 - (100.0 / (1.0 + relative_strength))
@@ -263,15 +423,9 @@ class Indicators():
         # Add the info to the data frame.
         self._frame['rsi'] = np.where(relative_strength_index == 0, 100, 100 - (100 / (1 + relative_strength_index)))
 
-        # Clean up before sending back.
-        self._frame.drop(
-            labels = ['ewma_up', 'ewma_down', 'down_day', 'up_day', 'change_in_price'],
-            axis = 1,
-            inplace = True
-        )
-
         return self._frame
 
+    @memoized
     def sma(self, period: int, column_name: str = 'sma') -> pd.DataFrame:
         """Calculates the Simple Moving Average (SMA).
         Arguments:
@@ -301,12 +455,11 @@ class Indicators():
         self._current_indicators[column_name]['func'] = self.sma
 
         # Add the SMA
-        self._frame[column_name] = self._price_groups['close'].transform(
-            lambda x: x.rolling(window = period).mean()
-        )
+        self._frame[column_name] = self._graph.node(key = ('rolling_mean', 'close', period))
 
         return self._frame
 
+    @memoized
     def ema(self, period: int, alpha: float = 0.0, column_name = 'ema') -> pd.DataFrame:
         """Calculates the Exponential Moving Average (EMA).
         Arguments:
@@ -337,12 +490,84 @@ class Indicators():
         self._current_indicators[column_name]['func'] = self.ema
 
         # Add the EMA
-        self._frame[column_name] = self._price_groups['close'].transform(
-            lambda x: x.ewm(span=period).mean()
+        self._frame[column_name] = self._graph.ewm(source = 'close', span = period)
+
+        return self._frame
+
+    @memoized
+    def sma_sweep(self, periods: List[int], column_prefix: str = 'sma', column_name: str = 'sma_sweep') -> pd.DataFrame:
+        """Calculates the Simple Moving Average for many periods in one pass.
+        Overview:
+        ----
+        Every window is taken from the same cumulative sum of the closes,
+        and the columns are added to the frame as one block, so sweeping
+        fifty periods costs little more than a single `sma`.
+        Arguments:
+        ----
+        periods {List[int]} -- The periods of the moving averages.
+        Keyword Arguments:
+        ----
+        column_prefix {str} -- The columns are named `{column_prefix}_{period}`. (default: {'sma'})
+        Returns:
+        ----
+        {pd.DataFrame} -- A Pandas data frame with one SMA column per period.
+        Usage:
+        ----
+            >>> indicator_client = Indicators(price_data_frame=price_data_frame)
+            >>> indicator_client.sma_sweep(periods=list(range(5, 205, 5)))
+        """
+
+        locals_data = locals()
+        del locals_data['self']
+
+        self._current_indicators[column_name] = {}
+        self._current_indicators[column_name]['args'] = locals_data
+        self._current_indicators[column_name]['func'] = self.sma_sweep
+
+        self._assign_block(
+            column_names = ['{prefix}_{period}'.format(prefix = column_prefix, period = period) for period in periods],
+            values = self._graph.sweep(kind = 'rolling_mean', source = 'close', params = periods)
         )
 
         return self._frame
 
+    @memoized
+    def ema_sweep(self, spans: List[int], column_prefix: str = 'ema', column_name: str = 'ema_sweep') -> pd.DataFrame:
+        """Calculates the Exponential Moving Average for many spans in one pass.
+        Overview:
+        ----
+        All the spans are scanned together over the closes, and the columns
+        are added to the frame as one block.
+        Arguments:
+        ----
+        spans {List[int]} -- The spans of the moving averages.
+        Keyword Arguments:
+        ----
+        column_prefix {str} -- The columns are named `{column_prefix}_{span}`. (default: {'ema'})
+        Returns:
+        ----
+        {pd.DataFrame} -- A Pandas data frame with one EMA column per span.
+        Usage:
+        ----
+            >>> indicator_client = Indicators(price_data_frame=price_data_frame)
+            >>> indicator_client.ema_sweep(spans=[8, 13, 21, 34, 55])
+        """
+
+        locals_data = locals()
+        del locals_data['self']
+
+        self._current_indicators[column_name] = {}
+        self._current_indicators[column_name]['args'] = locals_data
+        self._current_indicators[column_name]['func'] = self.ema_sweep
+
+        self._assign_block(
+            column_names = ['{prefix}_{span}'.format(prefix = column_prefix, span = span) for span in spans],
+            values = self._graph.sweep(kind = 'ewm', source = 'close', params = spans)
+        )
+
+        return self._frame
+
+    @memoized
     def rate_of_change(self, period: int = 1, column_name: str = 'rate_of_change') -> pd.DataFrame:
         """Calculates the Rate of Change (ROC).
         Arguments:
@@ -372,12 +597,11 @@ class Indicators():
         self._current_indicators[column_name]['func'] = self.rate_of_change
 
         # Add the Momentum indicator.
-        self._frame[column_name] = self._price_groups['close'].transform(
-            lambda x: x.pct_change(periods=period)
-        )
+        self._frame[column_name] = self._graph.node(key = ('pct_change', 'close', period))
 
         return self._frame        
 
+    @memoized
     def bollinger_bands(self, period: int = 20, column_name: str = 'bollinger_bands') -> pd.DataFrame:
         """Calculates the Bollinger Bands.
         Arguments:
@@ -407,35 +631,27 @@ class Indicators():
         self._current_indicators[column_name]['args'] = locals_data
         self._current_indicators[column_name]['func'] = self.bollinger_bands
 
-        # Define the Moving Avg.
-        self._frame['moving_avg'] = self._price_groups['close'].transform(
-            lambda x : x.rolling(window = period).mean()
-        )
+        # Define the Moving Avg, shared with an `sma` of the same period.
+        moving_avg = self._graph.node(key = ('rolling_mean', 'close', period))
 
         # Define Moving Std.
-        self._frame['moving_std'] = self._price_groups['close'].transform(
-            lambda x : x.rolling(window = period).std()
-        )
+        moving_std = self._graph.node(key = ('rolling_std', 'close', period))
 
-        # Define the Upper Band.
-        self._frame['band_upper'] = 4 * (self._frame['moving_std'] / self._frame['moving_avg'])
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
 
-        # Define the lower band
-        self._frame['band_lower'] = (
-            (self._frame['close'] - self._frame['moving_avg']) + 
-            (2 * self._frame['moving_std']) / 
-            (4 * self._frame['moving_std'])
-        )
+            # Define the Upper Band.
+            self._frame['band_upper'] = 4 * (moving_std / moving_avg)
 
-        # Clean up before sending back.
-        self._frame.drop(
-            labels = ['moving_avg', 'moving_std'],
-            axis = 1,
-            inplace = True
-        )
+            # Define the lower band
+            self._frame['band_lower'] = (
+                (self._graph.node(key = 'close') - moving_avg) +
+                (2 * moving_std) /
+                (4 * moving_std)
+            )
 
         return self._frame   
 
+    @memoized
     def average_true_range(self, period: int = 14, column_name: str = 'average_true_range') -> pd.DataFrame:
         """Calculates the Average True Range (ATR).
         Arguments:
@@ -466,33 +682,37 @@ class Indicators():
         self._current_indicators[column_name]['func'] = self.average_true_range
 
 
-        # Calculate the different parts of True Range.
-        self._frame['true_range_0'] = abs(self._frame['high'] - self._frame['low'])
-        self._frame['true_range_1'] = abs(self._frame['high'] - self._frame['close'].shift())
-        self._frame['true_range_2'] = abs(self._frame['low'] - self._frame['close'].shift())
+        # Calculate the different parts of True Range, the previous close is the symbol's own.
+        high = self._graph.node(key = 'high')
+        low = self._graph.node(key = 'low')
+        previous_close = self._graph.node(key = ('shift', 'close', 1))
 
-        # Grab the Max.
-        self._frame['true_range'] = self._frame[['true_range_0', 'true_range_1', 'true_range_2']].max(axis=1)
+        # Grab the Max, a missing part is skipped.
+        true_range = np.fmax(np.abs(high - low), np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
 
         # Calculate the Average True Range.
-        self._frame['average_true_range'] = self._frame['true_range'].transform(
-            lambda x: x.ewm(span = period, min_periods = period).mean()
-        )
-
-        # Clean up before sending back.
-        self._frame.drop(
-            labels = ['true_range_0', 'true_range_1', 'true_range_2', 'true_range'],
-            axis = 1,
-            inplace = True
+        self._frame[column_name] = Kernels.ewm_mean(
+            values = true_range,
+            offsets = self._graph.offsets,
+            span = period,
+            min_periods = period
         )
 
         return self._frame
 
-    def stochastic_oscillator(self, column_name: str = 'stochastic_oscillator') -> pd.DataFrame:
+    @memoized
+    def stochastic_oscillator(self, period: int = 14, smoothing: int = 3, column_name: str = 'stochastic_oscillator') -> pd.DataFrame:
         """Calculates the Stochastic Oscillator.
+        Arguments:
+        ----
+        period {int} -- The number of periods the highest high and the lowest
+            low are taken over. (default: {14})
+        smoothing {int} -- The number of periods the %D signal line averages
+            the %K line over. (default: {3})
         Returns:
         ----
-        {pd.DataFrame} -- A Pandas data frame with the Stochastic Oscillator included.
+        {pd.DataFrame} -- A Pandas data frame with the Stochastic Oscillator (%K)
+            and its signal line (%D) included.
         Usage:
         ----
             >>> historical_prices_df = trading_robot.grab_historical_prices(
@@ -513,14 +733,104 @@ class Indicators():
         self._current_indicators[column_name]['args'] = locals_data
         self._current_indicators[column_name]['func'] = self.stochastic_oscillator
 
-        # Calculate the stochastic_oscillator.
-        self._frame['stochastic_oscillator'] = (
-            self._frame['close'] - self._frame['low'] / 
-            self._frame['high'] - self._frame['low']
+        # Grab the highest high and the lowest low of every window.
+        highest = self._graph.node(key = ('rolling_max', 'high', period))
+        lowest = self._graph.node(key = ('rolling_min', 'low', period))
+
+        # Calculate the stochastic_oscillator, and smooth it into its signal line.
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            percent_k = 100 * (self._graph.node(key = 'close') - lowest) / (highest - lowest)
+
+        self._frame[column_name] = percent_k
+        self._frame[column_name + '_signal'] = Kernels.rolling_mean(
+            values = percent_k,
+            offsets = self._graph.offsets,
+            window = smoothing
         )
 
-        return self._frame 
+        return self._frame
 
+    @memoized
+    def donchian_channel(self, period: int = 20, column_name: str = 'donchian_channel') -> pd.DataFrame:
+        """Calculates the Donchian Channel.
+        Arguments:
+        ----
+        period {int} -- The number of periods to use when calculating 
+            the channel. (default: {20})
+        Returns:
+        ----
+        {pd.DataFrame} -- A Pandas data frame with the upper, lower and middle
+            lines of the channel included.
+        Usage:
+        ----
+            >>> historical_prices_df = trading_robot.grab_historical_prices(
+                start=start_date,
+                end=end_date,
+                bar_size=1,
+                bar_type='minute'
+            )
+            >>> price_data_frame = pd.DataFrame(data=historical_prices)
+            >>> indicator_client = Indicators(price_data_frame=price_data_frame)
+            >>> indicator_client.donchian_channel(period=20)
+        """
+
+        locals_data = locals()
+        del locals_data['self']
+
+        self._current_indicators[column_name] = {}
+        self._current_indicators[column_name]['args'] = locals_data
+        self._current_indicators[column_name]['func'] = self.donchian_channel
+
+        # The highest high and the lowest low, shared with a stochastic of the same period.
+        highest = self._graph.node(key = ('rolling_max', 'high', period))
+        lowest = self._graph.node(key = ('rolling_min', 'low', period))
+
+        self._frame[column_name + '_upper'] = highest
+        self._frame[column_name + '_lower'] = lowest
+        self._frame[column_name + '_middle'] = (highest + lowest) / 2
+
+        return self._frame
+
+    @memoized
+    def williams_r(self, period: int = 14, column_name: str = 'williams_r') -> pd.DataFrame:
+        """Calculates the Williams %R.
+        Arguments:
+        ----
+        period {int} -- The number of periods to use when calculating 
+            the Williams %R. (default: {14})
+        Returns:
+        ----
+        {pd.DataFrame} -- A Pandas data frame with the Williams %R included.
+        Usage:
+        ----
+            >>> historical_prices_df = trading_robot.grab_historical_prices(
+                start=start_date,
+                end=end_date,
+                bar_size=1,
+                bar_type='minute'
+            )
+            >>> price_data_frame = pd.DataFrame(data=historical_prices)
+            >>> indicator_client = Indicators(price_data_frame=price_data_frame)
+            >>> indicator_client.williams_r(period=14)
+        """
+
+        locals_data = locals()
+        del locals_data['self']
+
+        self._current_indicators[column_name] = {}
+        self._current_indicators[column_name]['args'] = locals_data
+        self._current_indicators[column_name]['func'] = self.williams_r
+
+        highest = self._graph.node(key = ('rolling_max', 'high', period))
+        lowest = self._graph.node(key = ('rolling_min', 'low', period))
+
+        # Calculate how far the close sits below the highest high.
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            self._frame[column_name] = -100 * (highest - self._graph.node(key = 'close')) / (highest - lowest)
+
+        return self._frame
+
+    @memoized
     def macd(self, fast_period: int = 12, slow_period: int = 26, column_name: str = 'macd') -> pd.DataFrame:
         """Calculates the Moving Average Convergence Divergence (MACD).
         Arguments:
@@ -552,26 +862,26 @@ class Indicators():
         self._current_indicators[column_name]['args'] = locals_data
         self._current_indicators[column_name]['func'] = self.macd
 
-        # Calculate the Fast Moving MACD.
-        self._frame['macd_fast'] = self._frame['close'].transform(
-            lambda x: x.ewm(span = fast_period, min_periods = fast_period).mean()
-        )
+        # Calculate the Fast Moving MACD, shared with an `ema` of the same period.
+        self._frame['macd_fast'] = self._graph.ewm(source = 'close', span = fast_period, min_periods = fast_period)
 
         # Calculate the Slow Moving MACD.
-        self._frame['macd_slow'] = self._frame['close'].transform(
-            lambda x: x.ewm(span = slow_period, min_periods = slow_period).mean()
-        )
+        self._frame['macd_slow'] = self._graph.ewm(source = 'close', span = slow_period, min_periods = slow_period)
 
         # Calculate the difference between the fast and the slow.
         self._frame['macd_diff'] = self._frame['macd_fast'] - self._frame['macd_slow']
 
         # Calculate the Exponential moving average of the fast.
-        self._frame['macd'] = self._frame['macd_diff'].transform(
-            lambda x: x.ewm(span = 9, min_periods = 8).mean()
+        self._frame['macd'] = Kernels.ewm_mean(
+            values = self._frame['macd_diff'].to_numpy(dtype = 'float64', na_value = np.nan),
+            offsets = self._graph.offsets,
+            span = 9,
+            min_periods = 8
         )
 
         return self._frame 
 
+    @memoized
     def mass_index(self, period: int = 9, column_name: str = 'mass_index') -> pd.DataFrame:
         """Calculates the Mass Index indicator.
         Arguments:
@@ -631,6 +941,7 @@ class Indicators():
 
         return self._frame
     
+    @memoized
     def force_index(self, period: int, column_name: str = 'force_index') -> pd.DataFrame:
         """Calculates the Force Index.
         Arguments:
@@ -665,6 +976,7 @@ class Indicators():
 
         return self._frame
 
+    @memoized
     def ease_of_movement(self, period: int, column_name: str = 'ease_of_movement') -> pd.DataFrame:
         """Calculates the Ease of Movement.
         Arguments:
@@ -713,6 +1025,7 @@ class Indicators():
 
         return self._frame
 
+    @memoized
     def commodity_channel_index(self, period: int, column_name: str = 'commodity_channel_index') -> pd.DataFrame:
         """Calculates the Commodity Channel Index.
         Arguments:
@@ -767,6 +1080,7 @@ class Indicators():
 
         return self._frame
 
+    @memoized
     def standard_deviation(self, period: int, column_name: str = 'standard_deviation') -> pd.DataFrame:
         """Calculates the Standard Deviation.
         Arguments:
@@ -796,13 +1110,12 @@ class Indicators():
         self._current_indicators[column_name]['args'] = locals_data
         self._current_indicators[column_name]['func'] = self.standard_deviation
 
-        # Calculate the Standard Deviation.
-        self._frame[column_name] = self._frame['close'].transform(
-            lambda x: x.ewm(span = period).std()
-        )
+        # Calculate the rolling Standard Deviation of every symbol.
+        self._frame[column_name] = self._graph.node(key = ('rolling_std', 'close', period))
 
         return self._frame
 
+    @memoized
     def chaikin_oscillator(self, period: int, column_name: str = 'chaikin_oscillator') -> pd.DataFrame:
         """Calculates the Chaikin Oscillator.
         Arguments:
@@ -861,6 +1174,7 @@ class Indicators():
 
         return self._frame
 
+    @memoized
     def kst_oscillator(self, r1: int, r2: int, r3: int, r4: int, n1: int, n2: int, n3: int, n4: int, column_name: str = 'kst_oscillator') -> pd.DataFrame:
         """Calculates the Mass Index indicator.
         Arguments:
@@ -937,14 +1251,555 @@ class Indicators():
 
         return self._frame
 
+    @memoized
+    def expression(self, expression: str, column_name: str = 'expression') -> pd.DataFrame:
+        """Calculates a custom indicator from an expression.
+        Overview:
+        ----
+        The expression combines the price columns `open`, `close`, `high`,
+        `low` and `volume` with numbers, `+ - * / **`, comparisons (which give
+        `1.0` or `0.0`) and the functions `sma`, `ema`, `rolling_sum`,
+        `rolling_mean`, `rolling_std`, `rolling_max`, `rolling_min`, `shift`,
+        `diff`, `pct_change`, `abs`, `sqrt`, `log`, `exp`, `min` and `max`.
+        It is compiled once into a plan which computes every shared part a
+        single time, runs each window over every symbol at once and fuses the
+        arithmetic in between, and it streams like the built-in indicators.
+        Arguments:
+        ----
+        expression {str} -- The expression, for example `ema(close, 12) - ema(close, 26)`.
+        Keyword Arguments:
+        ----
+        column_name {str} -- The column to write the values to. (default: {'expression'})
+        Returns:
+        ----
+        {pd.DataFrame} -- A Pandas data frame with the expression included.
+        Usage:
+        ----
+            >>> historical_prices_df = trading_robot.grab_historical_prices(
+                start=start_date,
+                end=end_date,
+                bar_size=1,
+                bar_type='minute'
+            )
+            >>> price_data_frame = pd.DataFrame(data=historical_prices)
+            >>> indicator_client = Indicators(price_data_frame=price_data_frame)
+            >>> indicator_client.expression(
+                expression='rolling_sum(volume * close, 20) / rolling_sum(volume, 20)',
+                column_name='vwap'
+            )
+        """
+
+        locals_data = locals()
+        del locals_data['self']
+
+        self._current_indicators[column_name] = {}
+        self._current_indicators[column_name]['args'] = locals_data
+        self._current_indicators[column_name]['func'] = self.expression
+
+        plan = compile_expression(expression = expression, column_name = column_name)
+
+        for column, values in plan.evaluate(graph = self._graph).items():
+            self._frame[column] = values
+
+        return self._frame
+
+    @property
+    def cache(self) -> IndicatorCache:
+        """The indicator result cache, `None` if it is turned off.
+        Returns:
+        ----
+        {IndicatorCache} -- The cache, with its `hits`, `misses` and `nbytes`.
+        """
+
+        return self._cache
+
+    def _memoized_call(self, method, arguments: Dict) -> pd.DataFrame:
+        """Adds an indicator to the frame, reusing cached results where it can.
+        Arguments:
+        ----
+        method {Callable} -- The undecorated indicator method.
+        arguments {Dict} -- Its arguments, defaults included.
+        Returns:
+        ----
+        {pd.DataFrame} -- The frame with the indicator columns.
+        """
+
+        self._current_indicators[arguments['column_name']] = {
+            'args': arguments,
+            'func': getattr(self, method.__name__)
+        }
+
+        self._update(method = method, arguments = arguments)
+
+        return self._frame
+
+    def _update(self, method, arguments: Dict) -> None:
+        """Brings an indicator's columns up to date, without grabbing the frame."""
+
+        outputs = self._indicator_outputs(method = method, arguments = arguments)
+
+        if outputs is not None:
+            self._write_outputs(outputs = outputs)
+            self._mark_written(method = method, arguments = arguments, columns = list(outputs))
+
+    def _indicator_outputs(self, method, arguments: Dict) -> Union[Dict[str, np.ndarray], None]:
+        """Computes the output columns of an indicator, reusing cached results where it can.
+        Overview:
+        ----
+        Results are cached per `(indicator, arguments, symbol, symbol version)`.
+        If nothing changed since the indicator last wrote its columns, there
+        is nothing to do. Otherwise the indicators in `segmented_indicators`
+        are only computed for the symbols without a cached result, the others
+        are computed over the whole frame once per data version. When every
+        symbol changed since the indicator was computed, as after a bar for
+        all of them, the lookups are skipped and the whole frame computed at once.
+        This does not touch the frame, so several indicators can run side by side.
+        Arguments:
+        ----
+        method {Callable} -- The undecorated indicator method.
+        arguments {Dict} -- Its arguments, defaults included.
+        Returns:
+        ----
+        {Union[Dict[str, np.ndarray], None]} -- The full output columns, or `None`
+            if the frame already holds them.
+        """
+
+        name = method.__name__
+        args_key = normalize_args(args = arguments)
+        stock_frame = self._stock_frame
+        bars = len(stock_frame)
+        state = stock_frame.version
+
+        # Nothing changed since this indicator wrote its columns.
+        written = self._written.get((name, args_key))
+        frame_columns = stock_frame.columns if written is not None else []
+        if written is not None and all(
+            column in frame_columns and self._written.get(column) == (name, args_key, state) for column in written
+        ):
+            return None
+
+        if self._cache is None:
+            return self._compute(method = method, arguments = arguments, missing = None, rows = np.arange(bars))
+
+        positions = stock_frame.symbol_positions
+
+        if name in self.segmented_indicators:
+            keys = {symbol: (name, args_key, symbol, stock_frame.symbol_version(symbol = symbol)) for symbol in positions}
+        else:
+            keys = {None: (name, args_key, None, stock_frame.version)}
+
+        # Every symbol changed since the indicator was computed, so no cached result can hit.
+        computed = self._written.get(written[0]) if written else None
+        if computed is not None and computed[:2] == (name, args_key) and stock_frame.oldest_symbol_version > computed[2]:
+            results = dict.fromkeys(keys)
+        else:
+            with self._lock:
+                results = {symbol: self._cache.get(key = key) for symbol, key in keys.items()}
+
+        missing = [symbol for symbol, result in results.items() if result is None]
+
+        if missing:
+
+            if len(missing) == len(results):
+                rows = np.arange(bars)
+            else:
+                rows = np.concatenate([np.arange(*positions[symbol]) for symbol in missing])
+
+            outputs = self._compute(method = method, arguments = arguments, missing = tuple(missing), rows = rows)
+            sizes = [len(rows) if symbol is None else positions[symbol][1] - positions[symbol][0] for symbol in missing]
+            bounds = np.concatenate([[0], np.cumsum(sizes)])
+
+            # The cache keeps slices of the computed columns, charged once for all the symbols.
+            with self._lock:
+                self._cache.put_slices(keys = [keys[symbol] for symbol in missing], outputs = outputs, bounds = bounds)
+
+            if len(rows) == bars:
+                return outputs
+
+            for index, symbol in enumerate(missing):
+                results[symbol] = {column: values[bounds[index]:bounds[index + 1]] for column, values in outputs.items()}
+
+        if len(results) == 1:
+            return dict(next(iter(results.values())))
+
+        columns = next(iter(results.values())).keys() if results else []
+
+        return {column: np.concatenate([result[column] for result in results.values()]) for column in columns}
+
+    def _assign_block(self, column_names: List[str], values: np.ndarray) -> None:
+        """Adds output columns to the frame being computed as one block."""
+
+        if self._computing:
+            frame = self._frame
+            self._local.frame = pd.concat([frame, pd.DataFrame(values, index = frame.index, columns = column_names)], axis = 1)
+        else:
+            self._stock_frame.assign_block(column_names = column_names, values = values)
+
+    def _write_outputs(self, outputs: Dict[str, np.ndarray]) -> None:
+        """Writes computed output columns into the StockFrame, the `columnar` buffers take them as they are."""
+
+        if self._stock_frame.backend == 'columnar':
+            self._stock_frame.write_outputs(outputs = outputs)
+            return
+
+        if len(outputs) > self.block_columns:
+            self._stock_frame.assign_block(
+                column_names = list(outputs),
+                values = np.column_stack(list(outputs.values()))
+            )
+            return
+
+        frame = self._stock_frame.frame
+
+        for column, values in outputs.items():
+            frame[column] = values
+
+    def _mark_written(self, method, arguments: Dict, columns: List[str]) -> None:
+        """Records that the frame holds an indicator's columns for the current data version."""
+
+        name = method.__name__
+        args_key = normalize_args(args = arguments)
+        state = self._stock_frame.version
+
+        for column in columns:
+            self._written[column] = (name, args_key, state)
+
+        self._written[(name, args_key)] = columns
+
+    def _compute(self, method, arguments: Dict, missing: Tuple, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """Runs an indicator method over the price rows of some symbols.
+        Overview:
+        ----
+        The rows are copied into a `FrameSlice` with its own graph, which is
+        kept for the data version so indicators computed for the same symbols
+        still share their intermediates.
+        Returns:
+        ----
+        {Dict[str, np.ndarray]} -- The columns the indicator added, for the given rows.
+        """
+
+        slices_key = self._stock_frame.version
+
+        # Every symbol missing is the same slice, however it was asked for.
+        if len(rows) == len(self._stock_frame):
+            missing = None
+
+        with self._lock:
+
+            if self._slices_key != slices_key:
+                self._slices = {}
+                self._slices_key = slices_key
+
+            if missing not in self._slices:
+                self._slices[missing] = IndicatorGraph(stock_frame = FrameSlice(stock_frame = self._stock_frame, rows = rows))
+
+            graph = self._slices[missing]
+
+        # The indicator writes into its own shallow copy of the slice.
+        work_frame = graph._stock_frame.frame.copy(deep = False)
+
+        self._local.frame = work_frame
+        self._local.graph = graph
+
+        try:
+            method(self, **arguments)
+            work_frame = self._local.frame
+        finally:
+            del self._local.frame
+            del self._local.graph
+
+        added = [column for column in work_frame.columns if column not in SymbolBuffer.price_columns]
+
+        return {column: work_frame[column].to_numpy() for column in added}
+
+    def _refresh_in_pool(self, skip: List[str]) -> List[str]:
+        """Computes the segmented indicators over symbol shards in the process pool.
+        Overview:
+        ----
+        Only the symbols whose bars changed since the indicators last wrote
+        their columns are sent to the pool, the others keep their rows.
+        Arguments:
+        ----
+        skip {List[str]} -- The indicators already brought up to date.
+        Returns:
+        ----
+        {List[str]} -- The keys of the indicators that were computed.
+        """
+
+        keys = [
+            key for key, indicator in self._current_indicators.items()
+            if key not in skip and indicator['func'].__name__ in self.segmented_indicators
+        ]
+
+        positions = self._stock_frame.symbol_positions
+
+        if not keys or not positions:
+            return []
+
+        # Indicators not written yet find their output columns on the smallest symbol first.
+        probe = min(positions, key = lambda symbol: positions[symbol][1] - positions[symbol][0])
+        rows = np.arange(*positions[probe])
+
+        stock_frame = self._stock_frame
+        indicators = []
+        columns = []
+        writers = {}
+
+        for position, key in enumerate(keys):
+            indicator = self._current_indicators[key]
+            method = getattr(type(self), indicator['func'].__name__).__wrapped__
+            writer = (method.__name__, normalize_args(args = indicator['args']))
+            outputs = self._written.get(writer)
+
+            if outputs is None:
+                outputs = self._compute(method = method, arguments = indicator['args'], missing = ('probe',), rows = rows)
+
+            indicators.append((indicator['func'].__name__, indicator['args']))
+            columns.extend((position, column) for column in outputs)
+            writers.update(dict.fromkeys(outputs, writer))
+
+        # A symbol is up to date if its bars didn't change since every column was written.
+        frame_columns = stock_frame.columns
+        states = [
+            self._written[column][2] if column in frame_columns and self._written.get(column, ())[:2] == writer else None
+            for column, writer in writers.items()
+        ]
+
+        if None in states:
+            symbols = list(positions)
+        else:
+            symbols = [symbol for symbol in positions if stock_frame.symbol_version(symbol = symbol) > min(states)]
+
+        if symbols:
+            values = self._pool.compute(stock_frame = stock_frame, indicators = indicators, columns = columns, symbols = symbols)
+
+            # Later indicators win a shared column, as they would one after the other.
+            outputs = {column: column_values for (position, column), column_values in zip(columns, values)}
+
+            if len(symbols) == len(positions):
+                self._write_outputs(outputs = outputs)
+            else:
+                stock_frame.write_outputs(outputs = outputs, symbols = symbols)
+
+        for position, key in enumerate(keys):
+            self._mark_written(
+                method = getattr(type(self), self._current_indicators[key]['func'].__name__).__wrapped__,
+                arguments = self._current_indicators[key]['args'],
+                columns = [column for owner, column in columns if owner == position]
+            )
+
+        return keys
+
+    def _declare(self, method, arguments: Dict) -> pd.DataFrame:
+        """Registers an indicator without computing it, for the lazy mode."""
+
+        self._current_indicators[arguments['column_name']] = {
+            'args': arguments,
+            'func': getattr(self, method.__name__)
+        }
+
+        return self._stock_frame.frame
+
+    def valid_bars(self, column_name: str) -> Union[int, None]:
+        """The number of latest bars of every symbol an indicator is materialized for.
+        Arguments:
+        ----
+        column_name {str} -- The indicator key, for example `ema` or `sma`.
+        Returns:
+        ----
+        {Union[int, None]} -- `None` when the whole history is valid, `0` when nothing is.
+        """
+
+        state, bars = self._valid_ranges.get(column_name, (None, 0))
+        columns = self._stock_frame.columns
+
+        if state != self._stock_frame.version or any(column not in columns for column in self._outputs[column_name]):
+            return 0
+
+        return bars
+
+    def materialize(self, bars: int = None, indicators: List[str] = None) -> pd.DataFrame:
+        """Computes the declared indicators over the latest bars of every symbol.
+        Overview:
+        ----
+        Only the rows asked for are filled in, the others are left as `NaN`.
+        The windowed indicators in `warmup_bars` only read the bars they need
+        before the first wanted bar, the others are computed over the whole
+        history. An indicator already valid over the range is skipped, and
+        adding rows makes every range invalid again.
+        Keyword Arguments:
+        ----
+        bars {int} -- The number of latest bars to fill in for each symbol, `None`
+            for the whole history. (default: {None})
+        indicators {List[str]} -- The indicator keys to materialize, `None` for
+            all of them. (default: {None})
+        Returns:
+        ----
+        {pd.DataFrame} -- The frame with the indicator columns.
+        Usage:
+        ----
+            >>> indicator_client = Indicators(price_data_frame=stock_frame, lazy=True)
+            >>> indicator_client.ema(period=50)
+            >>> indicator_client.materialize(bars=390, indicators=['ema'])
+        """
+
+        self._materialize(bars = bars, indicators = indicators)
+
+        return self._frame
+
+    def _materialize(self, bars: int = None, indicators: List[str] = None) -> None:
+        """Fills in the declared indicators like `materialize`, without grabbing the frame."""
+
+        stock_frame = self._stock_frame
+        size = len(stock_frame)
+        state = stock_frame.version
+        positions = stock_frame.symbol_positions
+        written = []
+
+        for key in (list(self._current_indicators) if indicators is None else indicators):
+
+            valid = self.valid_bars(column_name = key)
+
+            if valid is None or (bars is not None and valid >= bars):
+                continue
+
+            indicator = self._current_indicators[key]
+            method = getattr(type(self), indicator['func'].__name__).__wrapped__
+            arguments = indicator['args']
+            warmup = self.warmup_bars.get(method.__name__)
+
+            if bars is None:
+                wanted = rows = np.arange(size)
+            else:
+                before = None if warmup is None else warmup(arguments)
+                wanted = np.concatenate([np.arange(max(start, end - bars), end) for start, end in positions.values()])
+                rows = np.concatenate([
+                    np.arange(start if before is None else max(start, end - bars - before), end)
+                    for start, end in positions.values()
+                ])
+
+            outputs = self._compute(method = method, arguments = arguments, missing = ('materialize', key, bars), rows = rows)
+            keep = np.isin(rows, wanted)
+
+            filled = {}
+
+            for column, values in outputs.items():
+                filled[column] = np.full(size, np.nan)
+                filled[column][wanted] = values[keep]
+
+            self._write_outputs(outputs = filled)
+
+            self._outputs[key] = list(outputs)
+            self._valid_ranges[key] = (state, bars)
+            written += list(outputs)
+
+        if written:
+            stock_frame.invalidate_latest_rows()
+
+    def _signal_indicators(self) -> List[str]:
+        """The keys of the indicators the signals read, all of them if that is unknown."""
+
+        columns = set(self._indicators_key)
+
+        for key in self._indicators_comp_key:
+            columns.update([self._indicator_signals[key]['indicator_1'], self._indicator_signals[key]['indicator_2']])
+
+        keys = [key for key in self._current_indicators if key in columns or columns & set(self._outputs.get(key, []))]
+        known = set(keys).union(*[self._outputs.get(key, []) for key in keys])
+
+        if columns - known:
+            keys += [key for key in self._current_indicators if key not in self._outputs and key not in keys]
+
+        return keys
+
+    def _refresh_in_threads(self, keys: List[str]) -> None:
+        """Computes indicators side by side in the thread pool.
+        Overview:
+        ----
+        Each indicator runs on its own copy of the price slice, and the
+        intermediates they share are still computed once. The results are
+        copied into the StockFrame's preallocated output arrays in the order
+        the indicators were added, and handed to the frame in one commit.
+        Arguments:
+        ----
+        keys {List[str]} -- The keys of the indicators to compute.
+        """
+
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers = self._thread_count)
+
+        tasks = []
+
+        for key in keys:
+            indicator = self._current_indicators[key]
+            method = getattr(type(self), indicator['func'].__name__).__wrapped__
+            arguments = indicator['args']
+            tasks.append((method, arguments, self._threads.submit(self._indicator_outputs, method, arguments)))
+
+        columns = []
+
+        for method, arguments, task in tasks:
+
+            outputs = task.result()
+
+            if outputs is None:
+                continue
+
+            if len(outputs) > self.block_columns:
+                self._write_outputs(outputs = outputs)
+            else:
+                for column, values in outputs.items():
+                    self._stock_frame.output_view(column_name = column, dtype = values.dtype)[:] = values
+                    columns.append(column)
+
+            self._mark_written(method = method, arguments = arguments, columns = list(outputs))
+
+        if columns:
+            self._stock_frame.commit_outputs(column_names = list(dict.fromkeys(columns)))
+
     def refresh(self):
-        """Updates the Indicator columns after adding the new rows."""
+        """Updates the Indicator columns after adding the new rows.
+        Overview:
+        ----
+        With streaming turned on, `change_in_price`, `sma`, `ema`, `rsi`,
+        `macd`, `average_true_range`, `rate_of_change`, `bollinger_bands`,
+        `standard_deviation`, `stochastic_oscillator`, `donchian_channel`,
+        `williams_r` and `expression` are updated from their running state in constant time
+        per new bar, the other indicators are recomputed.
+        Streamed values match the recomputed ones, except that they keep the
+        history evicted by a retention policy in their running averages.
+        In the lazy mode nothing is computed until it is materialized.
+        """
+
+        # Make sure the retention policy keeps enough history.
+        self._stock_frame.require_bars(bars = self.lookback)
+
+        # Every intermediate is computed at most once during the refresh.
+        self._graph.clear()
+        self._slices = {}
+
+        if self._lazy:
+            return
 
-        # First update the groups since, we have new rows.
-        self._price_groups = self._stock_frame.symbol_groups
+        streamed = []
+
+        if self._streaming is not None:
+            streamed = self._streaming.refresh(indicators = self._current_indicators)
+
+        if self._pool is not None:
+            streamed = streamed + self._refresh_in_pool(skip = streamed)
+
+        remaining = [indicator for indicator in self._current_indicators if indicator not in streamed]
+
+        if self._thread_count > 1 and len(remaining) > 1:
+            self._refresh_in_threads(keys = remaining)
+            remaining = []
 
         # Grab all the details of the indicators so far.
-        for indicator in self._current_indicators:
+        for indicator in remaining:
+
+            if indicator in streamed:
+                continue
             
             # Grab the function.
             indicator_argument = self._current_indicators[indicator]['args']
@@ -952,8 +1807,130 @@ class Indicators():
             # Grab the arguments.
             indicator_function = self._current_indicators[indicator]['func']
 
-            # Update the function.
-            indicator_function(**indicator_argument)
+            # Update the function, the `columnar` frame is only built when it is read.
+            if self._stock_frame.backend == 'columnar' and hasattr(indicator_function, '__wrapped__'):
+                self._update(method = indicator_function.__wrapped__, arguments = indicator_argument)
+            else:
+                indicator_function(**indicator_argument)
+
+        # The indicator columns changed, so the latest rows have to be gathered again.
+        self._stock_frame.invalidate_latest_rows()
+
+    def close(self) -> None:
+        """Shuts down the process and thread pools and frees the shared memory.
+        Overview:
+        ----
+        Call it once the indicators are no longer refreshed. A later
+        `refresh` starts the pools again.
+        Usage:
+        ----
+            >>> indicator_client = Indicators(price_data_frame=stock_frame, processes=4)
+            >>> indicator_client.refresh()
+            >>> indicator_client.close()
+        """
+
+        if self._pool is not None:
+            self._pool.close()
+
+        if self._threads is not None:
+            self._threads.shutdown()
+            self._threads = None
+
+    def save_snapshot(self, path: str) -> None:
+        """Saves the StockFrame together with the indicator registry.
+        Overview:
+        ----
+        The frame, including every indicator column already computed, goes
+        into a binary columnar snapshot (see `StockFrame.save_snapshot`) and the
+        registered indicators and signals are kept in its metadata, along with
+        the `streaming`, `cache_bytes`, `processes`, `threads` and `lazy` settings
+        of the client. Signal operators must come from the `operator` module.
+        Arguments:
+        ----
+        path {str} -- The snapshot file path.
+        Usage:
+        ----
+            >>> indicator_client.save_snapshot(path='snapshot.npz')
+            >>> indicator_client = Indicators.load_snapshot(path='snapshot.npz')
+        """
+
+        indicators = {
+            column_name: {
+                'func': indicator['func'].__name__,
+                'args': indicator['args']
+            }
+            for column_name, indicator in self._current_indicators.items()
+        }
+
+        signals = {}
+
+        for key, signal in self._indicator_signals.items():
+            signals[key] = {}
+            for name, value in signal.items():
+                if callable(value):
+                    if getattr(operator, getattr(value, '__name__', ''), None) is not value:
+                        raise ValueError("Signal operators must come from the operator module to be saved.")
+                    value = {'operator': value.__name__}
+                signals[key][name] = value
+
+        self._stock_frame.save_snapshot(
+            path = path,
+            metadata = {
+                'indicators': indicators,
+                'signals': signals,
+                'indicators_key': self._indicators_key,
+                'indicators_comp_key': self._indicators_comp_key,
+                'settings': self._settings
+            }
+        )
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> 'Indicators':
+        """Restores an Indicators object and its StockFrame from a snapshot.
+        Overview:
+        ----
+        The indicator columns come back as they were saved, so signals can be
+        checked right away, and the client gets the settings it was saved with.
+        Call `refresh` once the newer bars have been added.
+        Arguments:
+        ----
+        path {str} -- The snapshot file path.
+        Returns:
+        ----
+        {Indicators} -- The restored indicator client, its StockFrame is `stock_frame`.
+        """
+
+        stock_frame = StockFrame.load_snapshot(path = path)
+        metadata = stock_frame.snapshot_metadata
+
+        indicator_client = cls(price_data_frame = stock_frame, **metadata.get('settings', {}))
+
+        for column_name, indicator in metadata.get('indicators', {}).items():
+            indicator_client._current_indicators[column_name] = {
+                'args': indicator['args'],
+                'func': getattr(indicator_client, indicator['func'])
+            }
+
+        for key, signal in metadata.get('signals', {}).items():
+            indicator_client._indicator_signals[key] = {
+                name: getattr(operator, value['operator']) if isinstance(value, dict) else value
+                for name, value in signal.items()
+            }
+
+        indicator_client._indicators_key = list(metadata.get('indicators_key', []))
+        indicator_client._indicators_comp_key = list(metadata.get('indicators_comp_key', []))
+
+        return indicator_client
+
+    @property
+    def stock_frame(self) -> StockFrame:
+        """The StockFrame the indicators are added to.
+        Returns:
+        ----
+        {StockFrame} -- The StockFrame object.
+        """
+
+        return self._stock_frame
 
     def check_signals(self) -> Union[pd.DataFrame, None]:
         """Checks to see if any signals have been generated.
@@ -963,6 +1940,10 @@ class Indicators():
             is returned otherwise nothing is returned.
         """
 
+        # Only the latest bar of the indicators the signals read is needed.
+        if self._lazy:
+            self._materialize(bars = 1, indicators = self._signal_indicators())
+
         signals_df = self._stock_frame._check_signals(
             indicators = self._indicator_signals,
             indciators_comp_key = self._indicators_comp_key,
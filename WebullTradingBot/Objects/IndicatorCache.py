@@ -0,0 +1,196 @@
+import numpy as np
+
+from collections import OrderedDict
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Union
+
+
+def normalize_args(args: Dict[str, Any]) -> Tuple:
+    """Turns indicator arguments into a hashable, order independent key.
+    Arguments:
+    ----
+    args {Dict[str, Any]} -- The arguments, defaults included.
+    Returns:
+    ----
+    {Tuple} -- The sorted `(name, value)` pairs, with NumPy scalars as Python
+        numbers and whole floats as ints, so `14`, `14.0` and `np.int64(14)` match.
+        Lists and arrays become tuples.
+    """
+
+    return tuple((name, _normalize_value(value = value)) for name, value in sorted(args.items()))
+
+
+def _normalize_value(value: Any) -> Any:
+    """Turns one argument value into its hashable, normalized form."""
+
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(_normalize_value(value = item) for item in value)
+
+    if isinstance(value, np.generic):
+        value = value.item()
+
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+
+    return value
+
+
+class IndicatorCache():
+
+    """
+    Represents a least recently used cache of indicator results with a
+    memory budget, keyed by indicator, arguments, symbol and data version.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """Initalizes the Indicator Cache.
+        Keyword Arguments:
+        ----
+        max_bytes {int} -- The memory budget of the arrays the cached results keep alive. (default: {64 MiB})
+        """
+
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict = OrderedDict()
+        self._owners: Dict[int, list] = {}
+        self._latest: Dict[Tuple, Tuple] = {}
+        self._nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes kept alive by the cached arrays, counting an array
+        several results are views of once, at its full size."""
+
+        return self._nbytes
+
+    def get(self, key: Tuple) -> Union[Dict[str, np.ndarray], None]:
+        """Grabs a cached result and marks it as recently used.
+        Arguments:
+        ----
+        key {Tuple} -- The result key.
+        Returns:
+        ----
+        {Union[Dict[str, np.ndarray], None]} -- The output columns, or `None` on a miss.
+        """
+
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        outputs, _, start, stop = entry
+
+        if start is None:
+            return outputs
+
+        return {column: values[start:stop] for column, values in outputs.items()}
+
+    def put(self, key: Tuple, outputs: Dict[str, np.ndarray]) -> None:
+        """Caches a result, evicting the least recently used ones over budget.
+        Arguments:
+        ----
+        key {Tuple} -- The result key, ending with the data version. It replaces
+            the result cached for an older version of the same indicator and symbol.
+        outputs {Dict[str, np.ndarray]} -- The output columns. A view is kept as is and
+            charged with the whole array it points into, once for all the results sharing it.
+        """
+
+        self._store(entries = {key: (outputs, None, None)}, owners = _owners(outputs = outputs))
+
+    def put_slices(self, keys: List[Tuple], outputs: Dict[str, np.ndarray], bounds: np.ndarray) -> None:
+        """Caches the results of several symbols computed together, each a slice
+        of the same output columns, without slicing them until they are used.
+        Arguments:
+        ----
+        keys {List[Tuple]} -- The result keys, in the order of the slices.
+        outputs {Dict[str, np.ndarray]} -- The output columns of all of them, charged as in `put`.
+        bounds {np.ndarray} -- Where each slice starts, followed by where the last one stops.
+        """
+
+        bounds = bounds.tolist()
+
+        self._store(
+            entries = {key: (outputs, bounds[index], bounds[index + 1]) for index, key in enumerate(keys)},
+            owners = _owners(outputs = outputs)
+        )
+
+    def _store(self, entries: Dict[Tuple, Tuple], owners: List[np.ndarray]) -> None:
+        """Adds entries keeping the same arrays alive, then evicts over budget."""
+
+        if sum(owner.nbytes for owner in owners) > self.max_bytes:
+            return
+
+        for key, (outputs, start, stop) in entries.items():
+
+            # Data versions only grow, so a result for a newer one supersedes the older result.
+            previous = self._latest.get(key[:-1], key)
+            if previous in self._entries:
+                self._release(owners = self._entries.pop(previous)[1])
+            if key in self._entries:
+                self._release(owners = self._entries.pop(key)[1])
+
+            self._entries[key] = (outputs, owners, start, stop)
+            self._latest[key[:-1]] = key
+
+        self._hold(owners = owners, count = len(entries))
+
+        while self._nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last = False)
+            self._release(owners = evicted[1])
+
+    def clear(self) -> None:
+        """Drops every cached result."""
+
+        self._entries.clear()
+        self._owners.clear()
+        self._latest.clear()
+        self._nbytes = 0
+
+    def _hold(self, owners: List[np.ndarray], count: int) -> None:
+        """Counts `count` more results keeping each of the arrays alive."""
+
+        for owner in owners:
+            held = self._owners.get(id(owner))
+
+            if held is None:
+                self._owners[id(owner)] = [owner, count]
+                self._nbytes += owner.nbytes
+            else:
+                held[1] += count
+
+    def _release(self, owners: List[np.ndarray]) -> None:
+        """Counts one less result keeping each of the arrays alive, and stops
+        charging the ones nothing cached points into anymore."""
+
+        for owner in owners:
+            held = self._owners[id(owner)]
+            held[1] -= 1
+
+            if held[1] == 0:
+                del self._owners[id(owner)]
+                self._nbytes -= owner.nbytes
+
+
+def _owners(outputs: Dict[str, np.ndarray]) -> List[np.ndarray]:
+    """Walks each output column back to the array owning its memory."""
+
+    owners = {}
+
+    for values in outputs.values():
+        while isinstance(values.base, np.ndarray):
+            values = values.base
+        owners[id(values)] = values
+
+    return list(owners.values())
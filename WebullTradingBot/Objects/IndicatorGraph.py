@@ -0,0 +1,282 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from typing import Dict
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+from Objects import Kernels
+from Objects.ColumnStore import SymbolBuffer
+
+Source = Union[str, Tuple]
+
+
+class FrameSlice():
+
+    """
+    Represents the price rows of some of the symbols of a StockFrame,
+    copied out so indicators can be computed for those rows only.
+    """
+
+    def __init__(self, stock_frame, rows: np.ndarray) -> None:
+        """Initalizes the Frame Slice.
+        Arguments:
+        ----
+        stock_frame {StockFrame} -- The StockFrame to slice.
+        rows {np.ndarray} -- The row positions to keep, in order. Each symbol keeps one run
+            of consecutive rows, either its whole block or its latest bars.
+        """
+
+        if stock_frame.backend == 'columnar':
+            self.frame: pd.DataFrame = self._gather(stock_frame = stock_frame, rows = rows)
+        elif len(rows) == len(stock_frame):
+            # Selecting columns already copies them, or defers the copy on write.
+            self.frame: pd.DataFrame = stock_frame.frame[SymbolBuffer.price_columns]
+        else:
+            self.frame: pd.DataFrame = stock_frame.frame[SymbolBuffer.price_columns].iloc[rows].copy()
+
+        self.version = stock_frame.version
+
+        # A symbol's run starts at its first bar or after a gap in the rows.
+        offsets = stock_frame.symbol_offsets[rows]
+        starts = (offsets == 0) | (np.diff(rows, prepend = -1) != 1)
+        positions = np.arange(len(rows))
+
+        self.symbol_offsets: np.ndarray = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+
+    @staticmethod
+    def _gather(stock_frame, rows: np.ndarray) -> pd.DataFrame:
+        """Copies the price rows out of the symbol buffers, so the StockFrame's frame is never built."""
+
+        positions = stock_frame.symbol_positions
+        bounds = np.array(list(positions.values()), dtype = 'int64').reshape(-1, 2)
+        lows = np.searchsorted(rows, bounds[:, 0])
+        highs = np.searchsorted(rows, bounds[:, 1])
+
+        # Each symbol keeps one run of rows, so its part is a slice of its buffer.
+        runs = [
+            (symbol, rows[low] - start, rows[high - 1] - start + 1)
+            for symbol, (start, _), low, high in zip(positions, bounds.tolist(), lows.tolist(), highs.tolist())
+            if high > low
+        ]
+
+        columns = {}
+
+        for name in SymbolBuffer.price_columns:
+            parts = [stock_frame.price_view(symbol = symbol, column_name = name)[first:last] for symbol, first, last in runs]
+            columns[name] = np.concatenate(parts) if parts else np.empty(0, dtype = SymbolBuffer.default_dtypes[name])
+
+        return pd.DataFrame(columns, copy = False)
+
+    def column_array(self, column_name: str) -> np.ndarray:
+        """Grabs a whole price column of the slice."""
+
+        return self.frame[column_name].to_numpy()
+
+
+class IndicatorGraph():
+
+    """
+    Represents the graph of named intermediate results the indicators
+    are built from, like `diff`, `rolling_mean(p)`, `rolling_std(p)`,
+    `rolling_max(p)` and `ewm(span)`, so a result shared by several
+    indicators is computed once.
+    """
+
+    def __init__(self, stock_frame) -> None:
+        """Initalizes the Indicator Graph.
+        Arguments:
+        ----
+        stock_frame {Union[StockFrame, FrameSlice]} -- The frame the intermediates are computed from.
+        """
+
+        self._stock_frame = stock_frame
+        self._nodes: Dict[Tuple, np.ndarray] = {}
+        self._nodes_key = None
+        self._building: Dict[Tuple, Union[threading.Event, None]] = {}
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        """Drops every cached intermediate."""
+
+        with self._lock:
+            self._nodes = {}
+            self._nodes_key = None
+
+    def node(self, key: Tuple) -> np.ndarray:
+        """Grabs an intermediate, computing it and its inputs if needed.
+        Overview:
+        ----
+        A node is keyed by its kind followed by its arguments, the first one
+        being its source: either a frame column name or the key of another
+        node. The nodes are cached until rows are added or `clear` is called.
+        Threads asking for a node another thread is building wait for it
+        instead of building it again.
+        Arguments:
+        ----
+        key {Tuple} -- The node key, for example `('rolling_mean', 'close', 20)`.
+        Returns:
+        ----
+        {np.ndarray} -- The values of the node, in frame row order.
+        """
+
+        nodes_key = self._stock_frame.version
+        key = self._normalize(key = key)
+
+        with self._lock:
+
+            if self._nodes_key != nodes_key:
+                self._nodes = {}
+                self._nodes_key = nodes_key
+
+            if key in self._nodes:
+                return self._nodes[key]
+
+            # The event is only made once another thread has to wait for the node.
+            owner = key not in self._building
+
+            if owner:
+                self._building[key] = None
+            else:
+                waiting = self._building[key] = self._building[key] or threading.Event()
+
+        if not owner:
+            waiting.wait()
+            return self.node(key = key)
+
+        values = None
+
+        try:
+            values = self._build(key = key)
+        finally:
+            with self._lock:
+                if values is not None and self._nodes_key == nodes_key:
+                    self._nodes[key] = values
+                waiting = self._building.pop(key)
+
+            if waiting is not None:
+                waiting.set()
+
+        return values
+
+    def _normalize(self, key: Union[Source, Tuple]) -> Tuple:
+        """Turns a bare column name into a `price` node key."""
+
+        if isinstance(key, str):
+            return ('price', key)
+
+        return (key[0], self._normalize(key = key[1])) + tuple(key[2:]) if key[0] != 'price' else tuple(key)
+
+    def _build(self, key: Tuple) -> np.ndarray:
+        """Computes a node from its inputs."""
+
+        kind = key[0]
+        offsets = self._stock_frame.symbol_offsets
+
+        if kind == 'price':
+            return np.asarray(self._stock_frame.column_array(column_name = key[1]), dtype = 'float64')
+
+        source = self.node(key = key[1])
+
+        if kind == 'diff':
+            return Kernels.diff(values = source, offsets = offsets, periods = key[2])
+        if kind == 'shift':
+            return Kernels.shift(values = source, offsets = offsets, periods = key[2])
+        if kind == 'pct_change':
+            return Kernels.pct_change(values = source, offsets = offsets, periods = key[2])
+        if kind == 'gains':
+            return np.where(source >= 0, source, 0)
+        if kind == 'losses':
+            return np.where(source < 0, np.abs(source), 0)
+        if kind == 'rolling_sum':
+            return Kernels.rolling_sum(values = source, offsets = offsets, window = key[2])
+        if kind == 'rolling_mean':
+            return Kernels.rolling_mean(values = source, offsets = offsets, window = key[2])
+        if kind == 'rolling_std':
+            return Kernels.rolling_std(values = source, offsets = offsets, window = key[2])
+        if kind == 'rolling_max':
+            return Kernels.rolling_max(values = source, offsets = offsets, window = key[2])
+        if kind == 'rolling_min':
+            return Kernels.rolling_min(values = source, offsets = offsets, window = key[2])
+        if kind == 'ewm':
+            return Kernels.ewm_mean(values = source, offsets = offsets, span = key[2])
+
+        raise KeyError("Unknown intermediate: {kind}".format(kind = kind))
+
+    def ewm(self, source: Source, span: float, min_periods: int = 0) -> np.ndarray:
+        """Grabs the `ewm` node of a source, hiding the first `min_periods - 1` bars of every symbol.
+        Arguments:
+        ----
+        source {Source} -- A column name or a node key.
+        span {float} -- The span of the weights.
+        Keyword Arguments:
+        ----
+        min_periods {int} -- The number of bars needed before a mean is shown. (default: {0})
+        Returns:
+        ----
+        {np.ndarray} -- The exponentially weighted mean.
+        """
+
+        values = self.node(key = ('ewm', source, span))
+
+        if min_periods <= 1:
+            return values
+
+        return np.where(self._stock_frame.symbol_offsets >= min_periods - 1, values, np.nan)
+
+    def sweep(self, kind: str, source: Source, params: Sequence) -> np.ndarray:
+        """Grabs the `rolling_mean` or `ewm` nodes of a source for many parameters at once.
+        Overview:
+        ----
+        The nodes not cached yet are computed together in one pass and then
+        cached one by one, so an `sma` or `ema` of a swept period shares them.
+        Arguments:
+        ----
+        kind {str} -- Either `'rolling_mean'` or `'ewm'`.
+        source {Source} -- A column name or a node key.
+        params {Sequence} -- The windows or the spans.
+        Returns:
+        ----
+        {np.ndarray} -- One column per parameter, in frame row order.
+        """
+
+        keys = [self._normalize(key = (kind, source, param)) for param in params]
+        values = self.node(key = source)
+        nodes_key = self._nodes_key
+
+        with self._lock:
+            missing = [key for key in dict.fromkeys(keys) if key not in self._nodes]
+
+        if missing:
+
+            if kind == 'rolling_mean':
+                block = Kernels.rolling_mean_sweep(values = values, offsets = self.offsets, windows = [key[2] for key in missing])
+            elif kind == 'ewm':
+                block = Kernels.ewm_mean_sweep(values = values, offsets = self.offsets, spans = [key[2] for key in missing])
+            else:
+                raise KeyError("Unknown sweep: {kind}".format(kind = kind))
+
+            with self._lock:
+                if self._nodes_key == nodes_key:
+                    for position, key in enumerate(missing):
+                        self._nodes.setdefault(key, block[:, position])
+
+            found = dict(zip(missing, block.T))
+            return np.column_stack([found[key] if key in found else self.node(key = key) for key in keys])
+
+        return np.column_stack([self.node(key = key) for key in keys])
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """The position of every row inside its symbol's block."""
+
+        return self._stock_frame.symbol_offsets
+
+    @property
+    def cached(self) -> int:
+        """The number of intermediates currently cached."""
+
+        return len(self._nodes)
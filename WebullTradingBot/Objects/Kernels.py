@@ -0,0 +1,349 @@
+"""
+Segmented kernels which compute a rolling or exponentially weighted
+statistic over every symbol of a StockFrame in one vectorized pass.
+
+The rows of a StockFrame are sorted by symbol, so every symbol is one
+contiguous segment. The kernels take `offsets`, the position of every
+row inside its segment (see `StockFrame.symbol_offsets`), and never let
+a window or a weight reach across a segment boundary.
+"""
+
+import numpy as np
+
+from typing import Dict
+from typing import Sequence
+from typing import Tuple
+
+
+def row_offsets(positions: Dict[str, Tuple[int, int]], size: int) -> np.ndarray:
+    """Returns the position of every row inside its segment.
+    Arguments:
+    ----
+    positions {Dict[str, Tuple[int, int]]} -- The `(start, end)` positions of every segment.
+    size {int} -- The number of rows.
+    Returns:
+    ----
+    {np.ndarray} -- The offset of every row, `0` at the start of a segment.
+    """
+
+    starts = np.zeros(size, dtype = 'int64')
+
+    for start, end in positions.values():
+        starts[start:end] = start
+
+    return np.arange(size, dtype = 'int64') - starts
+
+
+def shift(values: np.ndarray, offsets: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Shifts every segment forward by `periods` rows, filling with `NaN`."""
+
+    shifted = np.full(len(values), np.nan)
+
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+
+    shifted[offsets < periods] = np.nan
+
+    return shifted
+
+
+def diff(values: np.ndarray, offsets: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Returns the difference with the value `periods` rows back in the same segment."""
+
+    return values - shift(values = values, offsets = offsets, periods = periods)
+
+
+def pct_change(values: np.ndarray, offsets: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Returns the relative change from the value `periods` rows back in the same segment."""
+
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        return values / shift(values = values, offsets = offsets, periods = periods) - 1.0
+
+
+def _segment_cumsum(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Returns the cumulative sum of every segment, each one summed on its own.
+    Overview:
+    ----
+    Summing each segment from zero keeps a symbol's result independent of
+    the symbols before it, so computing a subset of the symbols gives the
+    exact same values. The segments are laid out as the rows of a padded
+    matrix, unless their lengths are too uneven for that to pay off.
+    """
+
+    size = len(values)
+    result = np.empty(size)
+
+    if size == 0:
+        return result
+
+    segments = np.cumsum(offsets == 0) - 1
+    count = int(segments[-1]) + 1
+    longest = int(offsets.max()) + 1
+
+    if count * longest <= 4 * size + 1024:
+        matrix = np.zeros((count, longest))
+        matrix[segments, offsets] = values
+        return np.cumsum(matrix, axis = 1)[segments, offsets]
+
+    starts = np.flatnonzero(offsets == 0)
+
+    for start, end in zip(starts, np.append(starts[1:], size)):
+        np.cumsum(values[start:end], out = result[start:end])
+
+    return result
+
+
+def _window_sums(values: np.ndarray, offsets: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the sum and the number of `NaN` values of every full window."""
+
+    missing = np.isnan(values)
+    totals = _segment_cumsum(values = np.where(missing, 0.0, values), offsets = offsets)
+
+    return _windowed(totals = totals, counts = np.cumsum(missing), offsets = offsets, window = window)
+
+
+def _windowed(totals: np.ndarray, counts: np.ndarray, offsets: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Turns running totals and running `NaN` counts into the ones of every full window."""
+
+    # Take off what was summed before the window, within the segment.
+    sums = totals.copy()
+
+    if window < len(totals):
+        sums[window:] -= np.where(offsets[window:] >= window, totals[:len(totals) - window], 0.0)
+
+    nans = counts.copy()
+    nans[window:] -= counts[:len(counts) - window] if window < len(counts) else 0
+
+    # Windows reaching into the previous segment are not full.
+    nans[offsets < window - 1] = 1
+
+    return sums, nans
+
+
+def rolling_sum(values: np.ndarray, offsets: np.ndarray, window: int) -> np.ndarray:
+    """Matches `groupby(...).rolling(window).sum()`, `NaN` until a window is full."""
+
+    sums, nans = _window_sums(values = values, offsets = offsets, window = window)
+
+    return np.where(nans > 0, np.nan, sums)
+
+
+def rolling_mean(values: np.ndarray, offsets: np.ndarray, window: int) -> np.ndarray:
+    """Matches `groupby(...).rolling(window).mean()`, `NaN` until a window is full."""
+
+    return rolling_sum(values = values, offsets = offsets, window = window) / window
+
+
+def rolling_mean_sweep(values: np.ndarray, offsets: np.ndarray, windows: Sequence[int]) -> np.ndarray:
+    """Returns `rolling_mean` for every window, from a single cumulative sum.
+    Arguments:
+    ----
+    values {np.ndarray} -- The values of every row.
+    offsets {np.ndarray} -- The position of every row inside its segment.
+    windows {Sequence[int]} -- The window sizes.
+    Returns:
+    ----
+    {np.ndarray} -- One column per window, matching `rolling_mean` exactly.
+    """
+
+    missing = np.isnan(values)
+    totals = _segment_cumsum(values = np.where(missing, 0.0, values), offsets = offsets)
+    counts = np.cumsum(missing)
+
+    means = np.empty((len(values), len(windows)), order = 'F')
+
+    for position, window in enumerate(windows):
+        sums, nans = _windowed(totals = totals, counts = counts, offsets = offsets, window = window)
+        means[:, position] = np.where(nans > 0, np.nan, sums) / window
+
+    return means
+
+
+def rolling_std(values: np.ndarray, offsets: np.ndarray, window: int) -> np.ndarray:
+    """Matches `groupby(...).rolling(window).std()`, `NaN` until a window is full."""
+
+    if window < 2:
+        return np.full(len(values), np.nan)
+
+    # Center each segment on its first value to keep the sums small.
+    anchors = values[np.arange(len(values)) - offsets]
+    centered = values - np.where(np.isnan(anchors), 0.0, anchors)
+
+    sums, nans = _window_sums(values = centered, offsets = offsets, window = window)
+    squares, _ = _window_sums(values = centered * centered, offsets = offsets, window = window)
+
+    variance = np.maximum((squares - sums * sums / window) / (window - 1), 0.0)
+
+    return np.where(nans > 0, np.nan, np.sqrt(variance))
+
+
+def _rolling_extreme(values: np.ndarray, offsets: np.ndarray, window: int, reduce: np.ufunc) -> np.ndarray:
+    """Returns `reduce` over every full window, `NaN` until a window is full.
+    Overview:
+    ----
+    Doubling builds the extreme of the last `span` rows for the largest
+    power of two `span` not above the window, and two such spans cover
+    any window, so there are `log2(window)` passes. Windows holding a
+    `NaN` are `NaN`, like pandas with `min_periods = window`.
+    """
+
+    size = len(values)
+    result = np.full(size, np.nan)
+
+    if window < 1 or size == 0:
+        return result
+
+    extremes = np.array(values, dtype = 'float64')
+    span = 1
+
+    while span * 2 <= window:
+        doubled = extremes.copy()
+        doubled[span:] = reduce(extremes[span:], extremes[:size - span])
+        extremes = doubled
+        span *= 2
+
+    full = np.flatnonzero(offsets >= window - 1)
+    result[full] = reduce(extremes[full], extremes[full - (window - span)])
+
+    return result
+
+
+def rolling_max(values: np.ndarray, offsets: np.ndarray, window: int) -> np.ndarray:
+    """Matches `groupby(...).rolling(window).max()`, `NaN` until a window is full."""
+
+    return _rolling_extreme(values = values, offsets = offsets, window = window, reduce = np.maximum)
+
+
+def rolling_min(values: np.ndarray, offsets: np.ndarray, window: int) -> np.ndarray:
+    """Matches `groupby(...).rolling(window).min()`, `NaN` until a window is full."""
+
+    return _rolling_extreme(values = values, offsets = offsets, window = window, reduce = np.minimum)
+
+
+def _decayed_sum(values: np.ndarray, offsets: np.ndarray, decay: float) -> np.ndarray:
+    """Returns `y[i] = values[i] + decay * y[i - 1]`, restarting at every segment.
+    Overview:
+    ----
+    The recurrence is solved with a log-step scan: after the pass with
+    stride `k` every row holds the decayed sum of its last `2 * k` values,
+    so `log2` of the longest segment passes cover everything.
+    """
+
+    result = np.array(values, dtype = 'float64')
+    longest = int(offsets.max()) + 1 if len(offsets) else 0
+    stride = 1
+    weight = decay
+
+    while stride < longest:
+        reach = offsets[stride:] >= stride
+        result[stride:] += np.where(reach, weight * result[:-stride], 0.0)
+        stride *= 2
+        weight *= weight
+
+    return result
+
+
+def _decayed_counts(present: np.ndarray, offsets: np.ndarray, decay: float) -> np.ndarray:
+    """Returns `_decayed_sum` of the present flags, the denominator of the weighted means.
+    Overview:
+    ----
+    Without gaps the sum only depends on the offset of a row, so it is
+    scanned once over the longest segment and looked up for every row.
+    """
+
+    if len(offsets) and present.all():
+        longest = int(offsets.max()) + 1
+        return _decayed_sum(values = np.ones(longest), offsets = np.arange(longest), decay = decay)[offsets]
+
+    return _decayed_sum(values = present.astype('float64'), offsets = offsets, decay = decay)
+
+
+def ewm_sums(values: np.ndarray, offsets: np.ndarray, span: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the decayed sums of the values and of their weights, whose ratio is `ewm_mean`.
+    Arguments:
+    ----
+    values {np.ndarray} -- The values of every row.
+    offsets {np.ndarray} -- The position of every row inside its segment.
+    span {float} -- The span of the weights.
+    Returns:
+    ----
+    {Tuple[np.ndarray, np.ndarray]} -- The numerator and the denominator of every row.
+    """
+
+    decay = 1.0 - 2.0 / (span + 1.0)
+    present = ~np.isnan(values)
+
+    numerator = _decayed_sum(values = np.where(present, values, 0.0), offsets = offsets, decay = decay)
+    denominator = _decayed_counts(present = present, offsets = offsets, decay = decay)
+
+    return numerator, denominator
+
+
+def segment_counts(present: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Returns the number of present rows seen so far in every segment."""
+
+    seen = np.cumsum(present)
+
+    return seen - (seen - present)[np.arange(len(present)) - offsets]
+
+
+def ewm_mean(values: np.ndarray, offsets: np.ndarray, span: float, min_periods: int = 0) -> np.ndarray:
+    """Matches `groupby(...).ewm(span = span, min_periods = min_periods).mean()`.
+    Arguments:
+    ----
+    values {np.ndarray} -- The values of every row.
+    offsets {np.ndarray} -- The position of every row inside its segment.
+    span {float} -- The span of the weights.
+    Keyword Arguments:
+    ----
+    min_periods {int} -- The number of values needed before a mean is returned. (default: {0})
+    Returns:
+    ----
+    {np.ndarray} -- The exponentially weighted mean of every row.
+    """
+
+    numerator, denominator = ewm_sums(values = values, offsets = offsets, span = span)
+    seen = segment_counts(present = ~np.isnan(values), offsets = offsets)
+
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        means = numerator / denominator
+
+    return np.where(seen >= max(min_periods, 1), means, np.nan)
+
+
+def ewm_mean_sweep(values: np.ndarray, offsets: np.ndarray, spans: Sequence[float], min_periods: int = 0) -> np.ndarray:
+    """Returns `ewm_mean` for every span, sharing everything but the scans.
+    Arguments:
+    ----
+    values {np.ndarray} -- The values of every row.
+    offsets {np.ndarray} -- The position of every row inside its segment.
+    spans {Sequence[float]} -- The spans of the weights.
+    Keyword Arguments:
+    ----
+    min_periods {int} -- The number of values needed before a mean is returned. (default: {0})
+    Returns:
+    ----
+    {np.ndarray} -- One column per span, matching `ewm_mean` exactly.
+    """
+
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+
+    # Count the values seen so far in each segment.
+    seen = np.cumsum(present)
+    seen = seen - (seen - present)[np.arange(len(values)) - offsets]
+    shown = seen >= max(min_periods, 1)
+
+    means = np.empty((len(values), len(spans)), order = 'F')
+
+    for position, span in enumerate(spans):
+
+        decay = 1.0 - 2.0 / (span + 1.0)
+
+        numerator = _decayed_sum(values = filled, offsets = offsets, decay = decay)
+        denominator = _decayed_counts(present = present, offsets = offsets, decay = decay)
+
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            means[:, position] = np.where(shown, numerator / denominator, np.nan)
+
+    return means
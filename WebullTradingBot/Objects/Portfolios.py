@@ -263,6 +263,38 @@ class Portfolio():
 
         self._stock_frame = stock_frame
 
+    @property
+    def stock_frame_daily(self) -> StockFrame:
+        """Gets the daily StockFrame object for the Portfolio
+        Overview:
+        ----
+        If no daily StockFrame was set, it is derived from the intraday
+        StockFrame as a `daily` timeframe, which is then kept up to date
+        as new intraday bars are added.
+        Returns:
+        ----
+        {StockFrame} -- A StockFrame object with daily bars.
+        """
+
+        if self._stock_frame_daily is None and self._stock_frame is not None:
+
+            if 'daily' not in self._stock_frame.timeframes:
+                self._stock_frame.add_timeframe(name = 'daily', minutes = 1440)
+
+            return self._stock_frame.timeframe(name = 'daily')
+
+        return self._stock_frame_daily
+
+    @stock_frame_daily.setter
+    def stock_frame_daily(self, stock_frame: StockFrame) -> None:
+        """Sets the daily StockFrame object for the Portfolio
+        Arguments:
+        ----
+        stock_frame {StockFrame} -- A StockFrame object with daily bars.
+        """
+
+        self._stock_frame_daily = stock_frame
+
     @property
     def webull_client(self):
         """Gets the webull object for the Portfolio
@@ -0,0 +1,228 @@
+import numpy as np
+import pandas as pd
+
+from typing import List
+from typing import Dict
+from typing import Callable
+
+from Objects.ColumnStore import SymbolBuffer
+
+_MS_PER_MINUTE = 60000
+
+
+class BarResampler():
+
+    """
+    Represents an incremental resampler which folds lower timeframe
+    bars into the open bucket of a higher timeframe, one bar at a time.
+    """
+
+    def __init__(self, minutes: int, offset_minutes: int = 0) -> None:
+        """Initalizes the Bar Resampler.
+        Arguments:
+        ----
+        minutes {int} -- The size of the higher timeframe bars, for example `5`
+            or `1440` for daily bars.
+        Keyword Arguments:
+        ----
+        offset_minutes {int} -- Shifts the bucket boundaries away from the unix
+            epoch (UTC midnight for daily bars). (default: {0})
+        """
+
+        if minutes < 1:
+            raise ValueError("A resampled bar must span at least one minute.")
+
+        self.minutes = minutes
+        self._interval = minutes * _MS_PER_MINUTE
+        self._offset = offset_minutes * _MS_PER_MINUTE
+
+        # The open bucket of each symbol.
+        self._buckets: Dict[str, Dict] = {}
+
+    def bucket_start(self, datetime: np.ndarray) -> np.ndarray:
+        """Returns the start of the bucket each timestamp falls in.
+        Arguments:
+        ----
+        datetime {np.ndarray} -- Epoch millisecond timestamps.
+        Returns:
+        ----
+        {np.ndarray} -- The epoch millisecond bucket starts.
+        """
+
+        return (datetime - self._offset) // self._interval * self._interval + self._offset
+
+    @staticmethod
+    def _first(values: np.ndarray) -> float:
+        """Grabs the first value that isn't missing, like `first` in a pandas groupby."""
+
+        found = np.flatnonzero(~np.isnan(values))
+
+        return values[found[0]] if len(found) else np.nan
+
+    def _open_bucket(self, symbol: str, start: int, columns: Dict[str, np.ndarray]) -> Dict:
+        """Builds the state of an open bucket from all of its bars.
+        Arguments:
+        ----
+        symbol {str} -- The symbol of the bucket.
+        start {int} -- The epoch millisecond start of the bucket.
+        columns {Dict[str, np.ndarray]} -- The sorted `datetime` and price columns
+            of the bucket's bars, at least one of them.
+        Returns:
+        ----
+        {Dict} -- The bucket, with the totals before its last bar so the last
+            bar can be sent again.
+        """
+
+        columns = {name: np.asarray(values) for name, values in columns.items()}
+        high = columns['high'].astype('float64')
+        low = columns['low'].astype('float64')
+        volume = columns['volume'].astype('float64')
+
+        return {
+            'symbol': symbol,
+            'datetime': int(start),
+            'open': self._first(columns['open'].astype('float64')),
+            'close': self._first(columns['close'][::-1].astype('float64')),
+            'high': np.fmax.reduce(high),
+            'low': np.fmin.reduce(low),
+            'volume': np.nansum(volume),
+            'first_datetime': int(columns['datetime'][0]),
+            'last_datetime': int(columns['datetime'][-1]),
+            'high_before_last': np.fmax.reduce(high[:-1], initial = np.nan),
+            'low_before_last': np.fmin.reduce(low[:-1], initial = np.nan),
+            'volume_before_last': np.nansum(volume[:-1])
+        }
+
+    def seed(self, symbols: np.ndarray, columns: Dict[str, np.ndarray]) -> List[Dict]:
+        """Resamples a block of history in one vectorized pass.
+        Overview:
+        ----
+        The history must be sorted by symbol and then by time, which is how
+        a StockFrame keeps it. The last bucket of every symbol is kept open so
+        the bars that arrive afterwards are folded into it.
+        Arguments:
+        ----
+        symbols {np.ndarray} -- The symbol of every row.
+        columns {Dict[str, np.ndarray]} -- The `datetime` and price columns of every row.
+        Returns:
+        ----
+        {List[Dict]} -- The resampled bars.
+        """
+
+        if len(symbols) == 0:
+            return []
+
+        datetime = np.asarray(columns['datetime'], dtype = 'int64')
+        bucket_starts = self.bucket_start(datetime = datetime)
+
+        history = pd.DataFrame(data = {name: columns[name] for name in SymbolBuffer.price_columns})
+        history['symbol'] = symbols
+        history['datetime'] = bucket_starts
+
+        grouped = history.groupby(by = ['symbol', 'datetime'], sort = False).agg(
+            open = ('open', 'first'),
+            close = ('close', 'last'),
+            high = ('high', 'max'),
+            low = ('low', 'min'),
+            volume = ('volume', 'sum')
+        ).reset_index()
+
+        # Open the last bucket of every symbol.
+        symbol_ends = np.r_[symbols[1:] != symbols[:-1], True]
+        group_starts = np.flatnonzero(np.r_[True, symbol_ends[:-1] | (bucket_starts[1:] != bucket_starts[:-1])])
+        group_ends = np.r_[group_starts[1:], len(symbols)]
+
+        for first, last in zip(group_starts[symbol_ends[group_ends - 1]], np.flatnonzero(symbol_ends) + 1):
+            self._buckets[symbols[first]] = self._open_bucket(
+                symbol = symbols[first],
+                start = bucket_starts[first],
+                columns = {name: columns[name][first:last] for name in ['datetime'] + SymbolBuffer.price_columns}
+            )
+
+        return grouped.to_dict(orient = 'records')
+
+    def update(self, columns: Dict[str, np.ndarray], history: Callable[[str, int, int], Dict[str, np.ndarray]]) -> List[Dict]:
+        """Folds new bars into the open buckets.
+        Overview:
+        ----
+        Call it once the bars are in the lower timeframe. A bar newer than
+        the open bucket's last bar costs O(1): it either opens a new bucket or
+        moves the high, low, close and volume of the open one forward. A bar
+        that is sent again (the still forming last bar) replaces its earlier
+        high, low, close and volume instead of being counted twice. Any other
+        bar, a late one inside the open bucket or one for an older bucket, has
+        its bucket rebuilt from the lower timeframe bars.
+        Arguments:
+        ----
+        columns {Dict[str, np.ndarray]} -- The `symbol`, `datetime` and price columns,
+            as returned by `quote_columns`.
+        history {Callable[[str, int, int], Dict[str, np.ndarray]]} -- Grabs the sorted
+            `datetime` and price columns of a symbol's lower timeframe bars from a
+            start up to an end timestamp.
+        Returns:
+        ----
+        {List[Dict]} -- The buckets that changed, as quotes keyed by the bucket start.
+        """
+
+        datetime = np.asarray(columns['datetime'], dtype = 'int64')
+        bucket_starts = self.bucket_start(datetime = datetime)
+        changed = {}
+        rebuilds = set()
+
+        for row in np.argsort(datetime, kind = 'stable'):
+
+            symbol = str(columns['symbol'][row])
+            time_stamp = int(datetime[row])
+            start = int(bucket_starts[row])
+            bucket = self._buckets.get(symbol)
+
+            if bucket is None or start < bucket['datetime'] or (start == bucket['datetime'] and time_stamp < bucket['last_datetime']):
+                rebuilds.add((symbol, start))
+                continue
+
+            if start > bucket['datetime']:
+                bucket = self._open_bucket(
+                    symbol = symbol,
+                    start = start,
+                    columns = {name: columns[name][row:row + 1] for name in ['datetime'] + SymbolBuffer.price_columns}
+                )
+                self._buckets[symbol] = bucket
+
+            else:
+
+                # A newer bar starts from the totals so far, a resent one from the totals before it.
+                if time_stamp > bucket['last_datetime']:
+                    bucket['high_before_last'] = bucket['high']
+                    bucket['low_before_last'] = bucket['low']
+                    bucket['volume_before_last'] = bucket['volume']
+                    bucket['last_datetime'] = time_stamp
+                elif time_stamp == bucket['first_datetime']:
+                    bucket['open'] = columns['open'][row]
+
+                bucket['high'] = np.fmax(bucket['high_before_last'], columns['high'][row])
+                bucket['low'] = np.fmin(bucket['low_before_last'], columns['low'][row])
+                bucket['close'] = columns['close'][row]
+                bucket['volume'] = np.nansum([bucket['volume_before_last'], columns['volume'][row]])
+
+            changed[(symbol, start)] = bucket
+
+        # The buckets a bar landed in out of order are rebuilt from the lower timeframe.
+        for symbol, start in sorted(rebuilds, key = lambda key: key[1]):
+
+            bars = history(symbol, start, start + self._interval)
+
+            if not len(bars['datetime']):
+                continue
+
+            bucket = self._open_bucket(symbol = symbol, start = start, columns = bars)
+            open_bucket = self._buckets.get(symbol)
+
+            if open_bucket is None or open_bucket['datetime'] <= start:
+                self._buckets[symbol] = bucket
+
+            changed[(symbol, start)] = bucket
+
+        return [
+            {name: bucket[name] for name in ['symbol', 'datetime'] + SymbolBuffer.price_columns}
+            for _, bucket in sorted(changed.items(), key = lambda item: item[0][1])
+        ]
@@ -1,58 +1,1272 @@
+import json
+
+import numpy as np
 import pandas as pd
 
-from typing import List
-from typing import Dict
-from typing import Union
+from typing import List
+from typing import Dict
+from typing import Union
+from typing import Tuple
+from typing import Iterable
+
+from pandas.core.groupby import DataFrameGroupBy
+from pandas.core.window import RollingGroupby
+from pandas.core.window import Window
+
+from Objects.ColumnStore import ColumnStore
+from Objects.ColumnStore import SymbolBuffer
+from Objects.ColumnStore import quote_columns
+from Objects.BarStore import BarStore
+from Objects.Resampler import BarResampler
+from Objects.Kernels import row_offsets
+
+
+class StockFrame():
+    def __init__(self, data: Union[List[Dict], Iterable], backend: str = 'pandas', compact: bool = False) -> None:
+        """Initalizes the Stock Data Frame Object.
+        Arguments:
+        ----
+        data {Union[List[Dict], Iterable]} -- The data to convert to a frame. Normally, this is 
+            returned from the historical prices endpoint. It can also be an iterator or
+            generator of candle chunks, each chunk being a list of quotes or a dictionary
+            of column arrays, in which case the chunks are copied straight into column
+            buffers and the full list of quotes is never built.
+        Keyword Arguments:
+        ----
+        backend {str} -- The storage backend, either `'pandas'` which keeps the
+            bars in a multi-index data frame, or `'columnar'` which keeps them in
+            per-symbol NumPy arrays and builds the frame only when it is asked for.
+            (default: {'pandas'})
+        compact {bool} -- Store the prices as `float32`, the volume as `uint64` and keep
+            the `datetime` level as int64 epoch milliseconds, use `timestamps` to get
+            them as datetimes. (default: {False})
+        """
+
+        if backend not in ('pandas', 'columnar'):
+            raise ValueError("Unknown StockFrame backend: {backend}".format(backend = backend))
+
+        streaming = not isinstance(data, (list, dict))
+
+        self._data = None if streaming else data
+        self._backend = backend
+        self._compact = compact
+        self._store: ColumnStore = None
+        self._bar_store: BarStore = None
+        self._frame_stale = False
+        self._frame_outputs: Dict[str, int] = {}
+
+        if backend == 'columnar':
+            self._store = ColumnStore(compact = compact)
+            self._frame: pd.DataFrame = None
+            self._frame_stale = True
+
+            for chunk in (data if streaming else [data]):
+                self._store.add_rows(data = chunk)
+
+        elif streaming:
+            self._frame: pd.DataFrame = self._create_frame_from_chunks(chunks = data)
+        else:
+            self._frame: pd.DataFrame = self.create_frame()
+
+        self._version = 0
+        self._symbol_groups = None
+        self._symbol_groups_version = None
+        self._symbol_indices = None
+        self._symbol_positions = None
+        self._symbol_positions_version = None
+        self._symbol_offsets = None
+        self._symbol_offsets_version = None
+        self._symbol_rolling_groups = None
+        self._timeframes: Dict[str, Tuple[BarResampler, 'StockFrame']] = {}
+
+        self._retention: Dict = None
+        self._required_bars = 0
+
+        self._outputs: Dict[str, np.ndarray] = {}
+        self._outputs_version = None
+
+        self.snapshot_metadata: Dict = {}
+
+        self._latest_rows: pd.DataFrame = None
+        self._latest_rows_key = None
+
+        self._symbol_versions: Dict[str, int] = {}
+        self._oldest_symbol_version = None
+        self._oldest_symbol_version_key = None
+        self._level_ms_cache = None
+
+        self._edits: List[Tuple[int, str, int]] = []
+        self._edits_floor = 0
+
+    @classmethod
+    def from_bar_store(cls, bar_store: BarStore, symbols: List[str] = None, start: int = None, end: int = None) -> 'StockFrame':
+        """Opens a StockFrame on top of a persistent bar store.
+        Overview:
+        ----
+        The StockFrame uses the `columnar` backend and its buffers point
+        straight at the memory-mapped columns of the store, so only the
+        pages inside the requested range are ever read from disk. Rows
+        added afterwards are also appended to the tail of the store.
+        Arguments:
+        ----
+        bar_store {BarStore} -- The bar store to open.
+        Keyword Arguments:
+        ----
+        symbols {List[str]} -- The symbols to load, all of them if not set. (default: {None})
+        start {int} -- The first epoch millisecond timestamp to load. (default: {None})
+        end {int} -- The epoch millisecond timestamp to stop before. (default: {None})
+        Returns:
+        ----
+        {StockFrame} -- A StockFrame backed by the bar store.
+        Usage:
+        ----
+            >>> bar_store = BarStore(path='bars')
+            >>> bar_store.append(data=historical_prices['aggregated'])
+            >>> stock_frame = StockFrame.from_bar_store(bar_store=bar_store, symbols=['MSFT'])
+        """
+
+        stock_frame = cls(data = [], backend = 'columnar')
+
+        for symbol in symbols or bar_store.symbols:
+
+            columns = bar_store.read(symbol = symbol, start = start, end = end)
+
+            if len(columns['datetime']):
+                stock_frame._store.buffer(symbol = symbol).adopt(
+                    datetime = columns['datetime'],
+                    columns = columns
+                )
+
+        stock_frame._bar_store = bar_store
+        stock_frame._frame_stale = True
+
+        return stock_frame
+
+    def save_snapshot(self, path: str, metadata: Dict = None) -> None:
+        """Saves the StockFrame to a binary columnar snapshot.
+        Overview:
+        ----
+        Every column of the frame, indicator columns included, is written as
+        a raw NumPy array to an uncompressed `.npz` file, along with the symbol
+        codes and the epoch millisecond timestamps, so loading it back is just
+        a read of each array.
+        Arguments:
+        ----
+        path {str} -- The snapshot file path.
+        Keyword Arguments:
+        ----
+        metadata {Dict} -- Extra JSON serializable data to keep in the snapshot. (default: {None})
+        """
+
+        frame = self.frame
+        index = frame.index
+
+        arrays = {
+            'symbols': np.asarray(index.levels[0], dtype = str),
+            'symbol_codes': np.asarray(index.codes[0]),
+            'datetime': self._datetime_ms()
+        }
+
+        for column_name in frame.columns:
+            arrays['column:' + column_name] = frame[column_name].to_numpy()
+
+        arrays['metadata'] = np.array(json.dumps({
+            'backend': self._backend,
+            'compact': self._compact,
+            'extra': metadata or {}
+        }))
+
+        with open(path, 'wb') as snapshot_file:
+            np.savez(snapshot_file, **arrays)
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> 'StockFrame':
+        """Loads a StockFrame from a snapshot written by `save_snapshot`.
+        Arguments:
+        ----
+        path {str} -- The snapshot file path.
+        Returns:
+        ----
+        {StockFrame} -- The restored StockFrame, with its indicator columns.
+        """
+
+        with np.load(path) as snapshot:
+
+            metadata = json.loads(str(snapshot['metadata']))
+            columns = {name: snapshot['column:' + name] for name in SymbolBuffer.price_columns}
+            columns['symbol'] = snapshot['symbols'].astype(object)[snapshot['symbol_codes']]
+            columns['datetime'] = snapshot['datetime']
+
+            stock_frame = cls(data = columns, backend = metadata['backend'], compact = metadata['compact'])
+
+            # The snapshot was written in frame order, so the columns line up.
+            frame = stock_frame.frame
+            for key in snapshot.files:
+                column_name = key[len('column:'):]
+                if key.startswith('column:') and column_name not in SymbolBuffer.price_columns:
+                    frame[column_name] = snapshot[key]
+
+        stock_frame.snapshot_metadata = metadata['extra']
+
+        return stock_frame
+
+    def tail_timestamps(self) -> Dict[str, int]:
+        """Returns the timestamp of the last bar of each symbol.
+        Returns:
+        ----
+        {Dict[str, int]} -- The epoch millisecond timestamps keyed by symbol.
+        """
+
+        if self._backend == 'columnar':
+            return {
+                symbol: int(self._store.buffer(symbol = symbol).datetime[-1])
+                for symbol in self._store.symbols if self._store.has_symbol(symbol = symbol)
+            }
+
+        datetime = self._datetime_ms()
+
+        return {symbol: int(datetime[end - 1]) for symbol, (start, end) in self.symbol_positions.items()}
+
+    @property
+    def bar_store(self) -> BarStore:
+        """The bar store new rows are persisted to, if any.
+        Returns:
+        ----
+        {BarStore} -- The bar store or `None`.
+        """
+
+        return self._bar_store
+
+    @bar_store.setter
+    def bar_store(self, bar_store: BarStore) -> None:
+        """Sets the bar store new rows are persisted to.
+        Arguments:
+        ----
+        bar_store {BarStore} -- The bar store, or `None` to stop persisting.
+        """
+
+        self._bar_store = bar_store
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """The frame object.
+        Overview:
+        ----
+        With the `columnar` backend the frame is rebuilt from the column
+        store the first time it is accessed after new rows were added or
+        outputs were written to the symbol buffers. The output columns live
+        in the buffers, so they are part of every rebuild, and columns
+        assigned straight to the frame are moved into the buffers before
+        the bars change.
+        Returns:
+        ----
+        pd.DataFrame -- A pandas data frame with the price data.
+        """
+
+        if self._frame_stale:
+            self._frame = self._store.to_frame()
+            self._frame_stale = False
+            self._frame_outputs = {
+                column_name: self._frame[column_name].to_numpy().__array_interface__['data'][0]
+                for column_name in self._store.output_names
+            }
+
+        return self._frame
+
+    def __len__(self) -> int:
+        """The number of bars held by the StockFrame."""
+
+        if self._backend == 'columnar' and self._frame_stale:
+            positions = self.symbol_positions
+            return max([end for start, end in positions.values()], default = 0)
+
+        return len(self._frame)
+
+    @property
+    def columns(self) -> List[str]:
+        """The columns of the frame, without building it.
+        Returns:
+        ----
+        {List[str]} -- The price columns followed by the output columns.
+        """
+
+        if self._backend == 'columnar' and self._frame_stale:
+            return SymbolBuffer.price_columns + self._store.output_names
+
+        return list(self._frame.columns)
+
+    def _invalidate_frame(self) -> None:
+        """Marks a columnar frame for a rebuild, moving the columns assigned straight to it into the symbol buffers."""
+
+        if self._backend != 'columnar' or self._frame_stale:
+            return
+
+        frame = self._frame
+        positions = self._store.positions()
+
+        for column_name in frame.columns:
+
+            if column_name in SymbolBuffer.price_columns:
+                continue
+
+            values = frame[column_name].to_numpy()
+
+            # The column still holds what the buffers gave the frame.
+            if self._frame_outputs.get(column_name) == values.__array_interface__['data'][0]:
+                continue
+
+            for symbol, (start, end) in positions.items():
+                self._store.output(symbol = symbol, name = column_name, dtype = values.dtype)[:] = values[start:end]
+
+        for column_name in self._store.output_names:
+            if column_name not in frame.columns:
+                self._store.drop_output(name = column_name)
+
+        self._frame_stale = True
+
+    @property
+    def backend(self) -> str:
+        """The storage backend of the StockFrame.
+        Returns:
+        ----
+        {str} -- Either `'pandas'` or `'columnar'`.
+        """
+
+        return self._backend
+
+    @property
+    def compact(self) -> bool:
+        """Specifies whether the StockFrame uses the compact dtypes.
+        Returns:
+        ----
+        {bool} -- `True` if prices are `float32` and timestamps are epoch milliseconds.
+        """
+
+        return self._compact
+
+    @property
+    def timestamps(self) -> pd.DatetimeIndex:
+        """The `datetime` level of the frame as datetimes.
+        Overview:
+        ----
+        In compact mode the `datetime` level holds epoch milliseconds, this
+        converts them only when they are asked for.
+        Returns:
+        ----
+        {pd.DatetimeIndex} -- The timestamp of every row.
+        """
+
+        datetime = self.frame.index.get_level_values('datetime')
+
+        if self._compact:
+            datetime = pd.to_datetime(np.asarray(datetime), unit = 'ms', origin = 'unix')
+
+        return pd.DatetimeIndex(datetime)
+
+    def _datetime_ms(self) -> np.ndarray:
+        """Returns the `datetime` level of the frame as epoch milliseconds."""
+
+        index = self.frame.index
+
+        return self._level_ms(level = index.levels[1])[np.asarray(index.codes[1])]
+
+    def _level_ms(self, level: pd.Index) -> np.ndarray:
+        """Returns the distinct values of a `datetime` level as epoch milliseconds,
+        converted once per level."""
+
+        if self._compact or not len(level):
+            return np.asarray(level, dtype = 'int64')
+
+        if self._level_ms_cache is None or self._level_ms_cache[0] is not level:
+            self._level_ms_cache = (level, np.asarray(pd.DatetimeIndex(level).as_unit('ms').asi8))
+
+        return self._level_ms_cache[1]
+
+    def add_timeframe(self, name: str, minutes: int, offset_minutes: int = 0) -> 'StockFrame':
+        """Adds a higher timeframe which is kept up to date from this StockFrame.
+        Overview:
+        ----
+        The existing history is resampled once, and from then on every
+        call to `add_rows` only folds the newest bars into the open bucket
+        of each symbol. The higher timeframe is a StockFrame of its own, so
+        indicators can be added to it like any other.
+        Arguments:
+        ----
+        name {str} -- The name of the timeframe, for example `'5m'` or `'daily'`.
+        minutes {int} -- The size of the higher timeframe bars in minutes.
+        Keyword Arguments:
+        ----
+        offset_minutes {int} -- Shifts the bucket boundaries away from the unix
+            epoch (UTC midnight for daily bars). (default: {0})
+        Returns:
+        ----
+        {StockFrame} -- The higher timeframe StockFrame.
+        Usage:
+        ----
+            >>> stock_frame = trading_robot.create_stock_frame(
+                data=historical_prices['aggregated']
+            )
+            >>> five_minute_frame = stock_frame.add_timeframe(name='5m', minutes=5)
+            >>> daily_frame = stock_frame.add_timeframe(name='daily', minutes=1440)
+        """
+
+        resampler = BarResampler(minutes = minutes, offset_minutes = offset_minutes)
+
+        frame = self.frame
+        columns = {name: frame[name].to_numpy() for name in SymbolBuffer.price_columns}
+        columns['datetime'] = self._datetime_ms()
+
+        bars = resampler.seed(
+            symbols = np.asarray(frame.index.get_level_values('symbol'), dtype = object),
+            columns = columns
+        )
+
+        stock_frame = StockFrame(data = bars, backend = self._backend, compact = self._compact)
+
+        self._timeframes[name] = (resampler, stock_frame)
+
+        return stock_frame
+
+    def timeframe(self, name: str) -> 'StockFrame':
+        """Grabs a higher timeframe added with `add_timeframe`.
+        Arguments:
+        ----
+        name {str} -- The name of the timeframe.
+        Raises:
+        ----
+        KeyError: If the timeframe was never added.
+        Returns:
+        ----
+        {StockFrame} -- The higher timeframe StockFrame.
+        """
+
+        return self._timeframes[name][1]
+
+    @property
+    def timeframes(self) -> List[str]:
+        """The names of the higher timeframes kept by this StockFrame.
+        Returns:
+        ----
+        {List[str]} -- A list of timeframe names.
+        """
+
+        return list(self._timeframes)
+
+    def set_retention(self, max_bars: int = None, max_age_minutes: int = None, warmup: int = 3, spill_to: BarStore = None) -> None:
+        """Sets the retention policy of the StockFrame.
+        Overview:
+        ----
+        Without a retention policy the StockFrame keeps every bar it is
+        given. With one, `add_rows` evicts the oldest bars of each symbol
+        once they fall outside the window. To keep evictions amortized O(1)
+        a symbol may grow a quarter past its limit, or keep bars a quarter
+        of the age limit too old, before it is trimmed.
+        A symbol never keeps fewer bars than the registered indicators need,
+        see `require_bars`.
+        Keyword Arguments:
+        ----
+        max_bars {int} -- The number of bars to keep per symbol. (default: {None})
+        max_age_minutes {int} -- Evict bars older than this many minutes before
+            the newest bar of the symbol. (default: {None})
+        warmup {int} -- If neither limit is set, keep `warmup` times the bars required
+            by the indicators. (default: {3})
+        spill_to {BarStore} -- A bar store the evicted bars are written to, unless the
+            StockFrame already persists every bar to its own bar store. (default: {None})
+        Usage:
+        ----
+            >>> # Keep two trading days of minute bars.
+            >>> stock_frame.set_retention(max_bars=780)
+            >>> # Size the window from the indicators.
+            >>> stock_frame.set_retention()
+        """
+
+        self._retention = {
+            'max_bars': max_bars,
+            'max_age': None if max_age_minutes is None else max_age_minutes * 60000,
+            'warmup': warmup,
+            'spill_to': spill_to
+        }
+
+        self._evict()
+
+    def require_bars(self, bars: int) -> None:
+        """Sets the number of bars per symbol the retention policy must keep.
+        Arguments:
+        ----
+        bars {int} -- The longest lookback of the indicators using this StockFrame.
+        """
+
+        self._required_bars = bars
+
+    def _evict(self) -> None:
+        """Evicts the bars that fall outside the retention policy."""
+
+        if self._retention is None:
+            return
+
+        max_bars = self._retention['max_bars']
+        max_age = self._retention['max_age']
+
+        if max_bars is None and max_age is None:
+            if not self._required_bars:
+                return
+            max_bars = self._required_bars * self._retention['warmup']
+        elif max_bars is not None:
+            max_bars = max(max_bars, self._required_bars)
+
+        if self._backend == 'columnar':
+            blocks = {symbol: (0, len(self._store.buffer(symbol = symbol))) for symbol in self._store.symbols}
+            blocks = {symbol: block for symbol, block in blocks.items() if block[1]}
+        else:
+            blocks = self.symbol_positions
+
+        if not blocks:
+            return
+
+        bounds = np.array(list(blocks.values()), dtype = 'int64').reshape(-1, 2)
+        sizes = bounds[:, 1] - bounds[:, 0]
+        drops = np.zeros(len(sizes), dtype = 'int64')
+
+        if max_bars is not None:
+            drops = np.where(sizes > max_bars + max(max_bars // 4, 1), sizes - max_bars, 0)
+
+        if max_age is not None:
+
+            # Only the first and last bar of each symbol are read to find the ones to trim.
+            if self._backend == 'columnar':
+                buffers = [self._store.buffer(symbol = symbol) for symbol in blocks]
+                heads = np.array([buffer.datetime[0] for buffer in buffers], dtype = 'int64')
+                tails = np.array([buffer.datetime[-1] for buffer in buffers], dtype = 'int64')
+            else:
+                level_ms = self._level_ms(level = self._frame.index.levels[1])
+                codes = np.asarray(self._frame.index.codes[1])
+                heads = level_ms[codes[bounds[:, 0]]]
+                tails = level_ms[codes[bounds[:, 1] - 1]]
+
+            for position in np.flatnonzero(heads < tails - max_age - max(max_age // 4, 1)).tolist():
+
+                start, end = bounds[position].tolist()
+
+                if self._backend == 'columnar':
+                    symbol_datetime = buffers[position].datetime
+                else:
+                    symbol_datetime = level_ms[codes[start:end]]
+
+                too_old = int(np.searchsorted(symbol_datetime, tails[position] - max_age, side = 'left'))
+                drops[position] = max(drops[position], min(too_old, sizes[position] - self._required_bars))
+
+        drops = {symbol: drop for symbol, drop in zip(blocks, drops.tolist()) if drop > 0}
+
+        if not drops:
+            return
+
+        self._spill(blocks = blocks, drops = drops)
+
+        if self._backend == 'columnar':
+            self._invalidate_frame()
+            for symbol, drop in drops.items():
+                self._store.buffer(symbol = symbol).drop_head(count = drop)
+        else:
+            self._frame = self._drop_heads(blocks = blocks, drops = drops)
+
+        self._version += 1
+        self._touch_symbols(symbols = list(drops))
+
+    def _drop_heads(self, blocks: Dict[str, Tuple[int, int]], drops: Dict[str, int]) -> pd.DataFrame:
+        """Removes the oldest bars of some symbols from the frame.
+        Overview:
+        ----
+        Like `_merge_rows`, every column and both code arrays of the index get
+        one `np.delete` and the index is put back together from its levels and
+        codes. Timestamps no bar uses anymore are dropped from the level.
+        Arguments:
+        ----
+        blocks {Dict[str, Tuple[int, int]]} -- The row range of each symbol.
+        drops {Dict[str, int]} -- The number of bars to drop from each symbol's head.
+        Returns:
+        ----
+        {pd.DataFrame} -- The trimmed frame.
+        """
+
+        frame = self._frame
+        index = frame.index
+
+        starts = np.array([blocks[symbol][0] for symbol in drops], dtype = 'int64')
+        counts = np.array(list(drops.values()), dtype = 'int64')
+
+        # The head runs of the symbols, as one array of row positions.
+        rows = np.arange(counts.sum()) + np.repeat(starts - np.cumsum(counts) + counts, counts)
+
+        symbol_codes = np.delete(np.asarray(index.codes[0]), rows)
+        datetime_codes = np.delete(np.asarray(index.codes[1]), rows)
+        datetime_level = index.levels[1]
+
+        used = np.bincount(datetime_codes, minlength = len(datetime_level)) > 0
+
+        if not used.all():
+            datetime_codes = (np.cumsum(used) - 1)[datetime_codes]
+            datetime_level = datetime_level[used]
+
+        trimmed_index = pd.MultiIndex(
+            levels = [index.levels[0], datetime_level],
+            codes = [symbol_codes, datetime_codes],
+            names = index.names,
+            verify_integrity = False
+        )
+
+        trimmed = {column_name: np.delete(frame[column_name].to_numpy(), rows) for column_name in frame.columns}
+
+        return pd.DataFrame(trimmed, index = trimmed_index, columns = frame.columns, copy = False)
+
+    def _spill(self, blocks: Dict[str, Tuple[int, int]], drops: Dict[str, int]) -> None:
+        """Writes the bars about to be evicted to the spill bar store."""
+
+        spill_to = self._retention['spill_to']
+
+        if spill_to is None or spill_to is self._bar_store:
+            return
+
+        if self._backend == 'pandas':
+            level_ms = self._level_ms(level = self._frame.index.levels[1])
+            codes = np.asarray(self._frame.index.codes[1])
+
+        for symbol, drop in drops.items():
+
+            if self._backend == 'columnar':
+                buffer = self._store.buffer(symbol = symbol)
+                columns = {name: buffer.column(name)[:drop] for name in SymbolBuffer.price_columns}
+                columns['datetime'] = buffer.datetime[:drop]
+            else:
+                start = blocks[symbol][0]
+                columns = {name: self._frame[name].to_numpy()[start:start + drop] for name in SymbolBuffer.price_columns}
+                columns['datetime'] = level_ms[codes[start:start + drop]]
+
+            columns['symbol'] = np.full(drop, symbol, dtype = object)
+            spill_to.append(data = columns)
+
+    @property
+    def version(self) -> int:
+        """The data version of the StockFrame.
+        Overview:
+        ----
+        The version is bumped every time rows are added, so anything derived
+        from the rows can be cached and rebuilt only when the version moves.
+        Returns:
+        ----
+        {int} -- The current data version.
+        """
+
+        return self._version
+
+    def symbol_version(self, symbol: str) -> int:
+        """The data version at which a symbol's bars last changed.
+        Overview:
+        ----
+        Unlike `version`, this only moves when bars of this symbol are
+        added, replaced or evicted, so results computed for one symbol stay
+        valid while the other symbols receive new bars.
+        Arguments:
+        ----
+        symbol {str} -- The symbol to look up.
+        Returns:
+        ----
+        {int} -- The data version, `0` if the symbol never changed.
+        """
+
+        return self._symbol_versions.get(symbol, 0)
+
+    @property
+    def oldest_symbol_version(self) -> int:
+        """The oldest `symbol_version` of the symbols held, every symbol changed since it.
+        Returns:
+        ----
+        {int} -- The data version, `0` if a symbol never changed.
+        """
+
+        if self._oldest_symbol_version_key != self._version:
+            self._oldest_symbol_version = min(
+                [self._symbol_versions.get(symbol, 0) for symbol in self.symbol_positions],
+                default = 0
+            )
+            self._oldest_symbol_version_key = self._version
+
+        return self._oldest_symbol_version
+
+    def edits_since(self, version: int) -> Union[Dict[str, int], None]:
+        """Returns the bars that were changed in place since a data version.
+        Overview:
+        ----
+        Appending bars at the tail of a symbol is not an edit, replacing a
+        bar (including the still forming last bar) or inserting a late bar
+        is. Anything that keeps running state over the bars can use this to
+        tell whether it only has to fold in the new tail. Only the latest few
+        thousand edits are kept.
+        Arguments:
+        ----
+        version {int} -- The data version the caller is up to date with.
+        Returns:
+        ----
+        {Union[Dict[str, int], None]} -- The epoch millisecond timestamp of the oldest
+            edited bar keyed by symbol, or `None` if the edits are no longer known.
+        """
+
+        if version < self._edits_floor:
+            return None
+
+        edits = {}
+
+        for edit_version, symbol, time_stamp in reversed(self._edits):
+
+            if edit_version <= version:
+                break
+
+            edits[symbol] = min(edits.get(symbol, time_stamp), time_stamp)
+
+        return edits
+
+    def _touch_symbols(self, symbols: Iterable) -> None:
+        """Marks the symbols whose bars changed in the current data version."""
+
+        for symbol in set(symbols):
+            self._symbol_versions[str(symbol)] = self._version
+
+    def _log_edits(self, edits: List[Tuple[str, int]]) -> None:
+        """Records the bars edited by the current data version."""
+
+        self._edits.extend((self._version, symbol, time_stamp) for symbol, time_stamp in edits)
+
+        if len(self._edits) > 4096:
+            self._edits_floor = self._edits[-4097][0]
+            del self._edits[:-4096]
+
+    @property
+    def symbol_groups(self) -> DataFrameGroupBy:
+        """Returns the Groups in the StockFrame.
+        Overview:
+        ----
+        Often we will want to apply operations to a each symbol. The
+        `symbols_groups` property will return the dataframe grouped by
+        each symbol. The groups are cached and only rebuilt after
+        new rows have been added.
+        Returns:
+        ----
+        {DataFrameGroupBy} -- A `pandas.core.groupby.GroupBy` object with each symbol.
+        """
+
+        if self._symbol_groups is None or self._symbol_groups_version != self._version:
+
+            # Group by Symbol.
+            self._symbol_groups: DataFrameGroupBy = self.frame.groupby(
+                by = 'symbol',
+                as_index = False,
+                sort = True
+            )
+
+            self._symbol_indices = None
+            self._symbol_groups_version = self._version
+
+        return self._symbol_groups
+
+    @property
+    def symbol_indices(self) -> Dict[str, np.ndarray]:
+        """Returns the row positions of each symbol in the StockFrame.
+        Returns:
+        ----
+        {Dict[str, np.ndarray]} -- The integer row positions keyed by symbol,
+            cached alongside `symbol_groups`.
+        """
+
+        groups = self.symbol_groups
+
+        if self._symbol_indices is None:
+            self._symbol_indices = groups.indices
+
+        return self._symbol_indices
+
+    @property
+    def symbol_positions(self) -> Dict[str, Tuple[int, int]]:
+        """Returns the position table of each symbol's block of rows.
+        Overview:
+        ----
+        The StockFrame is kept sorted by symbol, so every symbol's bars
+        sit in one contiguous block of rows. This table maps each symbol
+        to the `(start, end)` row positions of its block, which lets bar
+        lookups be plain integer slices. It is rebuilt once after rows
+        have been added.
+        Returns:
+        ----
+        {Dict[str, Tuple[int, int]]} -- The `(start, end)` positions keyed by symbol.
+        """
+
+        if self._backend == 'columnar' and (self._symbol_positions is None or self._symbol_positions_version != self._version):
+
+            # The buffers already know their sizes, no need to build the frame.
+            self._symbol_positions = self._store.positions()
+            self._symbol_positions_version = self._version
+
+        if self._symbol_positions is None or self._symbol_positions_version != self._version:
+
+            # Work on the integer codes of the symbol level.
+            index = self.frame.index
+            codes = np.asarray(index.codes[0])
+            levels = index.levels[0]
+
+            boundaries = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(codes)]))
+
+            positions = {}
+
+            if len(codes):
+                symbols = np.asarray(levels, dtype = object)[codes[starts]]
+                positions = dict(zip(symbols, zip(starts.tolist(), ends.tolist())))
+
+            # A symbol showing up in two blocks means the frame lost its order.
+            if len(positions) != len(starts) and len(codes):
+                self.frame.sort_index(inplace = True)
+                self._symbol_groups_version = None
+                self._symbol_positions_version = None
+                return self.symbol_positions
+
+            self._symbol_positions = positions
+            self._symbol_positions_version = self._version
+
+        return self._symbol_positions
+
+    @property
+    def symbol_offsets(self) -> np.ndarray:
+        """Returns the position of every row inside its symbol's block.
+        Overview:
+        ----
+        This is what the segmented kernels in `Objects.Kernels` use to keep
+        rolling windows and weights from reaching across symbols. It is
+        rebuilt once after rows have been added.
+        Returns:
+        ----
+        {np.ndarray} -- The offsets in frame row order, `0` at each symbol's first bar.
+        """
+
+        positions = self.symbol_positions
+
+        if self._symbol_offsets is None or self._symbol_offsets_version != self._version:
+            self._symbol_offsets = row_offsets(positions = positions, size = len(self))
+            self._symbol_offsets_version = self._version
+
+        return self._symbol_offsets
+
+    @property
+    def latest_rows(self) -> pd.DataFrame:
+        """Returns the latest bar of every symbol, indicator columns included.
+        Overview:
+        ----
+        The table is gathered straight from the last row of each symbol's
+        block, so it costs the same no matter how much history is kept. It
+        is cached until rows are added, the columns change, or the indicators
+        are refreshed (see `invalidate_latest_rows`).
+        Returns:
+        ----
+        {pd.DataFrame} -- One row per symbol, indexed by `symbol` and `datetime`.
+        """
+
+        key = (self._version, tuple(self.columns))
+
+        if self._latest_rows is not None and self._latest_rows_key == key:
+            return self._latest_rows
+
+        # A columnar frame waiting for a rebuild is skipped, the last slot of every buffer is read instead.
+        if self._backend == 'columnar' and self._frame_stale:
+            symbols = list(self.symbol_positions)
+            buffers = [self._store.buffer(symbol = symbol) for symbol in symbols]
+
+            datetime = np.array([buffer.datetime[-1] for buffer in buffers], dtype = 'int64')
+            if not self._compact:
+                datetime = pd.to_datetime(datetime, unit = 'ms', origin = 'unix')
+
+            columns = {name: [buffer.column(name)[-1] for buffer in buffers] for name in SymbolBuffer.price_columns}
+            for name in self._store.output_names:
+                columns[name] = [self._store.output(symbol = symbol, name = name)[-1] for symbol in symbols]
+
+            index = pd.MultiIndex.from_arrays(
+                [pd.Categorical(symbols, categories = symbols), datetime],
+                names = ['symbol', 'datetime']
+            )
+            latest_rows = pd.DataFrame(data = columns, index = index)
+
+            for name, dtype in (SymbolBuffer.compact_dtypes if self._compact else SymbolBuffer.default_dtypes).items():
+                latest_rows[name] = latest_rows[name].astype(dtype)
+        else:
+            last_positions = [end - 1 for start, end in self.symbol_positions.values()]
+            latest_rows = self.frame.iloc[last_positions]
 
-from pandas.core.groupby import DataFrameGroupBy
-from pandas.core.window import RollingGroupby
-from pandas.core.window import Window
+        self._latest_rows = latest_rows
+        self._latest_rows_key = key
 
+        return self._latest_rows
 
-class StockFrame():
-    def __init__(self, data: List[Dict]) -> None:
-        """Initalizes the Stock Data Frame Object.
+    def invalidate_latest_rows(self) -> None:
+        """Drops the cached latest rows after indicator columns were rewritten."""
+
+        self._latest_rows = None
+
+    def price_view(self, symbol: str, column_name: str = 'close') -> np.ndarray:
+        """Grabs a read-only view of one price column of a symbol.
+        Overview:
+        ----
+        Unlike `frame.xs(symbol)` this does not copy. With the `columnar`
+        backend the view points straight at the symbol's buffer, with the
+        `pandas` backend it is a slice of the column's block.
         Arguments:
         ----
-        data {List[Dict]} -- The data to convert to a frame. Normally, this is 
-            returned from the historical prices endpoint.
+        symbol {str} -- The symbol to grab the prices for.
+        Keyword Arguments:
+        ----
+        column_name {str} -- The price column, for example `high`. (default: {'close'})
+        Returns:
+        ----
+        {np.ndarray} -- A read-only NumPy view, empty for an unknown symbol.
+        Usage:
+        ----
+            >>> close = stock_frame.price_view(symbol='MSFT')
+            >>> typical_price = (
+                stock_frame.price_view(symbol='MSFT', column_name='high') +
+                stock_frame.price_view(symbol='MSFT', column_name='low') +
+                close
+            ) / 3
         """
 
-        self._data = data
-        self._frame: pd.DataFrame = self.create_frame()
-        self._symbol_groups = None
-        self._symbol_rolling_groups = None
+        if self._backend == 'columnar' and column_name in SymbolBuffer.price_columns:
+            if self._store.has_symbol(symbol = symbol):
+                view = self._store.buffer(symbol = symbol).column(column_name).view()
+            else:
+                view = np.empty(0, dtype = SymbolBuffer.default_dtypes[column_name])
+        elif self._backend == 'columnar' and self._frame_stale and column_name in self._store.output_names:
+            if self._store.has_symbol(symbol = symbol):
+                view = self._store.output(symbol = symbol, name = column_name).view()
+            else:
+                view = np.empty(0)
+        else:
+            start, end = self.symbol_positions.get(symbol, (0, 0))
+            view = self.frame[column_name].to_numpy()[start:end].view()
 
-    @property
-    def frame(self) -> pd.DataFrame:
-        """The frame object.
+        view.flags.writeable = False
+
+        return view
+
+    def price_views(self, symbol: str) -> Dict[str, np.ndarray]:
+        """Grabs read-only views of all the price columns of a symbol.
+        Arguments:
+        ----
+        symbol {str} -- The symbol to grab the prices for.
         Returns:
         ----
-        pd.DataFrame -- A pandas data frame with the price data.
+        {Dict[str, np.ndarray]} -- The `open`, `close`, `high`, `low` and `volume` views.
         """
-        return self._frame
 
-    @property
-    def symbol_groups(self) -> DataFrameGroupBy:
-        """Returns the Groups in the StockFrame.
+        return {name: self.price_view(symbol = symbol, column_name = name) for name in SymbolBuffer.price_columns}
+
+    def bar_datetime(self, symbol: str, start: int = 0, end: int = None) -> np.ndarray:
+        """Grabs the epoch millisecond timestamps of some of a symbol's bars.
         Overview:
         ----
-        Often we will want to apply operations to a each symbol. The
-        `symbols_groups` property will return the dataframe grouped by
-        each symbol.
+        Only the asked for bars are read, so grabbing the last timestamp of
+        a symbol costs the same however long the history is.
+        Arguments:
+        ----
+        symbol {str} -- The symbol to grab the timestamps for.
+        Keyword Arguments:
+        ----
+        start {int} -- The first bar, counted from the symbol's first bar. (default: {0})
+        end {int} -- The bar to stop before, all of them if not set. (default: {None})
         Returns:
         ----
-        {DataFrameGroupBy} -- A `pandas.core.groupby.GroupBy` object with each symbol.
+        {np.ndarray} -- A read-only array, empty for an unknown symbol.
         """
 
-        # Group by Symbol.
-        self._symbol_groups: DataFrameGroupBy = self._frame.groupby(
-            by = 'symbol',
-            as_index = False,
-            sort = True
-        )
+        if self._backend == 'columnar':
+            if not self._store.has_symbol(symbol = symbol):
+                return np.empty(0, dtype = 'int64')
+            values = self._store.buffer(symbol = symbol).datetime[start:end].view()
+        else:
+            first, last = self.symbol_positions.get(symbol, (0, 0))
+            index = self.frame.index
+            values = self._level_ms(level = index.levels[1])[np.asarray(index.codes[1])[first:last][start:end]]
 
-        return self._symbol_groups
+        values.flags.writeable = False
+
+        return values
+
+    def search_bars(self, symbol: str, time_stamp: int, side: str = 'left') -> int:
+        """Finds where a timestamp goes among a symbol's bars with a binary search.
+        Arguments:
+        ----
+        symbol {str} -- The symbol to search.
+        time_stamp {int} -- The epoch millisecond timestamp.
+        Keyword Arguments:
+        ----
+        side {str} -- `left` for the first bar at or after the timestamp, `right`
+            for the first bar after it. (default: {'left'})
+        Returns:
+        ----
+        {int} -- The position, counted from the symbol's first bar.
+        """
+
+        if self._backend == 'columnar':
+            if not self._store.has_symbol(symbol = symbol):
+                return 0
+            return int(np.searchsorted(self._store.buffer(symbol = symbol).datetime, time_stamp, side = side))
+
+        # The codes of a symbol's block follow its timestamps, since the level is sorted.
+        first, last = self.symbol_positions.get(symbol, (0, 0))
+        index = self.frame.index
+        code = np.searchsorted(self._level_ms(level = index.levels[1]), time_stamp, side = side)
+
+        return int(np.searchsorted(np.asarray(index.codes[1])[first:last], code, side = 'left'))
+
+    def gather_rows(self, column_name: str, spans: List[Tuple[str, int, int]]) -> np.ndarray:
+        """Grabs runs of bars of a price column, without reading the other rows.
+        Arguments:
+        ----
+        column_name {str} -- The price column, for example `close`.
+        spans {List[Tuple[str, int, int]]} -- The `(symbol, start, end)` runs, with the
+            positions counted from each symbol's first bar.
+        Returns:
+        ----
+        {np.ndarray} -- The values of the runs, one after the other.
+        """
+
+        dtype = SymbolBuffer.default_dtypes.get(column_name, 'float64')
+
+        if self._backend == 'columnar':
+            views = [self._store.buffer(symbol = symbol).column(column_name)[start:end] for symbol, start, end in spans]
+        else:
+            positions = self.symbol_positions
+            column = self.frame[column_name].to_numpy()
+            views = [column[positions[symbol][0] + start:positions[symbol][0] + end] for symbol, start, end in spans]
+
+        return np.concatenate(views) if views else np.empty(0, dtype = dtype)
+
+    def write_rows(self, outputs: Dict[str, np.ndarray], spans: List[Tuple[str, int, int]]) -> None:
+        """Writes output values into runs of bars, leaving the other rows as they are.
+        Overview:
+        ----
+        With the `pandas` backend the values are set in place, one assignment
+        per column. With the `columnar` backend they go straight into the
+        symbol buffers and the frame is only rebuilt when it is read.
+        Arguments:
+        ----
+        outputs {Dict[str, np.ndarray]} -- The output columns, with the values of the runs
+            one after the other. Missing columns are added with `NaN` elsewhere.
+        spans {List[Tuple[str, int, int]]} -- The `(symbol, start, end)` runs, see `gather_rows`.
+        """
+
+        if self._backend == 'columnar':
+            self._invalidate_frame()
+            position = 0
+            for symbol, start, end in spans:
+                for column_name, values in outputs.items():
+                    self._store.output(symbol = symbol, name = column_name, dtype = values.dtype)[start:end] = values[position:position + end - start]
+                position += end - start
+        elif spans:
+            frame = self.frame
+            positions = self.symbol_positions
+            firsts = np.array([positions[symbol][0] + start for symbol, start, _ in spans], dtype = 'int64')
+            sizes = np.array([end - start for _, start, end in spans], dtype = 'int64')
+            rows = np.repeat(firsts - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())
+
+            for column_name, values in outputs.items():
+                if column_name not in frame.columns:
+                    frame[column_name] = np.nan
+                frame.iloc[rows, frame.columns.get_loc(column_name)] = values
+
+        self.invalidate_latest_rows()
+
+    def column_array(self, column_name: str) -> np.ndarray:
+        """Grabs a read-only array of a whole column, in frame row order.
+        Arguments:
+        ----
+        column_name {str} -- The column to grab.
+        Returns:
+        ----
+        {np.ndarray} -- A read-only NumPy array, sliced by `symbol_positions`.
+        """
+
+        # The columnar backend gathers the buffers, without building the frame.
+        if self._backend == 'columnar' and (column_name in SymbolBuffer.price_columns or self._frame_stale):
+
+            if column_name not in SymbolBuffer.price_columns and column_name not in self._store.output_names:
+                raise KeyError(column_name)
+
+            views = [self.price_view(symbol = symbol, column_name = column_name) for symbol in self.symbol_positions]
+            array = np.concatenate(views) if views else np.empty(0, dtype = SymbolBuffer.default_dtypes.get(column_name, 'float64'))
+        else:
+            array = self.frame[column_name].to_numpy().view()
+
+        array.flags.writeable = False
+
+        return array
+
+    def output_view(self, column_name: str, symbol: str = None, dtype: str = 'float64') -> np.ndarray:
+        """Grabs a writable view into an indicator output column.
+        Overview:
+        ----
+        Output columns are held in NumPy arrays owned by the StockFrame, one
+        value per frame row and preallocated with `NaN`. Indicator code
+        writes into them in place and `commit_outputs` hands them to the
+        frame in one column assignment each. The arrays are reallocated
+        after rows have been added. With the `columnar` backend a symbol's
+        view points straight into its buffer, which keeps it across new
+        rows, and `commit_outputs` only has to mark the frame for a rebuild.
+        Arguments:
+        ----
+        column_name {str} -- The output column name.
+        Keyword Arguments:
+        ----
+        symbol {str} -- Only return the rows of this symbol. (default: {None})
+        dtype {str} -- The dtype of a newly allocated output. (default: {'float64'})
+        Returns:
+        ----
+        {np.ndarray} -- A writable NumPy view.
+        Usage:
+        ----
+            >>> close = stock_frame.price_view(symbol='MSFT')
+            >>> output = stock_frame.output_view(column_name='range', symbol='MSFT')
+            >>> np.subtract(stock_frame.price_view(symbol='MSFT', column_name='high'),
+                    stock_frame.price_view(symbol='MSFT', column_name='low'), out=output)
+            >>> stock_frame.commit_outputs()
+        """
+
+        if self._backend == 'columnar' and symbol is not None:
+            if not self._store.has_symbol(symbol = symbol):
+                return np.empty(0, dtype = dtype)
+            if not self._frame_stale:
+                self._invalidate_frame()
+            return self._store.output(symbol = symbol, name = column_name, dtype = dtype)
+
+        if self._outputs_version != self._version:
+            self._outputs = {}
+            self._outputs_version = self._version
+
+        if column_name not in self._outputs:
+            self._outputs[column_name] = np.full(len(self), np.nan, dtype = dtype)
+
+        array = self._outputs[column_name]
+
+        if symbol is None:
+            return array
+
+        start, end = self.symbol_positions.get(symbol, (0, 0))
+
+        return array[start:end]
+
+    def commit_outputs(self, column_names: List[str] = None) -> pd.DataFrame:
+        """Writes the output arrays into the frame.
+        Keyword Arguments:
+        ----
+        column_names {List[str]} -- The outputs to write, all of them if not set. (default: {None})
+        Returns:
+        ----
+        {pd.DataFrame} -- The frame with the output columns, `None` with the `columnar`
+            backend, whose outputs are kept in the symbol buffers until `frame` is read.
+        """
+
+        if self._backend == 'columnar':
+            outputs = self._outputs if self._outputs_version == self._version else {}
+            self.write_outputs(outputs = {
+                column_name: outputs[column_name]
+                for column_name in (column_names or list(outputs)) if column_name in outputs
+            })
+            return None
+
+        if self._outputs_version != self._version:
+            return self.frame
+
+        frame = self.frame
+
+        for column_name in column_names or list(self._outputs):
+            frame[column_name] = self._outputs[column_name]
+
+        self.invalidate_latest_rows()
+
+        return frame
+
+    def write_outputs(self, outputs: Dict[str, np.ndarray], symbols: List[str] = None) -> None:
+        """Writes whole output columns, in frame row order.
+        Overview:
+        ----
+        With the `pandas` backend each column is assigned to the frame. With
+        the `columnar` backend each symbol's rows are copied into its buffer
+        and the frame is only rebuilt the next time it is read.
+        Arguments:
+        ----
+        outputs {Dict[str, np.ndarray]} -- The output columns, one value per frame row.
+        Keyword Arguments:
+        ----
+        symbols {List[str]} -- Only write the rows of these symbols, in frame order. The
+            columns then hold their rows one after the other, and the other symbols keep
+            the values they have. (default: {None})
+        """
+
+        positions = self.symbol_positions
+
+        if self._backend == 'columnar':
+            self._invalidate_frame()
+            start = 0
+            for symbol in positions if symbols is None else symbols:
+                end = start + positions[symbol][1] - positions[symbol][0]
+                for column_name, values in outputs.items():
+                    self._store.output(symbol = symbol, name = column_name, dtype = values.dtype)[:] = values[start:end]
+                start = end
+        elif symbols is None:
+            frame = self.frame
+            for column_name, values in outputs.items():
+                frame[column_name] = values
+        else:
+            frame = self.frame
+            rows = np.concatenate([np.arange(*positions[symbol]) for symbol in symbols] + [np.empty(0, dtype = 'int64')])
+            for column_name, values in outputs.items():
+                if column_name in frame.columns:
+                    column = frame[column_name].to_numpy(dtype = values.dtype, copy = True)
+                else:
+                    column = np.full(len(frame), np.nan, dtype = values.dtype)
+                column[rows] = values
+                frame[column_name] = column
+
+        self.invalidate_latest_rows()
+
+    def assign_block(self, column_names: List[str], values: np.ndarray) -> pd.DataFrame:
+        """Writes many output columns into the frame as one block.
+        Overview:
+        ----
+        Assigning columns one by one gives the frame one block per column.
+        Here new columns are appended together in a single block, and when
+        all of them are already there they are overwritten in place, so the
+        block stays whole. With the `columnar` backend the columns go to the
+        symbol buffers, see `write_outputs`.
+        Arguments:
+        ----
+        column_names {List[str]} -- The output column names.
+        values {np.ndarray} -- The values, one column per name.
+        Returns:
+        ----
+        {pd.DataFrame} -- The frame with the output columns, `None` with the `columnar` backend.
+        """
+
+        if self._backend == 'columnar':
+            self.write_outputs(outputs = {column_name: values[:, position] for position, column_name in enumerate(column_names)})
+            return None
+
+        frame = self.frame
+
+        if all(column_name in frame.columns for column_name in column_names):
+            frame.iloc[:, [frame.columns.get_loc(column_name) for column_name in column_names]] = values
+        else:
+            block = pd.DataFrame(values, index = frame.index, columns = column_names)
+            frame = pd.concat([frame.drop(columns = frame.columns.intersection(column_names)), block], axis = 1)
+            self._frame = frame
+
+        self.invalidate_latest_rows()
+
+        return frame
 
     def symbol_rolling_groups(self, size: int) -> RollingGroupby:
         """Grabs the windows for each group.
@@ -64,11 +1278,7 @@ class StockFrame():
         {RollingGroupby} -- A `pandas.core.window.RollingGroupby` object.
         """
 
-        # If we don't a symbols group, then create it.
-        if not self._symbol_groups:
-            self.symbol_groups
-
-        self._symbol_rolling_groups: RollingGroupby = self._symbol_groups.rolling(
+        self._symbol_rolling_groups: RollingGroupby = self.symbol_groups.rolling(
             size
         )
 
@@ -82,10 +1292,88 @@ class StockFrame():
         """
 
         # Make a data frame.
-        price_df = pd.DataFrame(data = self._data)
-        price_df = self._parse_datetime_column(price_df = price_df)
+        price_df = pd.DataFrame(
+            data = self._data,
+            columns = ['symbol', 'datetime'] + SymbolBuffer.price_columns
+        )
+
+        if self._compact:
+            price_df = self._compact_columns(price_df = price_df)
+        else:
+            price_df = self._parse_datetime_column(price_df = price_df)
+
         price_df = self._set_multi_index(price_df = price_df)
 
+        # Keep each symbol's bars in one sorted block.
+        price_df.sort_index(inplace = True)
+
+        return price_df
+
+    def _create_frame_from_chunks(self, chunks: Iterable) -> pd.DataFrame:
+        """Creates a new data frame from an iterator of candle chunks.
+        Overview:
+        ----
+        Each chunk is converted to column arrays as soon as it arrives, so
+        only the arrays are held until the frame is built with a single
+        concatenation per column.
+        Arguments:
+        ----
+        chunks {Iterable} -- The candle chunks, each one a list of quotes or a
+            dictionary of column arrays.
+        Returns:
+        ----
+        {pd.DataFrame} -- A pandas dataframe.
+        """
+
+        pieces = {name: [] for name in ['symbol', 'datetime'] + SymbolBuffer.price_columns}
+
+        for chunk in chunks:
+            columns = quote_columns(data = chunk)
+            for name in pieces:
+                pieces[name].append(columns[name])
+
+        if not pieces['symbol']:
+            return self.create_frame()
+
+        columns = {name: np.concatenate(arrays) for name, arrays in pieces.items()}
+        columns['symbol'] = columns['symbol'].astype(object)
+
+        price_df = self._frame_from_columns(columns = columns)
+
+        # Keep each symbol's bars in one sorted block.
+        price_df.sort_index(inplace = True)
+
+        return price_df
+
+    def _frame_from_columns(self, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """Builds a multi-index data frame from column arrays.
+        Arguments:
+        ----
+        columns {Dict[str, np.ndarray]} -- The `symbol`, `datetime` and price columns.
+        Returns:
+        ----
+        {pd.DataFrame} -- A pandas dataframe indexed by `symbol` and `datetime`.
+        """
+
+        # Parse all the Timestamps at once.
+        if self._compact:
+            datetime = np.asarray(columns['datetime'], dtype = 'int64')
+        else:
+            datetime = pd.to_datetime(columns['datetime'], unit = 'ms', origin = 'unix')
+
+        index = pd.MultiIndex.from_arrays(
+            [np.asarray(columns['symbol']).astype(object), datetime],
+            names = ['symbol', 'datetime']
+        )
+
+        price_df = pd.DataFrame(
+            data = {name: columns[name] for name in SymbolBuffer.price_columns},
+            index = index
+        )
+
+        if self._compact:
+            price_df = price_df.astype(SymbolBuffer.compact_dtypes)
+
         return price_df
 
     def _parse_datetime_column(self, price_df: pd.DataFrame) -> pd.DataFrame:
@@ -107,6 +1395,23 @@ class StockFrame():
 
         return price_df
 
+    def _compact_columns(self, price_df: pd.DataFrame) -> pd.DataFrame:
+        """Casts the columns to the compact dtypes.
+        Arguments:
+        ----
+        price_df {pd.DataFrame} -- The price data frame.
+        Returns:
+        ----
+        {pd.DataFrame} -- A pandas dataframe with `float32` prices, `uint64` volume,
+            categorical symbols and int64 epoch millisecond timestamps.
+        """
+
+        dtypes = dict(SymbolBuffer.compact_dtypes)
+        dtypes['symbol'] = 'category'
+        dtypes['datetime'] = 'int64'
+
+        return price_df.astype(dtypes)
+
     def _set_multi_index(self, price_df: pd.DataFrame) -> pd.DataFrame:
         """Converts the dataframe to a multi-index data frame.
         Arguments:
@@ -121,11 +1426,30 @@ class StockFrame():
 
         return price_df
 
-    def add_rows(self, data: Dict) -> None:
-        """Adds a new row to our StockFrame.
+    def add_rows(self, data: Union[List[Dict], Dict], max_late_bars: int = None) -> Dict[str, int]:
+        """Upserts new rows into our StockFrame.
+        Overview:
+        ----
+        The quotes are converted to column arrays and every one of them is
+        matched against the tail of its symbol's block in one vectorized
+        lookup. A quote for the last bar of a symbol (the still forming candle)
+        replaces it, newer quotes are added at the tail of the symbol's block,
+        and only late quotes are found with a binary search and either replace
+        or are inserted next to their bar. The whole batch is then merged into
+        the frame in a single step, so the frame never has to be re-sorted.
         Arguments:
         ----
-        data {Dict} -- A list of quotes.
+        data {Union[List[Dict], Dict]} -- A list of quotes, a single quote, or a
+            dictionary of column arrays keyed by `symbol`, `datetime`, `open`,
+            `close`, `high`, `low` and `volume`.
+        Keyword Arguments:
+        ----
+        max_late_bars {int} -- Only merge late quotes this many bars back from the
+            tail of their symbol, older quotes are dropped. No limit if not set.
+            (default: {None})
+        Returns:
+        ----
+        {Dict[str, int]} -- The number of bars `inserted`, `updated` and `dropped`.
         Usage:
         ----
             >>> # Create a StockFrame object.
@@ -143,38 +1467,293 @@ class StockFrame():
             }
             >>> # Add to the Stock Frame.
             >>> stock_frame.add_rows(data=fake_data)
+            >>> # Add the latest bar of every symbol at once.
+            >>> stock_frame.add_rows(data=trading_robot.get_latest_bar())
         """
 
-        column_names = ['open', 'close', 'high', 'low', 'volume']
+        columns = quote_columns(data = data)
+
+        if self._bar_store is not None:
+            symbols, inverse = np.unique(np.asarray(columns['symbol']).astype(str), return_inverse = True)
+            tails = self._symbol_tails(symbols = symbols)[inverse]
+
+        report = self._upsert_rows(columns = columns, max_late_bars = max_late_bars)
+
+        # Persist the bars that went in at the tail of their symbol, the store is append only.
+        if self._bar_store is not None:
+            persisted = np.asarray(columns['datetime'], dtype = 'int64') >= tails
+            self._bar_store.append(data = {name: np.asarray(values)[persisted] for name, values in columns.items()})
+
+        # Fold the bars that made it in into the higher timeframes.
+        for resampler, stock_frame in self._timeframes.values():
+            bars = resampler.update(columns = columns, history = self._bars_between)
+
+            if bars:
+                stock_frame.add_rows(data = bars)
+
+        return report
+
+    def _upsert_rows(self, columns: Dict[str, np.ndarray], max_late_bars: int = None) -> Dict[str, int]:
+        """Upserts the column arrays of a batch of quotes, see `add_rows`."""
 
-        for quote in data:
+        # The columnar backend appends to its buffers and rebuilds the frame lazily.
+        if self._backend == 'columnar':
+            self._invalidate_frame()
+            edits = self._columnar_edits(columns = columns)
+            report = self._store.add_columns(columns = columns, max_late_bars = max_late_bars)
+            self._version += 1
+            self._touch_symbols(symbols = columns['symbol'])
+            self._log_edits(edits = edits)
+            self._evict()
+            return report
 
-            # Parse the Timestamp.
-            time_stamp = pd.to_datetime(
-                quote['datetime'],
-                unit = 'ms',
-                origin = 'unix'
+        report = {'inserted': 0, 'updated': 0, 'dropped': 0}
+
+        if not len(self._frame):
+            return self._add_first_rows(columns = columns, report = report)
+
+        index = self._frame.index
+        new_symbols = np.asarray(columns['symbol'], dtype = object)
+        new_datetime = np.asarray(columns['datetime'], dtype = 'int64')
+
+        # If a bar shows up twice in the batch, the last one wins.
+        batch_codes = np.unique(new_symbols.astype(str), return_inverse = True)[1]
+        order = np.lexsort((new_datetime, batch_codes))
+        last = np.ones(len(order), dtype = bool)
+        last[:-1] = (batch_codes[order][1:] != batch_codes[order][:-1]) | (new_datetime[order][1:] != new_datetime[order][:-1])
+        unique = np.sort(order[last])
+        report['updated'] += len(order) - len(unique)
+
+        new_symbols = new_symbols[unique]
+        new_datetime = new_datetime[unique]
+
+        # Look up each bar's symbol block, the blocks are in symbol order.
+        positions = self.symbol_positions
+        block_symbols = np.array(list(positions), dtype = object)
+        block_starts = np.array([start for start, _ in positions.values()] + [len(self._frame)])
+        block_ends = block_starts[1:]
+
+        block = np.searchsorted(block_symbols, new_symbols)
+        known = block < len(block_symbols)
+        known[known] = block_symbols[block[known]] == new_symbols[known]
+
+        level_ms = self._level_ms(level = index.levels[1])
+        datetime_codes = np.asarray(index.codes[1])
+        tails = np.full(len(new_symbols), np.iinfo('int64').min)
+        tails[known] = level_ms[datetime_codes[block_ends[block[known]] - 1]]
+
+        # Find where each bar goes, `-1` means it doesn't.
+        insert_at = np.full(len(new_symbols), -1)
+        update_at = np.full(len(new_symbols), -1)
+
+        # A new symbol gets its own block, in sorted order, newer bars go at the tail.
+        insert_at[~known] = block_starts[block[~known]]
+        appended = known & (new_datetime > tails)
+        insert_at[appended] = block_ends[block[appended]]
+
+        # The still forming last bar is replaced.
+        replaced = known & (new_datetime == tails)
+        update_at[replaced] = block_ends[block[replaced]] - 1
+
+        edits = [(symbol, int(time_stamp)) for symbol, time_stamp in zip(new_symbols[replaced], new_datetime[replaced])]
+
+        # Only the late bars need a binary search of their block.
+        for row in np.flatnonzero(known & (new_datetime < tails)):
+
+            symbol, time_stamp = new_symbols[row], new_datetime[row]
+            start, end = positions[symbol]
+
+            low = start if max_late_bars is None else max(start, end - max_late_bars)
+            datetime = level_ms[datetime_codes[low:end]]
+
+            if time_stamp < datetime[0] and low > start:
+                report['dropped'] += 1
+                continue
+
+            edits.append((symbol, int(time_stamp)))
+            position = int(np.searchsorted(datetime, time_stamp))
+
+            if datetime[position] == time_stamp:
+                update_at[row] = low + position
+            else:
+                insert_at[row] = low + position
+
+        # Overwrite the bars we already have.
+        updates = np.flatnonzero(update_at >= 0)
+
+        if len(updates):
+            for column_name in SymbolBuffer.price_columns:
+                self._frame.iloc[update_at[updates], self._frame.columns.get_loc(column_name)] = (
+                    np.asarray(columns[column_name])[unique][updates].astype(self._frame[column_name].dtype)
+                )
+            report['updated'] += len(updates)
+
+        # Merge the new bars in with a single insert per column.
+        inserts = np.flatnonzero(insert_at >= 0)
+
+        if len(inserts):
+            inserts = inserts[np.lexsort((new_datetime[inserts], batch_codes[unique][inserts], insert_at[inserts]))]
+            self._frame = self._merge_rows(
+                insert_at = insert_at[inserts],
+                symbols = new_symbols[inserts],
+                datetime = new_datetime[inserts],
+                columns = {name: np.asarray(columns[name])[unique][inserts] for name in SymbolBuffer.price_columns}
             )
+            report['inserted'] += len(inserts)
+
+        self._version += 1
+        self._touch_symbols(symbols = new_symbols)
+        self._log_edits(edits = edits)
+        self._evict()
+
+        return report
+
+    def _bars_between(self, symbol: str, start: int, end: int) -> Dict[str, np.ndarray]:
+        """Grabs the `datetime` and price columns of a symbol's bars from `start` up to `end`."""
+
+        first = self.search_bars(symbol = symbol, time_stamp = start)
+        last = self.search_bars(symbol = symbol, time_stamp = end)
+        spans = [(symbol, first, last)] if last > first else []
+
+        bars = {name: self.gather_rows(column_name = name, spans = spans) for name in SymbolBuffer.price_columns}
+        bars['datetime'] = self.bar_datetime(symbol = symbol, start = first, end = last)
+
+        return bars
+
+    def _symbol_tails(self, symbols: np.ndarray) -> np.ndarray:
+        """Grabs the timestamp of each symbol's last bar, the smallest `int64` for a symbol without bars."""
+
+        tails = np.full(len(symbols), np.iinfo('int64').min)
+
+        for code, symbol in enumerate(symbols):
+            last = self.bar_datetime(symbol = symbol, start = -1)
+            if len(last):
+                tails[code] = last[0]
+
+        return tails
+
+    def _columnar_edits(self, columns: Dict[str, np.ndarray]) -> List[Tuple[str, int]]:
+        """Finds the oldest bar of each symbol that replaces or lands before its buffer's last bar."""
+
+        symbols, inverse = np.unique(np.asarray(columns['symbol']).astype(str), return_inverse = True)
+        datetime = np.asarray(columns['datetime'], dtype = 'int64')
+        tails = self._symbol_tails(symbols = symbols)
+
+        edited = datetime <= tails[inverse]
+        oldest = np.full(len(symbols), np.iinfo('int64').max)
+        np.minimum.at(oldest, inverse[edited], datetime[edited])
 
-            # Define the Index Tuple.
-            row_id = (quote['symbol'], time_stamp)
+        return [(str(symbol), int(oldest[code])) for code, symbol in enumerate(symbols) if oldest[code] != np.iinfo('int64').max]
 
-            # Define the values.
-            row_values = [
-                quote['open'],
-                quote['close'],
-                quote['high'],
-                quote['low'],
-                quote['volume']
-            ]
+    def _add_first_rows(self, columns: Dict[str, np.ndarray], report: Dict[str, int]) -> Dict[str, int]:
+        """Builds the frame from the first batch of rows added to an empty StockFrame."""
 
-            # Create a new row.
-            new_row = pd.Series(data = row_values)
+        new_rows = self._frame_from_columns(columns = columns)
 
-            # Add the row.
-            self.frame.loc[row_id, column_names] = new_row.values
+        # If a bar shows up twice in the batch, the last one wins.
+        unique = ~new_rows.index.duplicated(keep = 'last')
+        report['updated'] += int((~unique).sum())
+        report['inserted'] += int(unique.sum())
 
-            self.frame.sort_index(inplace = True)
+        self._frame = new_rows[unique].sort_index()
+
+        self._version += 1
+        self._touch_symbols(symbols = np.asarray(columns['symbol'], dtype = object)[unique])
+        self._evict()
+
+        return report
+
+    def _merge_rows(self, insert_at: np.ndarray, symbols: np.ndarray, datetime: np.ndarray, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """Inserts new bars into the frame at their row positions.
+        Overview:
+        ----
+        Every column and both code arrays of the index get one `np.insert`,
+        and the index is put back together from its levels and codes, so the
+        frame is copied once and never re-sorted. Only the values a level is
+        missing are added to it.
+        Arguments:
+        ----
+        insert_at {np.ndarray} -- The row each bar is inserted before, sorted.
+        symbols {np.ndarray} -- The symbol of each bar.
+        datetime {np.ndarray} -- The epoch millisecond timestamp of each bar.
+        columns {Dict[str, np.ndarray]} -- The price columns of the bars.
+        Returns:
+        ----
+        {pd.DataFrame} -- The merged frame.
+        """
+
+        frame = self._frame
+        index = frame.index
+
+        symbol_level, symbol_codes = self._merge_level(
+            level = index.levels[0],
+            level_values = np.asarray(index.levels[0], dtype = object),
+            codes = np.asarray(index.codes[0]),
+            values = symbols
+        )
+        datetime_level, datetime_codes = self._merge_level(
+            level = index.levels[1],
+            level_values = self._level_ms(level = index.levels[1]),
+            codes = np.asarray(index.codes[1]),
+            values = datetime
+        )
+
+        merged_index = pd.MultiIndex(
+            levels = [symbol_level, datetime_level],
+            codes = [
+                np.insert(symbol_codes, insert_at, np.searchsorted(np.asarray(symbol_level, dtype = object), symbols)),
+                np.insert(datetime_codes, insert_at, np.searchsorted(self._level_ms(level = datetime_level), datetime))
+            ],
+            names = index.names,
+            verify_integrity = False
+        )
+
+        merged = {}
+
+        for column_name in frame.columns:
+
+            values = frame[column_name].to_numpy()
+
+            # Indicator columns get a missing value on the new bars.
+            if column_name in columns:
+                new_values = columns[column_name]
+            elif values.dtype.kind in 'fc':
+                new_values = np.nan
+            elif values.dtype.kind in 'iu':
+                values, new_values = values.astype('float64'), np.nan
+            else:
+                values, new_values = values.astype(object), np.nan
+
+            merged[column_name] = np.insert(values, insert_at, new_values)
+
+        return pd.DataFrame(merged, index = merged_index, columns = frame.columns, copy = False)
+
+    def _merge_level(self, level: pd.Index, level_values: np.ndarray, codes: np.ndarray, values: np.ndarray) -> Tuple[pd.Index, np.ndarray]:
+        """Adds the values a sorted index level is missing, remapping its codes only if they moved."""
+
+        values = np.unique(values)
+        found = np.searchsorted(level_values, values)
+        known = found < len(level_values)
+        known[known] = level_values[found[known]] == values[known]
+        missing = values[~known]
+
+        if not len(missing):
+            return level, codes
+
+        merged_values = np.concatenate((level_values, missing))
+
+        if len(level_values) and missing[0] < level_values[-1]:
+            merged_values = np.sort(merged_values)
+            codes = np.searchsorted(merged_values, level_values)[codes]
+
+        if level.dtype.kind == 'M':
+            merged_level = pd.DatetimeIndex(merged_values.astype('datetime64[ms]')).as_unit(level.unit)
+        elif isinstance(level, pd.CategoricalIndex):
+            merged_level = pd.CategoricalIndex(merged_values, ordered = level.ordered)
+        else:
+            merged_level = pd.Index(merged_values, dtype = level.dtype)
+
+        return merged_level.rename(level.name), codes
 
     def do_indicator_exist(self, column_names: List[str]) -> bool:
         """Checks to see if the indicator columns specified exist.
@@ -195,12 +1774,12 @@ class StockFrame():
         bool -- `True` if all the columns exist.
         """
 
-        if set(column_names).issubset(self._frame.columns):
+        if set(column_names).issubset(self.columns):
             return True
         else:
             raise KeyError("The following indicator columns are missing from the StockFrame: {missing_columns}".format(
                 missing_columns = set(column_names).difference(
-                    self._frame.columns)
+                    self.columns)
             ))
 
     def _check_signals(self, indicators: dict, indciators_comp_key: List[str], indicators_key: List[str]) -> Union[pd.DataFrame, None]:
@@ -228,7 +1807,7 @@ class StockFrame():
         """
 
         # Grab the last rows.
-        last_rows = self._symbol_groups.tail(1)
+        last_rows = self.latest_rows
 
         # Define a list of conditions.
         conditions = {}
@@ -329,9 +1908,9 @@ class StockFrame():
             pandas series object.
         """        
 
-        # Filter the Stock Frame.
-        bars_filtered = self._frame.filter(like = symbol, axis = 0)
-        bars = bars_filtered.tail(1)
+        # Grab the symbol's block, an unknown symbol has no bars.
+        start, end = self.symbol_positions.get(symbol, (0, 0))
+        bars = self.frame.iloc[max(end - 1, start):end]
 
         return bars
 
@@ -351,8 +1930,12 @@ class StockFrame():
             pandas series object.
         """        
 
-        # Filter the Stock Frame.
-        bars_filtered = self._frame.filter(like=symbol, axis = 0)
-        bars = bars_filtered.iloc[-n]
+        # Grab the symbol's block.
+        start, end = self.symbol_positions.get(symbol, (0, 0))
+
+        if n < 1 or n > end - start:
+            raise IndexError("{symbol} does not have {n} bars.".format(symbol = symbol, n = n))
+
+        bars = self.frame.iloc[end - n]
 
         return bars
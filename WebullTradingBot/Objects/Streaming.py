@@ -0,0 +1,1067 @@
+import numpy as np
+
+from typing import List
+from typing import Dict
+
+from Objects import Kernels
+from Objects.Expression import compile_expression
+
+_NO_BAR = np.iinfo('int64').min
+
+
+def _replay_tail(part, values: np.ndarray, seeding: tuple) -> None:
+    """Pushes the last values of every seeded slot, which is all a window keeps of its history.
+    One more value than the window is pushed, so the last push can still be taken back."""
+
+    slots, offsets, ends = seeding
+    counts = np.minimum(offsets[ends - 1] + 1, part.window + 1)
+
+    part.reset(slots = slots)
+    part.seeding = None
+
+    try:
+        for step in range(int(counts.max()) if len(counts) else 0):
+            active = counts > step
+            part.push(slots = slots[active], values = values[ends[active] - counts[active] + step])
+    finally:
+        part.seeding = seeding
+
+
+class RunningWindow():
+
+    """
+    Represents the last `window` values of every symbol slot, kept in
+    a ring buffer together with their running mean and sum of squared
+    deviations, updated with Welford's method as values enter and leave.
+    The moments are kept relative to a shift close to the values, and
+    each time a buffer wraps around they are taken again from the values
+    themselves, so rounding cannot build up and the cost stays constant
+    per push on average. A `NaN` is kept as a stand-in value and makes the
+    statistics `NaN` until it leaves the window, like the batch kernels.
+    """
+
+    def __init__(self, window: int, size: int) -> None:
+        """Initalizes the Running Window.
+        Arguments:
+        ----
+        window {int} -- The number of values to keep per slot.
+        size {int} -- The number of symbol slots.
+        """
+
+        self.window = window
+        self._values = np.zeros((size, window))
+        self._position = np.zeros(size, dtype = 'int64')
+        self._missing = np.zeros((size, window), dtype = 'bool')
+        self._count = np.zeros(size, dtype = 'int64')
+        self._nans = np.zeros(size, dtype = 'int64')
+        self._shift = np.zeros(size)
+        self._mean = np.zeros(size)
+        self._squares = np.zeros(size)
+        self._saved = self._empty_saved(size = size)
+        self.seeding = None
+        self._seeded = None
+
+    def _empty_saved(self, size: int) -> Dict[str, np.ndarray]:
+        """Returns empty arrays for what a push needs to be taken back."""
+
+        return {
+            'position': np.zeros(size, dtype = 'int64'),
+            'count': np.zeros(size, dtype = 'int64'),
+            'nans': np.zeros(size, dtype = 'int64'),
+            'shift': np.zeros(size),
+            'mean': np.zeros(size),
+            'squares': np.zeros(size),
+            'value': np.zeros(size),
+            'missing': np.zeros(size, dtype = 'bool')
+        }
+
+    def grow(self, size: int) -> None:
+        """Adds empty slots up to `size`."""
+
+        extra = size - len(self._count)
+
+        if extra > 0:
+            self._values = np.vstack([self._values, np.zeros((extra, self.window))])
+            self._missing = np.vstack([self._missing, np.zeros((extra, self.window), dtype = 'bool')])
+            self._position = np.concatenate([self._position, np.zeros(extra, dtype = 'int64')])
+            self._count = np.concatenate([self._count, np.zeros(extra, dtype = 'int64')])
+            self._nans = np.concatenate([self._nans, np.zeros(extra, dtype = 'int64')])
+            self._shift = np.concatenate([self._shift, np.zeros(extra)])
+            self._mean = np.concatenate([self._mean, np.zeros(extra)])
+            self._squares = np.concatenate([self._squares, np.zeros(extra)])
+
+            for name, saved in self._empty_saved(size = extra).items():
+                self._saved[name] = np.concatenate([self._saved[name], saved])
+
+    def reset(self, slots: np.ndarray) -> None:
+        """Empties the given slots."""
+
+        self._position[slots] = 0
+        self._count[slots] = 0
+        self._nans[slots] = 0
+        self._missing[slots] = False
+        self._mean[slots] = 0.0
+        self._squares[slots] = 0.0
+
+    def push(self, slots: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Pushes one value into each slot.
+        Arguments:
+        ----
+        slots {np.ndarray} -- The slots to push into, each at most once.
+        values {np.ndarray} -- The value pushed into each slot.
+        Returns:
+        ----
+        {np.ndarray} -- The value that fell out of each window, `NaN` while
+            the window was not full yet.
+        """
+
+        if self.seeding is not None:
+            return self._seed(values = values)
+
+        position = self._position[slots]
+        count = self._count[slots]
+        nans = self._nans[slots]
+        old = self._values[slots, position]
+        old_missing = self._missing[slots, position]
+
+        # Keep what is needed to take this push back.
+        self._saved['position'][slots] = position
+        self._saved['count'][slots] = count
+        self._saved['nans'][slots] = nans
+        self._saved['shift'][slots] = shift = self._shift[slots]
+        self._saved['mean'][slots] = mean = self._mean[slots]
+        self._saved['squares'][slots] = self._squares[slots]
+        self._saved['value'][slots] = old
+        self._saved['missing'][slots] = old_missing
+
+        full = count >= self.window
+
+        # A missing value stands in as the shift, so the moments stay finite.
+        missing = np.isnan(values)
+        values = np.where(missing, shift, values)
+
+        # An empty window is shifted by its first value.
+        shift = np.where(count == 0, values, shift)
+        shifted = values - shift
+        dropped = old - shift
+
+        # Welford's update, with the dropped value swapped out once the window is full.
+        delta = np.where(full, shifted - dropped, shifted - mean)
+        updated = mean + delta / np.where(full, self.window, count + 1)
+
+        self._shift[slots] = shift
+        self._mean[slots] = updated
+        self._squares[slots] += delta * np.where(full, shifted - updated + dropped - mean, shifted - updated)
+        self._values[slots, position] = values
+        self._missing[slots, position] = missing
+        self._nans[slots] = nans + missing - (full & old_missing)
+        self._position[slots] = (position + 1) % self.window
+        self._count[slots] = np.minimum(count + 1, self.window)
+
+        wrapped = slots[position == self.window - 1]
+
+        if len(wrapped):
+            window = self._values[wrapped]
+            self._shift[wrapped] = mean = window.mean(axis = 1)
+            self._mean[wrapped] = 0.0
+            self._squares[wrapped] = np.square(window - mean[:, None]).sum(axis = 1)
+
+        return np.where(full & ~old_missing, old, np.nan)
+
+    def _seed(self, values: np.ndarray) -> np.ndarray:
+        """Takes the state of the seeded slots from their whole history, see `IndicatorStream.seed`."""
+
+        self._seeded = values
+        _replay_tail(part = self, values = values, seeding = self.seeding)
+
+        return Kernels.shift(values = values, offsets = self.seeding[1], periods = self.window)
+
+    def undo(self, slots: np.ndarray) -> None:
+        """Takes back the last push of the given slots."""
+
+        position = self._saved['position'][slots]
+
+        self._values[slots, position] = self._saved['value'][slots]
+        self._missing[slots, position] = self._saved['missing'][slots]
+        self._position[slots] = position
+        self._count[slots] = self._saved['count'][slots]
+        self._nans[slots] = self._saved['nans'][slots]
+        self._shift[slots] = self._saved['shift'][slots]
+        self._mean[slots] = self._saved['mean'][slots]
+        self._squares[slots] = self._saved['squares'][slots]
+
+    def count(self, slots: np.ndarray) -> np.ndarray:
+        return self._count[slots]
+
+    def _complete(self, slots: np.ndarray) -> np.ndarray:
+        """Specifies whether each window is full and holds no `NaN`."""
+
+        return (self._count[slots] >= self.window) & (self._nans[slots] == 0)
+
+    def sum(self, slots: np.ndarray) -> np.ndarray:
+        """The sum of the values in each window, `NaN` until it is full."""
+
+        return self.mean(slots = slots) * self.window
+
+    def mean(self, slots: np.ndarray) -> np.ndarray:
+        """The mean of the values in each window, `NaN` until it is full."""
+
+        if self.seeding is not None:
+            return Kernels.rolling_mean(values = self._seeded, offsets = self.seeding[1], window = self.window)
+
+        return np.where(self._complete(slots = slots), self._shift[slots] + self._mean[slots], np.nan)
+
+    def std(self, slots: np.ndarray) -> np.ndarray:
+        """The sample standard deviation of the values in each window, `NaN` until it is full."""
+
+        if self.seeding is not None:
+            return Kernels.rolling_std(values = self._seeded, offsets = self.seeding[1], window = self.window)
+
+        if self.window < 2:
+            return np.full(len(slots), np.nan)
+
+        variance = np.maximum(self._squares[slots], 0.0) / (self.window - 1)
+
+        return np.where(self._complete(slots = slots), np.sqrt(variance), np.nan)
+
+
+class RunningExtreme():
+
+    """
+    Represents the running maximum, or minimum, of the last `window`
+    values of every symbol slot, kept as a monotonic deque per slot.
+    Overview:
+    ----
+    The deque holds the values that can still become the extreme, in
+    order, each with the bar it came from: a new value first drops the
+    values behind it it dominates, then joins at the back, and the front
+    leaves once its bar falls out of the window. Every value joins and
+    leaves at most once, so a push costs constant time on average. The
+    deques live in one ring buffer per slot, and every round pushes all
+    the slots at once, popping as many rounds as the longest run of
+    dominated values.
+    """
+
+    def __init__(self, window: int, size: int, maximum: bool = True) -> None:
+        """Initalizes the Running Extreme.
+        Arguments:
+        ----
+        window {int} -- The number of values to keep per slot.
+        size {int} -- The number of symbol slots.
+        Keyword Arguments:
+        ----
+        maximum {bool} -- Keep the maximum, otherwise the minimum. (default: {True})
+        """
+
+        self.window = window
+        self.seeding = None
+        self._maximum = maximum
+        self._dominates = np.greater_equal if maximum else np.less_equal
+        self._values = np.zeros((size, window))
+        self._bars = np.zeros((size, window), dtype = 'int64')
+        self._head = np.zeros(size, dtype = 'int64')
+        self._length = np.zeros(size, dtype = 'int64')
+        self._bar = np.zeros(size, dtype = 'int64')
+        self._last_missing = np.full(size, _NO_BAR, dtype = 'int64')
+        self._saved = self._empty_saved(size = size)
+
+    def _empty_saved(self, size: int) -> Dict[str, np.ndarray]:
+        """Returns empty arrays for what a push needs to be taken back."""
+
+        saved = {
+            name: np.zeros(size, dtype = 'int64')
+            for name in ['head', 'length', 'bar', 'last_missing', 'position', 'old_bar']
+        }
+        saved['value'] = np.zeros(size)
+
+        return saved
+
+    def grow(self, size: int) -> None:
+        """Adds empty slots up to `size`."""
+
+        extra = size - len(self._head)
+
+        if extra > 0:
+            self._values = np.vstack([self._values, np.zeros((extra, self.window))])
+            self._bars = np.vstack([self._bars, np.zeros((extra, self.window), dtype = 'int64')])
+            self._head = np.concatenate([self._head, np.zeros(extra, dtype = 'int64')])
+            self._length = np.concatenate([self._length, np.zeros(extra, dtype = 'int64')])
+            self._bar = np.concatenate([self._bar, np.zeros(extra, dtype = 'int64')])
+            self._last_missing = np.concatenate([self._last_missing, np.full(extra, _NO_BAR, dtype = 'int64')])
+
+            for name, saved in self._empty_saved(size = extra).items():
+                self._saved[name] = np.concatenate([self._saved[name], saved])
+
+    def reset(self, slots: np.ndarray) -> None:
+        """Empties the given slots."""
+
+        self._head[slots] = 0
+        self._length[slots] = 0
+        self._bar[slots] = 0
+        self._last_missing[slots] = _NO_BAR
+
+    def push(self, slots: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Pushes one value into each slot.
+        Arguments:
+        ----
+        slots {np.ndarray} -- The slots to push into, each at most once.
+        values {np.ndarray} -- The value pushed into each slot.
+        Returns:
+        ----
+        {np.ndarray} -- The extreme of each window, `NaN` until the window is
+            full or while it holds a `NaN`.
+        """
+
+        if self.seeding is not None:
+            return self._seed(values = values)
+
+        window = self.window
+        head = self._head[slots]
+        length = self._length[slots]
+        bar = self._bar[slots]
+
+        self._saved['head'][slots] = head
+        self._saved['length'][slots] = length
+        self._saved['bar'][slots] = bar
+        self._saved['last_missing'][slots] = self._last_missing[slots]
+
+        # The front leaves once its bar is out of the window.
+        expired = (length > 0) & (self._bars[slots, head] <= bar - window)
+        head = np.where(expired, (head + 1) % window, head)
+        length = length - expired
+
+        # Drop the values at the back the new value dominates.
+        missing = np.isnan(values)
+        popping = ~missing & (length > 0)
+
+        while popping.any():
+            tail = (head + length - 1) % window
+            popping &= self._dominates(values, self._values[slots, tail])
+            length = length - popping
+            popping &= length > 0
+
+        # Join at the back, `NaN` only marks its bar.
+        position = (head + length) % window
+
+        self._saved['position'][slots] = position
+        self._saved['value'][slots] = self._values[slots, position]
+        self._saved['old_bar'][slots] = self._bars[slots, position]
+
+        joining = slots[~missing]
+        self._values[joining, position[~missing]] = values[~missing]
+        self._bars[joining, position[~missing]] = bar[~missing]
+        self._last_missing[slots[missing]] = bar[missing]
+
+        self._head[slots] = head
+        self._length[slots] = length + ~missing
+        self._bar[slots] = bar + 1
+
+        complete = (bar + 1 >= window) & (self._last_missing[slots] <= bar - window) & (self._length[slots] > 0)
+
+        return np.where(complete, self._values[slots, self._head[slots]], np.nan)
+
+    def _seed(self, values: np.ndarray) -> np.ndarray:
+        """Takes the state of the seeded slots from their whole history, see `IndicatorStream.seed`."""
+
+        _replay_tail(part = self, values = values, seeding = self.seeding)
+
+        if self._maximum:
+            return Kernels.rolling_max(values = values, offsets = self.seeding[1], window = self.window)
+
+        return Kernels.rolling_min(values = values, offsets = self.seeding[1], window = self.window)
+
+    def undo(self, slots: np.ndarray) -> None:
+        """Takes back the last push of the given slots."""
+
+        position = self._saved['position'][slots]
+
+        self._values[slots, position] = self._saved['value'][slots]
+        self._bars[slots, position] = self._saved['old_bar'][slots]
+        self._head[slots] = self._saved['head'][slots]
+        self._length[slots] = self._saved['length'][slots]
+        self._bar[slots] = self._saved['bar'][slots]
+        self._last_missing[slots] = self._saved['last_missing'][slots]
+
+
+class RunningEwm():
+
+    """
+    Represents the running exponentially weighted mean of every symbol
+    slot, matching `Series.ewm(span = span).mean()`. A `NaN` only decays
+    the weights, and the mean is `NaN` until a value was pushed.
+    """
+
+    def __init__(self, span: float, size: int) -> None:
+        """Initalizes the Running EWM.
+        Arguments:
+        ----
+        span {float} -- The span of the weights.
+        size {int} -- The number of symbol slots.
+        """
+
+        self._span = span
+        self._decay = 1.0 - 2.0 / (span + 1.0)
+        self._state = np.zeros((2, size))
+        self._saved = np.zeros((2, size))
+        self.seeding = None
+
+    def grow(self, size: int) -> None:
+        """Adds empty slots up to `size`."""
+
+        extra = size - self._state.shape[1]
+
+        if extra > 0:
+            self._state = np.hstack([self._state, np.zeros((2, extra))])
+            self._saved = np.hstack([self._saved, np.zeros((2, extra))])
+
+    def reset(self, slots: np.ndarray) -> None:
+        """Empties the given slots."""
+
+        self._state[:, slots] = 0.0
+
+    def push(self, slots: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Pushes one value into each slot and returns the new means."""
+
+        if self.seeding is not None:
+            return self._seed(values = values)
+
+        self._saved[:, slots] = self._state[:, slots]
+
+        present = ~np.isnan(values)
+
+        numerator = np.where(present, values, 0.0) + self._decay * self._state[0, slots]
+        denominator = present + self._decay * self._state[1, slots]
+
+        self._state[0, slots] = numerator
+        self._state[1, slots] = denominator
+
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            return numerator / denominator
+
+    def _seed(self, values: np.ndarray) -> np.ndarray:
+        """Takes the state of the seeded slots from the decayed sums of their whole history."""
+
+        slots, offsets, ends = self.seeding
+        numerator, denominator = Kernels.ewm_sums(values = values, offsets = offsets, span = self._span)
+
+        last = ends - 1
+        previous = np.maximum(last - 1, 0)
+        first = offsets[last] == 0
+
+        # What the last push saved, so a re-sent last bar can be taken back.
+        self._state[0, slots] = numerator[last]
+        self._state[1, slots] = denominator[last]
+        self._saved[0, slots] = np.where(first, 0.0, numerator[previous])
+        self._saved[1, slots] = np.where(first, 0.0, denominator[previous])
+
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            return numerator / denominator
+
+    def undo(self, slots: np.ndarray) -> None:
+        """Takes back the last push of the given slots."""
+
+        self._state[:, slots] = self._saved[:, slots]
+
+
+class RunningCount():
+
+    """
+    Represents the number of bars of every symbol slot a condition held
+    for, like the `min_periods` counts of the batch kernels.
+    """
+
+    def __init__(self, size: int) -> None:
+        """Initalizes the Running Count.
+        Arguments:
+        ----
+        size {int} -- The number of symbol slots.
+        """
+
+        self._count = np.zeros(size, dtype = 'int64')
+        self._saved = np.zeros(size, dtype = 'int64')
+        self.seeding = None
+
+    def grow(self, size: int) -> None:
+        """Adds empty slots up to `size`."""
+
+        extra = size - len(self._count)
+
+        if extra > 0:
+            self._count = np.concatenate([self._count, np.zeros(extra, dtype = 'int64')])
+            self._saved = np.concatenate([self._saved, np.zeros(extra, dtype = 'int64')])
+
+    def reset(self, slots: np.ndarray) -> None:
+        """Empties the given slots."""
+
+        self._count[slots] = 0
+
+    def push(self, slots: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Counts the slots whose condition holds and returns the new counts."""
+
+        if self.seeding is not None:
+            slots, offsets, ends = self.seeding
+            counts = Kernels.segment_counts(present = values, offsets = offsets)
+            self._count[slots] = counts[ends - 1]
+            self._saved[slots] = counts[ends - 1] - values[ends - 1]
+            return counts
+
+        self._saved[slots] = self._count[slots]
+        self._count[slots] += values
+
+        return self._count[slots]
+
+    def undo(self, slots: np.ndarray) -> None:
+        """Takes back the last push of the given slots."""
+
+        self._count[slots] = self._saved[slots]
+
+
+class IndicatorStream():
+
+    """
+    Represents the running state of one registered indicator, with one
+    slot per symbol, updated in constant time per new bar.
+    """
+
+    # The price columns passed to `push`.
+    inputs = ('close',)
+
+    def __init__(self, size: int, column_name: str) -> None:
+        """Initalizes the Indicator Stream.
+        Arguments:
+        ----
+        size {int} -- The number of symbol slots.
+        column_name {str} -- The column the indicator writes to.
+        """
+
+        self.outputs: List[str] = [column_name]
+        self._parts = []
+
+    def grow(self, size: int) -> None:
+        """Adds empty slots up to `size`."""
+
+        for part in self._parts:
+            part.grow(size = size)
+
+    def reset(self, slots: np.ndarray) -> None:
+        """Empties the given slots."""
+
+        for part in self._parts:
+            part.reset(slots = slots)
+
+    def undo(self, slots: np.ndarray) -> None:
+        """Takes back the last bar of the given slots."""
+
+        for part in self._parts:
+            part.undo(slots = slots)
+
+    def seed(self, slots: np.ndarray, offsets: np.ndarray, ends: np.ndarray, **prices: np.ndarray) -> Dict[str, np.ndarray]:
+        """Takes the running state of the given slots from their whole history in one pass.
+        Overview:
+        ----
+        While seeding, `push` runs once over the bars of all the slots laid
+        end to end. Every running part answers with its batch result from
+        the segmented kernels and keeps the state at the end of each slot,
+        an exponential mean from its decayed sums and a window by pushing
+        its last values, so nothing is replayed bar by bar.
+        Arguments:
+        ----
+        slots {np.ndarray} -- The slots to seed.
+        offsets {np.ndarray} -- The position of every bar inside the history of its slot.
+        ends {np.ndarray} -- The end of the bars of each slot.
+        Returns:
+        ----
+        {Dict[str, np.ndarray]} -- The indicator values of every bar, keyed by column.
+        """
+
+        for part in self._parts:
+            part.seeding = (slots, offsets, ends)
+
+        try:
+            return self.push(slots = slots, **prices)
+        finally:
+            for part in self._parts:
+                part.seeding = None
+
+    def push(self, slots: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+        """Pushes one bar into each slot.
+        Arguments:
+        ----
+        slots {np.ndarray} -- The slots to push into, each at most once.
+        close {np.ndarray} -- The close of the bar of each slot, and likewise
+            every other column named in `inputs`.
+        Returns:
+        ----
+        {Dict[str, np.ndarray]} -- The indicator values of the bars, keyed by column.
+        """
+
+        raise NotImplementedError
+
+
+class ChangeInPriceStream(IndicatorStream):
+
+    def __init__(self, size: int, column_name: str = 'change_in_price') -> None:
+        super().__init__(size = size, column_name = column_name)
+        self._previous = RunningWindow(window = 1, size = size)
+        self._parts = [self._previous]
+
+    def push(self, slots: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+        return {self.outputs[0]: close - self._previous.push(slots = slots, values = close)}
+
+
+class SmaStream(IndicatorStream):
+
+    def __init__(self, size: int, period: int, column_name: str = 'sma') -> None:
+        super().__init__(size = size, column_name = column_name)
+        self._window = RunningWindow(window = period, size = size)
+        self._parts = [self._window]
+
+    def push(self, slots: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+
+        self._window.push(slots = slots, values = close)
+
+        return {self.outputs[0]: self._window.mean(slots = slots)}
+
+
+class EmaStream(IndicatorStream):
+
+    def __init__(self, size: int, period: int, alpha: float = 0.0, column_name: str = 'ema') -> None:
+        super().__init__(size = size, column_name = column_name)
+        self._ewm = RunningEwm(span = period, size = size)
+        self._parts = [self._ewm]
+
+    def push(self, slots: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+        return {self.outputs[0]: self._ewm.push(slots = slots, values = close)}
+
+
+class RateOfChangeStream(IndicatorStream):
+
+    def __init__(self, size: int, period: int = 1, column_name: str = 'rate_of_change') -> None:
+        super().__init__(size = size, column_name = column_name)
+        self._lagged = RunningWindow(window = period, size = size)
+        self._parts = [self._lagged]
+
+    def push(self, slots: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+        return {self.outputs[0]: close / self._lagged.push(slots = slots, values = close) - 1.0}
+
+
+class RsiStream(IndicatorStream):
+
+    def __init__(self, size: int, period: int, method: str = 'wilders', column_name: str = 'rsi') -> None:
+        super().__init__(size = size, column_name = 'rsi')
+        self._previous = RunningWindow(window = 1, size = size)
+        self._ewm_up = RunningEwm(span = period, size = size)
+        self._ewm_down = RunningEwm(span = period, size = size)
+        self._parts = [self._previous, self._ewm_up, self._ewm_down]
+
+    def push(self, slots: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+
+        change = close - self._previous.push(slots = slots, values = close)
+
+        # The first bar has no change, it counts as neither up nor down.
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            ewma_up = self._ewm_up.push(slots = slots, values = np.where(change >= 0, change, 0.0))
+            ewma_down = self._ewm_down.push(slots = slots, values = np.where(change < 0, np.abs(change), 0.0))
+
+            relative_strength = ewma_up / ewma_down
+            relative_strength_index = 100.0 - (100.0 / (1.0 + relative_strength))
+
+            return {
+                'rsi': np.where(relative_strength_index == 0, 100, 100 - (100 / (1 + relative_strength_index)))
+            }
+
+
+class BollingerBandsStream(IndicatorStream):
+
+    def __init__(self, size: int, period: int = 20, column_name: str = 'bollinger_bands') -> None:
+        super().__init__(size = size, column_name = column_name)
+        self.outputs = ['band_upper', 'band_lower']
+        self._window = RunningWindow(window = period, size = size)
+        self._parts = [self._window]
+
+    def push(self, slots: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+
+        self._window.push(slots = slots, values = close)
+
+        moving_avg = self._window.mean(slots = slots)
+        moving_std = self._window.std(slots = slots)
+
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            return {
+                'band_upper': 4 * (moving_std / moving_avg),
+                'band_lower': (close - moving_avg) + (2 * moving_std) / (4 * moving_std)
+            }
+
+
+class StandardDeviationStream(IndicatorStream):
+
+    def __init__(self, size: int, period: int, column_name: str = 'standard_deviation') -> None:
+        super().__init__(size = size, column_name = column_name)
+        self._window = RunningWindow(window = period, size = size)
+        self._parts = [self._window]
+
+    def push(self, slots: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+
+        self._window.push(slots = slots, values = close)
+
+        return {self.outputs[0]: self._window.std(slots = slots)}
+
+
+class MacdStream(IndicatorStream):
+
+    def __init__(self, size: int, fast_period: int = 12, slow_period: int = 26, column_name: str = 'macd') -> None:
+        super().__init__(size = size, column_name = column_name)
+        self.outputs = ['macd_fast', 'macd_slow', 'macd_diff', 'macd']
+        self._periods = (fast_period, slow_period)
+        self._bars = RunningCount(size = size)
+        self._fast = RunningEwm(span = fast_period, size = size)
+        self._slow = RunningEwm(span = slow_period, size = size)
+        self._seen = RunningCount(size = size)
+        self._signal = RunningEwm(span = 9, size = size)
+        self._parts = [self._bars, self._fast, self._slow, self._seen, self._signal]
+
+    def push(self, slots: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+
+        bars = self._bars.push(slots = slots, values = np.ones(len(close), dtype = 'bool'))
+
+        # The fast and slow means are hidden for their first bars, the signal until it saw 8 differences.
+        fast = np.where(bars >= self._periods[0], self._fast.push(slots = slots, values = close), np.nan)
+        slow = np.where(bars >= self._periods[1], self._slow.push(slots = slots, values = close), np.nan)
+        diff = fast - slow
+
+        seen = self._seen.push(slots = slots, values = ~np.isnan(diff))
+        signal = np.where(seen >= 8, self._signal.push(slots = slots, values = diff), np.nan)
+
+        return dict(zip(self.outputs, [fast, slow, diff, signal]))
+
+
+class AverageTrueRangeStream(IndicatorStream):
+
+    inputs = ('high', 'low', 'close')
+
+    def __init__(self, size: int, period: int = 14, column_name: str = 'average_true_range') -> None:
+        super().__init__(size = size, column_name = column_name)
+        self._period = period
+        self._previous = RunningWindow(window = 1, size = size)
+        self._seen = RunningCount(size = size)
+        self._average = RunningEwm(span = period, size = size)
+        self._parts = [self._previous, self._seen, self._average]
+
+    def push(self, slots: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+
+        # The previous close is the only state the true range needs.
+        previous_close = self._previous.push(slots = slots, values = close)
+        true_range = np.fmax(np.abs(high - low), np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+
+        seen = self._seen.push(slots = slots, values = ~np.isnan(true_range))
+        average = self._average.push(slots = slots, values = true_range)
+
+        return {self.outputs[0]: np.where(seen >= self._period, average, np.nan)}
+
+
+class StochasticStream(IndicatorStream):
+
+    inputs = ('high', 'low', 'close')
+
+    def __init__(self, size: int, period: int = 14, smoothing: int = 3, column_name: str = 'stochastic_oscillator') -> None:
+        super().__init__(size = size, column_name = column_name)
+        self.outputs = [column_name, column_name + '_signal']
+        self._highest = RunningExtreme(window = period, size = size, maximum = True)
+        self._lowest = RunningExtreme(window = period, size = size, maximum = False)
+        self._smoothed = RunningWindow(window = smoothing, size = size)
+        self._parts = [self._highest, self._lowest, self._smoothed]
+
+    def push(self, slots: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+
+        highest = self._highest.push(slots = slots, values = high)
+        lowest = self._lowest.push(slots = slots, values = low)
+
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            percent_k = 100 * (close - lowest) / (highest - lowest)
+
+        self._smoothed.push(slots = slots, values = percent_k)
+
+        return {self.outputs[0]: percent_k, self.outputs[1]: self._smoothed.mean(slots = slots)}
+
+
+class DonchianChannelStream(IndicatorStream):
+
+    inputs = ('high', 'low')
+
+    def __init__(self, size: int, period: int = 20, column_name: str = 'donchian_channel') -> None:
+        super().__init__(size = size, column_name = column_name)
+        self.outputs = [column_name + '_upper', column_name + '_lower', column_name + '_middle']
+        self._highest = RunningExtreme(window = period, size = size, maximum = True)
+        self._lowest = RunningExtreme(window = period, size = size, maximum = False)
+        self._parts = [self._highest, self._lowest]
+
+    def push(self, slots: np.ndarray, high: np.ndarray, low: np.ndarray) -> Dict[str, np.ndarray]:
+
+        highest = self._highest.push(slots = slots, values = high)
+        lowest = self._lowest.push(slots = slots, values = low)
+
+        return dict(zip(self.outputs, [highest, lowest, (highest + lowest) / 2]))
+
+
+class WilliamsRStream(IndicatorStream):
+
+    inputs = ('high', 'low', 'close')
+
+    def __init__(self, size: int, period: int = 14, column_name: str = 'williams_r') -> None:
+        super().__init__(size = size, column_name = column_name)
+        self._highest = RunningExtreme(window = period, size = size, maximum = True)
+        self._lowest = RunningExtreme(window = period, size = size, maximum = False)
+        self._parts = [self._highest, self._lowest]
+
+    def push(self, slots: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+
+        highest = self._highest.push(slots = slots, values = high)
+        lowest = self._lowest.push(slots = slots, values = low)
+
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            return {self.outputs[0]: -100 * (highest - close) / (highest - lowest)}
+
+
+class ExpressionStream(IndicatorStream):
+
+    def __init__(self, size: int, expression: str, column_name: str = 'expression') -> None:
+        super().__init__(size = size, column_name = column_name)
+        self._plan = compile_expression(expression = expression, column_name = column_name)
+        self.inputs = self._plan.inputs
+
+        # One running state per windowed node of the plan.
+        self._running = {}
+
+        for step in self._plan.steps:
+            if step[0] == 'window':
+                position, kind, window = step[1], step[2], step[4]
+                if kind == 'ewm':
+                    self._running[position] = RunningEwm(span = window, size = size)
+                elif kind in ('rolling_max', 'rolling_min'):
+                    self._running[position] = RunningExtreme(window = window, size = size, maximum = kind == 'rolling_max')
+                else:
+                    self._running[position] = RunningWindow(window = window, size = size)
+
+        self._parts = list(self._running.values())
+
+    def push(self, slots: np.ndarray, **prices: np.ndarray) -> Dict[str, np.ndarray]:
+
+        def window(position: int, values: np.ndarray) -> np.ndarray:
+
+            kind = self._plan.nodes[position][0]
+            running = self._running[position]
+            pushed = running.push(slots = slots, values = values)
+
+            # A running window answers a push with the value falling out, which is the `shift`.
+            if kind == 'rolling_sum':
+                return running.sum(slots = slots)
+            if kind == 'rolling_mean':
+                return running.mean(slots = slots)
+            if kind == 'rolling_std':
+                return running.std(slots = slots)
+
+            return pushed
+
+        return self._plan.run(price = prices.__getitem__, window = window)
+
+
+class StreamingEngine():
+
+    """
+    Represents the streaming side of the Indicators, which keeps running
+    state for every symbol and only folds in the bars added since the
+    last refresh, instead of recomputing whole columns.
+    """
+
+    streams = {
+        'change_in_price': ChangeInPriceStream,
+        'sma': SmaStream,
+        'ema': EmaStream,
+        'rate_of_change': RateOfChangeStream,
+        'rsi': RsiStream,
+        'macd': MacdStream,
+        'average_true_range': AverageTrueRangeStream,
+        'bollinger_bands': BollingerBandsStream,
+        'standard_deviation': StandardDeviationStream,
+        'stochastic_oscillator': StochasticStream,
+        'donchian_channel': DonchianChannelStream,
+        'williams_r': WilliamsRStream,
+        'expression': ExpressionStream
+    }
+
+    def __init__(self, stock_frame) -> None:
+        """Initalizes the Streaming Engine.
+        Arguments:
+        ----
+        stock_frame {StockFrame} -- The StockFrame whose bars are streamed.
+        """
+
+        self._stock_frame = stock_frame
+        self._streams: Dict[str, IndicatorStream] = {}
+        self._arguments: Dict[str, Dict] = {}
+        self._slots: Dict[str, int] = {}
+        self._last_bar = np.empty(0, dtype = 'int64')
+        self._version = None
+
+    @classmethod
+    def supports(cls, indicator: Dict) -> bool:
+        """Specifies whether a registered indicator can be streamed."""
+
+        return indicator['func'].__name__ in cls.streams
+
+    def _reset(self, indicators: Dict[str, Dict]) -> None:
+        """Drops every running state and builds the streams again."""
+
+        size = len(self._stock_frame.symbol_positions)
+
+        self._streams = {
+            key: self.streams[indicator['func'].__name__](size = size, **indicator['args'])
+            for key, indicator in indicators.items()
+        }
+        self._arguments = {key: dict(indicator['args']) for key, indicator in indicators.items()}
+        self._slots = {}
+        self._last_bar = np.empty(0, dtype = 'int64')
+        self._version = None
+
+    def refresh(self, indicators: Dict[str, Dict]) -> List[str]:
+        """Brings the streamed indicator columns up to date.
+        Overview:
+        ----
+        Only the bars added since the last refresh are pushed through the
+        running state, one round per bar with every symbol updated at once.
+        Symbols whose bars didn't change are skipped, and only the new bars
+        and the last timestamps of the others are read, with either backend.
+        A re-sent last bar (the still forming candle) takes its previous
+        push back first. A new symbol, a symbol with an older bar changed,
+        and every symbol when the indicators or their columns changed, is
+        seeded from its whole history in one vectorized pass instead (see
+        `IndicatorStream.seed`).
+        Arguments:
+        ----
+        indicators {Dict[str, Dict]} -- The registered indicators, as kept by `Indicators`.
+        Returns:
+        ----
+        {List[str]} -- The keys of the indicators that were streamed.
+        """
+
+        indicators = {key: indicator for key, indicator in indicators.items() if self.supports(indicator = indicator)}
+
+        stock_frame = self._stock_frame
+        edits = stock_frame.edits_since(version = self._version) if self._version is not None else None
+
+        missing = any(column not in stock_frame.columns for stream in self._streams.values() for column in stream.outputs)
+        changed = set(indicators) != set(self._streams) or any(
+            self._arguments[key] != indicator['args'] for key, indicator in indicators.items()
+        )
+
+        if missing or changed or edits is None:
+            self._reset(indicators = indicators)
+            edits = {}
+
+        if not self._streams:
+            return []
+
+        positions = stock_frame.symbol_positions
+        version = self._version
+
+        # Give new symbols a slot.
+        for symbol in positions:
+            if symbol not in self._slots:
+                self._slots[symbol] = len(self._slots)
+
+        if len(self._last_bar) < len(self._slots):
+            self._last_bar = np.concatenate([
+                self._last_bar,
+                np.full(len(self._slots) - len(self._last_bar), _NO_BAR, dtype = 'int64')
+            ])
+            for stream in self._streams.values():
+                stream.grow(size = len(self._slots))
+
+        # Find the first bar each changed symbol still has to push, only its own timestamps are read.
+        seeds, seed_spans, slots, spans, undos = [], [], [], [], []
+
+        for symbol, (start, end) in positions.items():
+
+            slot = self._slots[symbol]
+            last_bar = self._last_bar[slot]
+            size = end - start
+
+            if last_bar != _NO_BAR and stock_frame.symbol_version(symbol = symbol) <= version:
+                continue
+
+            edit = edits.get(symbol)
+
+            if last_bar == _NO_BAR or (edit is not None and edit < last_bar):
+                seeds.append(slot)
+                seed_spans.append((symbol, 0, size))
+                self._last_bar[slot] = stock_frame.bar_datetime(symbol = symbol, start = size - 1)[0]
+                continue
+            elif edit is not None and edit == last_bar:
+                undos.append(slot)
+                first = stock_frame.search_bars(symbol = symbol, time_stamp = last_bar, side = 'left')
+            else:
+                first = stock_frame.search_bars(symbol = symbol, time_stamp = last_bar, side = 'right')
+
+            if first < size:
+                slots.append(slot)
+                spans.append((symbol, first, size))
+                self._last_bar[slot] = stock_frame.bar_datetime(symbol = symbol, start = size - 1)[0]
+
+        if undos:
+            for stream in self._streams.values():
+                stream.undo(slots = np.array(undos))
+
+        inputs = list(dict.fromkeys(column for stream in self._streams.values() for column in stream.inputs))
+        outputs = {column: [] for stream in self._streams.values() for column in stream.outputs}
+
+        # Seed the symbols whose whole history is pushed from the batch kernels.
+        if seeds:
+            sizes = np.array([end for _, _, end in seed_spans], dtype = 'int64')
+            ends = np.cumsum(sizes)
+            offsets = np.arange(ends[-1]) - np.repeat(ends - sizes, sizes)
+            prices = {
+                column: np.asarray(stock_frame.gather_rows(column_name = column, spans = seed_spans), dtype = 'float64')
+                for column in inputs
+            }
+
+            for stream in self._streams.values():
+                columns = {column: prices[column] for column in stream.inputs}
+
+                for column, values in stream.seed(slots = np.array(seeds), offsets = offsets, ends = ends, **columns).items():
+                    outputs[column].append(values)
+
+        # Push the new bars in rounds, the k-th new bar of every symbol at once.
+        if spans:
+            slots = np.array(slots, dtype = 'int64')
+            counts = np.array([end - first for _, first, end in spans], dtype = 'int64')
+            firsts = np.cumsum(counts) - counts
+            prices = {
+                column: np.asarray(stock_frame.gather_rows(column_name = column, spans = spans), dtype = 'float64')
+                for column in inputs
+            }
+            pushed = {column: np.full(int(counts.sum()), np.nan) for column in outputs}
+
+            for step in range(int(counts.max())):
+
+                active = counts > step
+                step_rows = firsts[active] + step
+
+                for stream in self._streams.values():
+                    columns = {column: prices[column][step_rows] for column in stream.inputs}
+
+                    for column, values in stream.push(slots = slots[active], **columns).items():
+                        pushed[column][step_rows] = values
+
+            for column, values in pushed.items():
+                outputs[column].append(values)
+
+        # Write the new values, one assignment per column.
+        if seeds or spans:
+            stock_frame.write_rows(
+                outputs = {column: np.concatenate(values) for column, values in outputs.items()},
+                spans = seed_spans + spans
+            )
+
+        self._version = stock_frame.version
+
+        return list(self._streams)
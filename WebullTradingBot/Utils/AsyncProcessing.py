@@ -1,5 +1,14 @@
 import multiprocessing
 import os
+import weakref
+
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import List
+from typing import Dict
+from typing import Tuple
 
 _lastMultiProcessId = -1 # Start of our initial id
 
@@ -104,4 +113,241 @@ class ProcessContainer():
         """Gets the process list dictionary for the Process
         Container
         """
-        return self._processList
\ No newline at end of file
+        return self._processList
+
+
+_PRICE_COLUMNS = ['open', 'close', 'high', 'low', 'volume']
+
+
+class SharedArray():
+    """A NumPy array living in a named shared memory block, so
+    processes can hand columns to each other without pickling them.
+    """
+
+    def __init__(self, shape: Tuple, dtype: str = 'float64', name: str = None) -> None:
+        """Creates a new shared array, or attaches to an existing one by name.
+        Usage:
+        ----
+        SharedArray(shape = (5, rows)) or SharedArray(shape = (5, rows), name = shared.name)
+        """
+
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+
+        self._memory = SharedMemory(name = name, create = name is None, size = size)
+        self.array = np.ndarray(shape = shape, dtype = dtype, buffer = self._memory.buf)
+
+        # The block is freed even if `close` is never called, at the latest when the interpreter exits.
+        self._release = weakref.finalize(self, _release_memory, self._memory, name is None)
+
+    @property
+    def name(self) -> str:
+        """The name other processes attach with."""
+        return self._memory.name
+
+    def close(self) -> None:
+        """Detaches from the block, and frees it if this process created it."""
+
+        self.array = None
+        self._release()
+
+
+def _release_memory(memory: SharedMemory, owner: bool) -> None:
+    """Frees a block its creator is done with, and detaches from it."""
+
+    if owner:
+        memory.unlink()
+
+    try:
+        memory.close()
+    except BufferError:
+        # Arrays still point into it, the mapping goes away with them.
+        pass
+
+
+def _compute_shard(task: Dict) -> None:
+    """Computes the indicators of one shard of symbols inside a pool process.
+    The prices are read from and the results written to shared arrays.
+    """
+
+    # Imported here, the indicators import this module themselves.
+    from Objects.StockFrame import StockFrame
+    from Objects.Indicator import Indicators
+
+    rows = task['rows']
+    shape = task['shape']
+
+    prices = SharedArray(shape = (len(_PRICE_COLUMNS), shape), name = task['prices'])
+    datetime = SharedArray(shape = (shape,), dtype = 'int64', name = task['datetime'])
+    outputs = SharedArray(shape = (task['output_columns'], shape), name = task['outputs'])
+
+    try:
+        columns = {name: prices.array[index, rows[0]:rows[1]] for index, name in enumerate(_PRICE_COLUMNS)}
+        columns['datetime'] = datetime.array[rows[0]:rows[1]]
+        columns['symbol'] = np.repeat(
+            np.array(task['symbols'], dtype = object),
+            task['sizes']
+        )
+
+        indicator_client = Indicators(price_data_frame = StockFrame(data = columns), cache_bytes = 0)
+        frame = indicator_client.price_data_frame
+
+        for position, (name, arguments) in enumerate(task['indicators']):
+
+            getattr(indicator_client, name)(**arguments)
+            frame = indicator_client.price_data_frame
+
+            for index, (owner, column) in enumerate(task['columns']):
+                if owner == position:
+                    outputs.array[index, rows[0]:rows[1]] = frame[column].to_numpy(dtype = 'float64')
+
+    finally:
+        prices.close()
+        datetime.close()
+        outputs.close()
+
+
+class ShardPool():
+    """Computes indicators in a pool of processes, one shard of
+    symbols per task, passing the columns through shared memory.
+    The shared arrays are kept between calls and only grow, call
+    `close` to shut the processes down and free them.
+    Usage:
+    ----
+    pool = ShardPool(processes = 8)
+    outputs = pool.compute(stock_frame, indicators = [('rsi', {'period': 14, ...})], columns = [(0, 'rsi')])
+    pool.close()
+    """
+
+    def __init__(self, processes: int = None, shards_per_process: int = 2, min_shard_rows: int = 20000) -> None:
+        self.processes = processes or os.cpu_count()
+        self.shards_per_process = shards_per_process
+        self.min_shard_rows = min_shard_rows
+        self._executor: ProcessPoolExecutor = None
+
+        self._prices: SharedArray = None
+        self._datetime: SharedArray = None
+        self._outputs: SharedArray = None
+        self._rows = 0
+        self._columns = 0
+
+    def _shards(self, positions: Dict[str, Tuple[int, int]], rows: int) -> List[List[str]]:
+        """Splits the symbols into contiguous shards of about the same number of rows,
+        fewer of them when each would hold less than `min_shard_rows`."""
+
+        count = max(min(self.processes * self.shards_per_process, rows // max(self.min_shard_rows, 1)), 1)
+        target = rows / count
+        shards = [[]]
+        filled = 0
+
+        for symbol, (start, end) in positions.items():
+
+            if shards[-1] and filled >= target * len(shards):
+                shards.append([])
+
+            shards[-1].append(symbol)
+            filled += end - start
+
+        return shards
+
+    def _reserve(self, rows: int, columns: int) -> None:
+        """Makes sure the shared arrays hold the rows and columns, growing them
+        by half again so a frame that keeps growing doesn't reallocate every time."""
+
+        if self._prices is not None and rows <= self._rows and columns <= self._columns:
+            return
+
+        self._free()
+
+        self._rows = max(rows + rows // 2, self._rows, 1)
+        self._columns = max(columns, self._columns, 1)
+
+        self._prices = SharedArray(shape = (len(_PRICE_COLUMNS), self._rows))
+        self._datetime = SharedArray(shape = (self._rows,), dtype = 'int64')
+        self._outputs = SharedArray(shape = (self._columns, self._rows))
+
+    def _free(self) -> None:
+        """Unlinks the shared arrays."""
+
+        for shared in (self._prices, self._datetime, self._outputs):
+            if shared is not None:
+                shared.close()
+
+        self._prices = None
+        self._datetime = None
+        self._outputs = None
+
+    def compute(self, stock_frame, indicators: List[Tuple[str, Dict]], columns: List[Tuple[int, str]],
+                symbols: List[str] = None) -> List[np.ndarray]:
+        """Computes indicators for the symbols of a StockFrame.
+        Arguments:
+        ----
+        stock_frame {StockFrame} -- The StockFrame to compute the indicators for. The indicators
+            must never look across symbols, since every shard only sees its own.
+        indicators {List[Tuple[str, Dict]]} -- The indicator method names and their arguments.
+        columns {List[Tuple[int, str]]} -- The output columns to collect, each with the
+            position of the indicator that writes it.
+        Keyword Arguments:
+        ----
+        symbols {List[str]} -- Only compute these symbols, in frame order. (default: {None})
+        Returns:
+        ----
+        {List[np.ndarray]} -- The output columns, over the rows of the symbols one after
+            the other, which is frame row order when every symbol is computed.
+        """
+
+        positions = stock_frame.symbol_positions
+
+        if symbols is None or len(symbols) == len(positions):
+            symbols = list(positions)
+            rows = None
+        else:
+            rows = np.concatenate([np.arange(*positions[symbol]) for symbol in symbols])
+
+        sizes = [positions[symbol][1] - positions[symbol][0] for symbol in symbols]
+        offsets = np.concatenate([[0], np.cumsum(sizes, dtype = 'int64')]).tolist()
+        layout = {symbol: (offsets[index], offsets[index + 1]) for index, symbol in enumerate(symbols)}
+        size = offsets[-1]
+
+        self._reserve(rows = size, columns = len(columns))
+
+        for index, name in enumerate(_PRICE_COLUMNS):
+            values = stock_frame.column_array(column_name = name)
+            self._prices.array[index, :size] = values if rows is None else values[rows]
+
+        datetime = stock_frame._datetime_ms()
+        self._datetime.array[:size] = datetime if rows is None else datetime[rows]
+        self._outputs.array[:len(columns), :size] = np.nan
+
+        tasks = []
+
+        for shard in self._shards(positions = layout, rows = size):
+            tasks.append({
+                'prices': self._prices.name,
+                'datetime': self._datetime.name,
+                'outputs': self._outputs.name,
+                'shape': self._rows,
+                'output_columns': self._columns,
+                'rows': (layout[shard[0]][0], layout[shard[-1]][1]),
+                'symbols': shard,
+                'sizes': [layout[symbol][1] - layout[symbol][0] for symbol in shard],
+                'indicators': indicators,
+                'columns': columns
+            })
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers = self.processes)
+
+        # Surface the first error of any shard.
+        for _ in self._executor.map(_compute_shard, tasks):
+            pass
+
+        return [np.array(self._outputs.array[index, :size]) for index in range(len(columns))]
+
+    def close(self) -> None:
+        """Shuts the pool processes down and unlinks the shared arrays."""
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+        self._free()
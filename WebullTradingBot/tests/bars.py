@@ -0,0 +1,116 @@
+"""
+Shared helpers for the tests: reproducible quotes, the indicators every
+mode is checked with, and the comparisons against the serial `pandas` run.
+"""
+
+import operator
+
+import numpy as np
+import pandas as pd
+
+from typing import List
+from typing import Dict
+
+from Objects.StockFrame import StockFrame
+from Objects.Indicator import Indicators
+
+SYMBOLS = ['AMC', 'AMCX', 'MSFT']
+START = 1600000200000 - 1600000200000 % 86400000
+MINUTE = 60000
+
+
+def quote(symbol: str, bar: int, close: float, volume: float = 100.0, spread: float = 1.0) -> Dict:
+    """A single quote, `bar` minutes after `START`."""
+
+    return {
+        'symbol': symbol,
+        'datetime': START + bar * MINUTE,
+        'open': close - spread / 4,
+        'close': close,
+        'high': close + spread,
+        'low': close - spread,
+        'volume': volume
+    }
+
+
+def random_quotes(symbols: List[str], bars: range, seed: int) -> List[Dict]:
+    """Random walk quotes for every symbol over a range of bars."""
+
+    rng = np.random.default_rng(seed)
+
+    return [
+        quote(
+            symbol = symbol,
+            bar = bar,
+            close = 100.0 + rng.normal(0.0, 2.0),
+            volume = float(rng.integers(100, 1000)),
+            spread = 0.5 + rng.random()
+        )
+        for bar in bars for symbol in symbols
+    ]
+
+
+def add_indicators(indicator_client: Indicators) -> None:
+    """Registers the indicators the modes are compared on."""
+
+    indicator_client.change_in_price()
+    indicator_client.sma(period = 5)
+    indicator_client.ema(period = 10)
+    indicator_client.rsi(period = 14)
+    indicator_client.rate_of_change(period = 3)
+    indicator_client.bollinger_bands(period = 20)
+    indicator_client.macd(fast_period = 5, slow_period = 12)
+    indicator_client.average_true_range(period = 7)
+    indicator_client.stochastic_oscillator(period = 5, smoothing = 3)
+    indicator_client.donchian_channel(period = 6)
+    indicator_client.williams_r(period = 5)
+    indicator_client.sma_sweep(periods = [3, 6, 9])
+    indicator_client.expression(expression = 'sma(close, 3) - ema(close, 4) + rolling_max(high, 3)', column_name = 'spread')
+
+    indicator_client.set_indicator_signal(
+        indicator = 'rsi', buy = 40.0, sell = 60.0, condition_buy = operator.le, condition_sell = operator.ge
+    )
+
+
+def reference_frame(batches: List[List[Dict]]) -> pd.DataFrame:
+    """Builds the serial `pandas` frame, computing the indicators once over every bar."""
+
+    stock_frame = StockFrame(data = batches[0])
+
+    for batch in batches[1:]:
+        stock_frame.add_rows(data = batch)
+
+    indicator_client = Indicators(price_data_frame = stock_frame, cache_bytes = 0)
+    add_indicators(indicator_client = indicator_client)
+
+    return stock_frame.frame
+
+
+def frame_rows(frame: pd.DataFrame) -> List[tuple]:
+    """The `(symbol, epoch milliseconds)` key of every row, whatever the datetime level holds."""
+
+    datetime = frame.index.get_level_values(1)
+
+    if not np.issubdtype(datetime.dtype, np.integer):
+        datetime = datetime.values.astype('datetime64[ms]').astype('int64')
+
+    return list(zip(frame.index.get_level_values(0), np.asarray(datetime, dtype = 'int64').tolist()))
+
+
+def assert_frames_match(frame: pd.DataFrame, expected: pd.DataFrame, columns: List[str] = None) -> None:
+    """Checks two frames hold the same rows and, within rounding, the same values."""
+
+    columns = columns or list(expected.columns)
+
+    assert frame_rows(frame = frame) == frame_rows(frame = expected)
+    assert set(columns) <= set(frame.columns)
+
+    for column in columns:
+        np.testing.assert_allclose(
+            frame[column].to_numpy(dtype = 'float64'),
+            expected[column].to_numpy(dtype = 'float64'),
+            rtol = 1e-7,
+            atol = 1e-7,
+            equal_nan = True,
+            err_msg = column
+        )
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from Objects.StockFrame import StockFrame
+from Objects.BarStore import BarFile
+from Objects.BarStore import BarStore
+
+from tests.bars import SYMBOLS
+from tests.bars import quote
+from tests.bars import random_quotes
+from tests.bars import frame_rows
+
+
+def test_bar_file_keeps_one_bar_per_timestamp(tmp_path):
+
+    bar_file = BarFile(path = str(tmp_path / 'bars.bars'), capacity = 2)
+
+    def columns(values):
+        return {name: np.asarray(values, dtype = 'float64') for name in BarFile.columns[1:]}
+
+    assert bar_file.append(datetime = np.array([1, 2, 2, 3]), columns = columns([1.0, 2.0, 2.5, 3.0])) == 3
+    assert bar_file.column(name = 'datetime').tolist() == [1, 2, 3]
+    assert bar_file.column(name = 'close').tolist() == [1.0, 2.5, 3.0]
+
+    # The last bar is replaced, older ones are skipped, and the file grows past its capacity.
+    bar_file.append(datetime = np.array([2, 3, 3, 4, 5, 5]), columns = columns([9.0, 3.5, 3.6, 4.0, 5.0, 5.5]))
+
+    assert bar_file.column(name = 'datetime').tolist() == [1, 2, 3, 4, 5]
+    assert bar_file.column(name = 'close').tolist() == [1.0, 2.5, 3.6, 4.0, 5.5]
+    assert bar_file.capacity >= 5
+
+
+@pytest.mark.parametrize('backend', ['pandas', 'columnar'])
+def test_stock_frame_persists_only_the_bars_it_took(backend, tmp_path):
+
+    bar_store = BarStore(path = str(tmp_path), bars_per_day = 4)
+    history = random_quotes(symbols = SYMBOLS, bars = range(3), seed = 0)
+    bar_store.append(data = history)
+
+    if backend == 'columnar':
+        stock_frame = StockFrame.from_bar_store(bar_store = bar_store)
+    else:
+        stock_frame = StockFrame(data = history)
+        stock_frame.bar_store = bar_store
+
+    stock_frame.add_rows(data = [quote(symbol = 'AMC', bar = 3, close = 1.0), quote(symbol = 'AMC', bar = 3, close = 2.0)])
+    stock_frame.add_rows(data = quote(symbol = 'AMC', bar = 3, close = 3.0))
+    stock_frame.add_rows(data = quote(symbol = 'AMC', bar = 0, close = 4.0), max_late_bars = 1)
+
+    for bar in range(4, 12):
+        stock_frame.add_rows(data = random_quotes(symbols = SYMBOLS, bars = range(bar, bar + 1), seed = bar) * 2)
+
+    restored = StockFrame.from_bar_store(bar_store = bar_store)
+
+    assert restored.frame.index.is_unique
+    assert frame_rows(frame = restored.frame) == frame_rows(frame = stock_frame.frame)
+    np.testing.assert_allclose(
+        restored.frame['close'].to_numpy(dtype = 'float64'),
+        stock_frame.frame['close'].to_numpy(dtype = 'float64')
+    )
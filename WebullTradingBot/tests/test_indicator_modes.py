@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from Objects.StockFrame import StockFrame
+from Objects.Indicator import Indicators
+
+from tests.bars import SYMBOLS
+from tests.bars import MINUTE
+from tests.bars import quote
+from tests.bars import random_quotes
+from tests.bars import add_indicators
+from tests.bars import reference_frame
+from tests.bars import assert_frames_match
+
+BACKENDS = ['pandas', 'columnar']
+
+MODES = {
+    'cached': {},
+    'uncached': {'cache_bytes': 0},
+    'streaming': {'streaming': True},
+    'lazy': {'lazy': True},
+    'processes': {'processes': 2},
+    'threads': {'threads': 2}
+}
+
+
+def bar_cycles():
+    """New bars, a resent forming bar, a late bar and a symbol showing up later on."""
+
+    batches = [random_quotes(symbols = SYMBOLS, bars = range(40), seed = 0)]
+
+    for bar in range(40, 52):
+
+        symbols = SYMBOLS + (['NEW'] if bar > 44 else [])
+        batches.append(random_quotes(symbols = symbols, bars = range(bar, bar + 1), seed = bar))
+        batches.append(random_quotes(symbols = SYMBOLS[:2], bars = range(bar, bar + 1), seed = 1000 + bar))
+
+        if bar % 4 == 1:
+            late = quote(symbol = 'AMCX', bar = bar - 5, close = 90.0)
+            late['datetime'] += MINUTE // 2
+            batches.append([late])
+
+    return batches
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('mode', list(MODES))
+def test_refresh_matches_the_serial_pandas_run(backend, mode, monkeypatch):
+
+    # The thread pool is capped at the cores there are, so pretend there are a few.
+    monkeypatch.setattr(os, 'cpu_count', lambda: 4)
+
+    batches = bar_cycles()
+    stock_frame = StockFrame(data = batches[0], backend = backend)
+
+    indicator_client = Indicators(price_data_frame = stock_frame, **MODES[mode])
+    add_indicators(indicator_client = indicator_client)
+
+    # Split the symbols over several shards.
+    if indicator_client._pool is not None:
+        indicator_client._pool.min_shard_rows = 10
+
+    try:
+        for position, batch in enumerate(batches[1:], start = 2):
+
+            stock_frame.add_rows(data = batch)
+            indicator_client.refresh()
+
+            if mode == 'lazy':
+                indicator_client.materialize()
+
+            if position % 6 == 0 or position == len(batches):
+                expected = reference_frame(batches = batches[:position])
+                assert_frames_match(frame = stock_frame.frame, expected = expected)
+
+        if mode != 'lazy':
+            assert indicator_client.check_signals().keys() == {'buys', 'sells'}
+
+    finally:
+        indicator_client.close()
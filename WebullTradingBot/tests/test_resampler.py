@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Objects.StockFrame import StockFrame
+
+from tests.bars import START
+from tests.bars import quote
+from tests.bars import frame_rows
+
+BACKENDS = [
+    {'backend': 'pandas'},
+    {'backend': 'pandas', 'compact': True},
+    {'backend': 'columnar'}
+]
+
+
+def resample(stock_frame: StockFrame, minutes: int) -> pd.DataFrame:
+    """Resamples the whole base frame from scratch."""
+
+    frame = stock_frame.frame
+    rows = frame_rows(frame = frame)
+
+    bars = frame[['open', 'close', 'high', 'low', 'volume']].reset_index(drop = True)
+    bars['symbol'] = [symbol for symbol, _ in rows]
+    bars['bucket'] = [time_stamp - (time_stamp - START) % (minutes * 60000) for _, time_stamp in rows]
+
+    return bars.groupby(['symbol', 'bucket']).agg(
+        open = ('open', 'first'),
+        close = ('close', 'last'),
+        high = ('high', 'max'),
+        low = ('low', 'min'),
+        volume = ('volume', 'sum')
+    )
+
+
+def assert_resampled(stock_frame: StockFrame) -> None:
+    """Checks the `5m` timeframe against a full resample of the base frame."""
+
+    expected = resample(stock_frame = stock_frame, minutes = 5)
+    frame = stock_frame.timeframe('5m').frame
+
+    assert frame_rows(frame = frame) == list(expected.index)
+
+    for column in expected.columns:
+        np.testing.assert_allclose(frame[column].to_numpy(dtype = 'float64'), expected[column].to_numpy(dtype = 'float64'), err_msg = column)
+
+
+@pytest.mark.parametrize('options', BACKENDS)
+def test_late_and_resent_bars_keep_the_bucket_right(options):
+
+    stock_frame = StockFrame(data = [quote(symbol = 'A', bar = 0, close = 1.0, volume = 10.0)], **options)
+    stock_frame.add_timeframe(name = '5m', minutes = 5)
+
+    # A late bar inside the open bucket keeps the newer close and counts its volume once.
+    stock_frame.add_rows(data = [quote(symbol = 'A', bar = 1, close = 2.0, volume = 10.0), quote(symbol = 'A', bar = 3, close = 4.0, volume = 10.0)])
+    stock_frame.add_rows(data = quote(symbol = 'A', bar = 2, close = 3.0, volume = 15.0))
+
+    bucket = stock_frame.timeframe('5m').frame.iloc[-1]
+    assert (bucket['close'], bucket['volume']) == (4.0, 45.0)
+
+    # Sending it again replaces it.
+    stock_frame.add_rows(data = quote(symbol = 'A', bar = 2, close = 3.0, volume = 15.0))
+    assert stock_frame.timeframe('5m').frame.iloc[-1]['volume'] == 45.0
+    assert_resampled(stock_frame = stock_frame)
+
+    # The forming bar sent again, first with a wider range.
+    stock_frame.add_rows(data = quote(symbol = 'A', bar = 3, close = 5.0, volume = 20.0, spread = 9.0))
+    stock_frame.add_rows(data = quote(symbol = 'A', bar = 3, close = 4.5, volume = 12.0))
+    assert_resampled(stock_frame = stock_frame)
+
+    # A bar for a bucket that's already closed.
+    stock_frame.add_rows(data = [quote(symbol = 'A', bar = 6, close = 6.0), quote(symbol = 'B', bar = 0, close = 7.0)])
+    stock_frame.add_rows(data = quote(symbol = 'A', bar = 4, close = 9.0, spread = 40.0))
+    assert_resampled(stock_frame = stock_frame)
+
+    # A dropped bar leaves the buckets alone.
+    stock_frame.add_rows(data = quote(symbol = 'A', bar = 0, close = 70.0), max_late_bars = 2)
+    assert_resampled(stock_frame = stock_frame)
+
+
+@pytest.mark.parametrize('options', BACKENDS)
+def test_random_updates_match_a_full_resample(options):
+
+    rng = np.random.default_rng(7)
+    stock_frame = StockFrame(data = [quote(symbol = 'A', bar = 0, close = 1.0)], **options)
+    stock_frame.add_timeframe(name = '5m', minutes = 5)
+
+    for step in range(150):
+        symbol = ['A', 'B', 'C'][step % 3]
+        bar = int(rng.integers(0, 40))
+        stock_frame.add_rows(data = [
+            quote(symbol = symbol, bar = bar, close = float(rng.integers(1, 100)), volume = float(rng.integers(1, 9))),
+            quote(symbol = symbol, bar = bar + 1, close = 3.0, volume = 2.0)
+        ])
+
+    assert_resampled(stock_frame = stock_frame)
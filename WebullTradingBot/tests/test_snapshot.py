@@ -0,0 +1,57 @@
+import pytest
+
+from Objects.StockFrame import StockFrame
+from Objects.Indicator import Indicators
+
+from tests.bars import SYMBOLS
+from tests.bars import random_quotes
+from tests.bars import add_indicators
+from tests.bars import reference_frame
+from tests.bars import assert_frames_match
+
+SETTINGS = [
+    {'streaming': False, 'cache_bytes': 0, 'processes': 0, 'threads': 0, 'lazy': False},
+    {'streaming': True, 'cache_bytes': 1024 * 1024, 'processes': 0, 'threads': 0, 'lazy': False},
+    {'streaming': False, 'cache_bytes': 64 * 1024 * 1024, 'processes': 0, 'threads': 2, 'lazy': True}
+]
+
+
+@pytest.mark.parametrize('backend', ['pandas', 'columnar'])
+@pytest.mark.parametrize('settings', SETTINGS)
+def test_snapshot_round_trip(backend, settings, tmp_path):
+
+    history = random_quotes(symbols = SYMBOLS, bars = range(40), seed = 0)
+    update = random_quotes(symbols = SYMBOLS, bars = range(40, 41), seed = 40)
+    path = str(tmp_path / 'snapshot.npz')
+
+    indicator_client = Indicators(price_data_frame = StockFrame(data = history, backend = backend), **settings)
+    add_indicators(indicator_client = indicator_client)
+    indicator_client.refresh()
+
+    if settings['lazy']:
+        indicator_client.materialize()
+
+    indicator_client.save_snapshot(path = path)
+    restored = Indicators.load_snapshot(path = path)
+
+    try:
+        assert restored._settings == settings
+        assert (restored._streaming is not None) == settings['streaming']
+        assert restored._lazy == settings['lazy']
+        assert (restored.cache is not None) == bool(settings['cache_bytes'])
+
+        assert_frames_match(frame = restored.stock_frame.frame, expected = indicator_client.stock_frame.frame)
+        assert restored.check_signals().keys() == indicator_client.check_signals().keys()
+
+        # The restored client carries on like the one it was saved from.
+        restored.stock_frame.add_rows(data = update)
+        restored.refresh()
+
+        if settings['lazy']:
+            restored.materialize()
+
+        assert_frames_match(frame = restored.stock_frame.frame, expected = reference_frame(batches = [history, update]))
+
+    finally:
+        indicator_client.close()
+        restored.close()
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from Objects.StockFrame import StockFrame
+from Objects.Indicator import Indicators
+from Objects.BarStore import BarStore
+
+from tests.bars import SYMBOLS
+from tests.bars import MINUTE
+from tests.bars import quote
+from tests.bars import random_quotes
+from tests.bars import frame_rows
+
+BACKENDS = [
+    {'backend': 'pandas'},
+    {'backend': 'pandas', 'compact': True},
+    {'backend': 'columnar'},
+    {'backend': 'columnar', 'compact': True}
+]
+
+
+@pytest.mark.parametrize('options', BACKENDS)
+def test_add_rows_upserts_every_kind_of_bar(options):
+
+    history = random_quotes(symbols = SYMBOLS, bars = range(30), seed = 1)
+    stock_frame = StockFrame(data = history, **options)
+
+    between = quote(symbol = 'MSFT', bar = 4, close = 42.0)
+    between['datetime'] += MINUTE // 2
+
+    batches = [
+        random_quotes(symbols = SYMBOLS, bars = range(30, 31), seed = 2),
+        random_quotes(symbols = SYMBOLS[:2], bars = range(30, 31), seed = 3),
+        [quote(symbol = 'AMC', bar = 12, close = 50.0), quote(symbol = 'AMC', bar = 12, close = 51.0)],
+        [between],
+        [quote(symbol = 'NEW', bar = 1, close = 11.0), quote(symbol = 'NEW', bar = 0, close = 10.0)]
+    ]
+
+    expected = {}
+
+    for bar in history + [bar for batch in batches for bar in batch]:
+        expected[(bar['symbol'], bar['datetime'])] = bar
+
+    for batch in batches:
+        stock_frame.add_rows(data = batch)
+
+    frame = stock_frame.frame
+
+    assert frame_rows(frame = frame) == sorted(expected)
+    np.testing.assert_allclose(frame['close'].to_numpy(dtype = 'float64'), [expected[key]['close'] for key in sorted(expected)])
+
+
+@pytest.mark.parametrize('options', BACKENDS)
+def test_add_rows_drops_bars_older_than_max_late_bars(options):
+
+    stock_frame = StockFrame(data = random_quotes(symbols = SYMBOLS, bars = range(30), seed = 1), **options)
+    before = stock_frame.frame['close'].to_numpy(dtype = 'float64')
+
+    report = stock_frame.add_rows(data = quote(symbol = 'AMC', bar = 2, close = 1.0), max_late_bars = 5)
+
+    assert report == {'inserted': 0, 'updated': 0, 'dropped': 1}
+    np.testing.assert_array_equal(stock_frame.frame['close'].to_numpy(dtype = 'float64'), before)
+
+    report = stock_frame.add_rows(data = quote(symbol = 'AMC', bar = 27, close = 1.0), max_late_bars = 5)
+
+    assert report == {'inserted': 0, 'updated': 1, 'dropped': 0}
+    assert stock_frame.frame.loc['AMC']['close'].to_numpy()[27] == 1.0
+
+
+@pytest.mark.parametrize('options', BACKENDS)
+def test_retention_spills_the_evicted_bars(options, tmp_path):
+
+    history = random_quotes(symbols = SYMBOLS, bars = range(30), seed = 1)
+    updates = [random_quotes(symbols = SYMBOLS, bars = range(bar, bar + 1), seed = bar) for bar in range(30, 90)]
+
+    bar_store = BarStore(path = str(tmp_path))
+    stock_frame = StockFrame(data = history, **options)
+    stock_frame.set_retention(max_bars = 20, spill_to = bar_store)
+
+    indicator_client = Indicators(price_data_frame = stock_frame)
+    indicator_client.sma(period = 5)
+
+    for batch in updates:
+        stock_frame.add_rows(data = batch)
+        indicator_client.refresh()
+
+    expected = StockFrame(data = history + [bar for batch in updates for bar in batch])
+    Indicators(price_data_frame = expected, cache_bytes = 0).sma(period = 5)
+
+    frame = stock_frame.frame
+    rows = frame_rows(frame = frame)
+    spilled = {symbol: bar_store.read(symbol = symbol)['datetime'] for symbol in SYMBOLS}
+
+    for symbol in SYMBOLS:
+
+        kept = [time_stamp for name, time_stamp in rows if name == symbol]
+        every = [time_stamp for name, time_stamp in frame_rows(frame = expected.frame) if name == symbol]
+
+        # The newest bars are kept, the evicted ones are all in the store.
+        assert 20 <= len(kept) <= 25
+        assert kept == every[-len(kept):]
+        assert spilled[symbol].tolist() == every[:-len(kept)]
+
+        np.testing.assert_allclose(
+            frame.loc[symbol]['sma'].to_numpy(dtype = 'float64')[-10:],
+            expected.frame.loc[symbol]['sma'].to_numpy(dtype = 'float64')[-10:]
+        )